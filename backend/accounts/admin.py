@@ -1,13 +1,18 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User
+from .models import Company, User
+
+
+@admin.register(Company)
+class CompanyAdmin(admin.ModelAdmin):
+    list_display = ('code', 'name', 'schema', 'is_active')
+    search_fields = ('code', 'name')
 
 
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
-    list_display = ('username', 'email', 'role', 'is_staff', 'is_active')
-    list_filter = ('role', 'is_staff', 'is_active')
+    list_display = ('username', 'email', 'company', 'role', 'is_staff', 'is_active')
+    list_filter = ('company', 'role', 'is_staff', 'is_active')
     fieldsets = BaseUserAdmin.fieldsets + (
-        ('Additional Info', {'fields': ('role', 'phone')}),
+        ('Additional Info', {'fields': ('company', 'role', 'phone')}),
     )
-
@@ -1,7 +1,11 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
 
+    def ready(self):
+        from enterprisepro.tenancy import install_schema_switch
+        connection_created.connect(install_schema_switch, dispatch_uid='tenancy.install_schema_switch')
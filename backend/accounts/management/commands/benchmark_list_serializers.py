@@ -0,0 +1,83 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from accounts.models import Company
+from audit.views import AuditLogViewSet
+from enterprisepro.projection import RowProjection
+from enterprisepro.tenancy import company_context
+from finance.views import GeneralLedgerViewSet, InvoiceViewSet
+from inventory.views import InventoryItemViewSet
+
+VIEWSETS = {
+    'inventory-items': InventoryItemViewSet,
+    'ledger': GeneralLedgerViewSet,
+    'audit-logs': AuditLogViewSet,
+    'invoices': InvoiceViewSet,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare rows per second of the list endpoints serialized from model instances '
+        'and projected from values() rows, and check both render the same JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lists', nargs='+', choices=list(VIEWSETS),
+            help='Lists to benchmark (default: all).',
+        )
+        parser.add_argument('--rows', type=int, default=5000, help='Rows per list (default: 5000).')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per path; the best is reported.')
+        parser.add_argument('--company', help='Code of the company whose rows are read (default: all).')
+
+    def handle(self, *args, **options):
+        company_id = None
+        if options['company']:
+            try:
+                company_id = Company.objects.get(code=options['company']).pk
+            except Company.DoesNotExist:
+                raise CommandError(f"No company with code {options['company']}.")
+
+        with company_context(company_id):
+            for name in options['lists'] or VIEWSETS:
+                self._benchmark(name, VIEWSETS[name], options['rows'], options['repeat'])
+
+    def _benchmark(self, name, viewset, limit, repeat):
+        serializer_class = viewset.serializer_class
+        # By id, so both paths read the same rows in the same order
+        queryset = viewset.queryset.order_by('pk')[:limit]
+        projection = RowProjection(serializer_class())
+
+        def serialized():
+            return serializer_class(list(queryset.all()), many=True).data
+
+        def projected():
+            return projection.represent(projection.project(queryset.all()))
+
+        renderer = JSONRenderer()
+        expected, data = serialized(), projected()
+        if not data:
+            self.stdout.write(f'{name}: no rows')
+            return
+        if renderer.render(expected) != renderer.render(data):
+            raise CommandError(f'{name}: the projected rows render differently from the serializer.')
+
+        timings = [self._best(path, repeat) for path in (serialized, projected)]
+        rates = [len(data) / seconds for seconds in timings]
+        self.stdout.write(
+            f'{name}: {len(data)} rows, serializer {rates[0]:,.0f} rows/s, '
+            f'projection {rates[1]:,.0f} rows/s ({timings[0] / timings[1]:.1f}x)'
+        )
+
+    @staticmethod
+    def _best(path, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            path()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
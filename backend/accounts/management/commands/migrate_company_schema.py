@@ -0,0 +1,35 @@
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from accounts.models import Company
+from enterprisepro.tenancy import SCHEMAS_CACHE_KEY, company_context
+
+
+class Command(BaseCommand):
+    help = "Create (or bring up to date) the tables of a company placed in its own schema."
+
+    def add_arguments(self, parser):
+        parser.add_argument('code', help='Code of the company; its schema field must be set.')
+
+    def handle(self, *args, **options):
+        try:
+            company = Company.objects.get(code=options['code'])
+        except Company.DoesNotExist:
+            raise CommandError(f"No company with code {options['code']}.")
+        if not company.schema:
+            raise CommandError(f'Company {company.code} has no schema; set one first.')
+
+        cache.delete(SCHEMAS_CACHE_KEY)
+        with connection.cursor() as cursor:
+            cursor.execute(f'CREATE SCHEMA IF NOT EXISTS "{company.schema}"')
+            # The schema keeps its own migration history; shared apps are
+            # recorded there without creating tables (see TenantRouter)
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS "{company.schema}".django_migrations '
+                '(LIKE public.django_migrations INCLUDING ALL)'
+            )
+        with company_context(company.pk):
+            call_command('migrate', interactive=False, verbosity=options['verbosity'])
+        self.stdout.write(f'Schema {company.schema} of {company.code} is up to date.')
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:13
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import enterprisepro.tenancy
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Company',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=20, unique=True)),
+                ('name', models.CharField(max_length=200)),
+                ('schema', models.CharField(blank=True, max_length=63, validators=[django.core.validators.RegexValidator('^[a-z_][a-z0-9_]*$', 'Lowercase letters, digits and underscores only.')])),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'companies',
+                'ordering': ['code'],
+            },
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='company',
+            field=models.ForeignKey(default=enterprisepro.tenancy.current_company_id, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='users', to='accounts.company'),
+        ),
+        enterprisepro.tenancy.fill_company('accounts', 'User'),
+        migrations.AlterField(
+            model_name='user',
+            name='company',
+            field=models.ForeignKey(default=enterprisepro.tenancy.current_company_id, on_delete=django.db.models.deletion.PROTECT, related_name='users', to='accounts.company'),
+        ),
+    ]
@@ -1,5 +1,33 @@
 from django.contrib.auth.models import AbstractUser
+from django.core.cache import cache
+from django.core.validators import RegexValidator
 from django.db import models
+from enterprisepro.tenancy import SCHEMAS_CACHE_KEY, current_company_id, set_default_company
+
+
+class Company(models.Model):
+    """A legal entity; business data is scoped to one (see enterprisepro.tenancy)."""
+    code = models.CharField(max_length=20, unique=True)
+    name = models.CharField(max_length=200)
+    # PostgreSQL schema holding the company's data; blank for the shared schema
+    schema = models.CharField(
+        max_length=63, blank=True,
+        validators=[RegexValidator(r'^[a-z_][a-z0-9_]*$', 'Lowercase letters, digits and underscores only.')],
+    )
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['code']
+        verbose_name_plural = 'companies'
+
+    def __str__(self):
+        return f"{self.code} - {self.name}"
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        cache.delete(SCHEMAS_CACHE_KEY)
 
 
 class User(AbstractUser):
@@ -11,6 +39,7 @@ class User(AbstractUser):
         ('viewer', 'Viewer'),
     ]
     
+    company = models.ForeignKey(Company, on_delete=models.PROTECT, related_name='users', default=current_company_id)
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='staff')
     phone = models.CharField(max_length=20, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -19,3 +48,6 @@ class User(AbstractUser):
     def __str__(self):
         return f"{self.username} ({self.get_role_display()})"
 
+    def save(self, *args, **kwargs):
+        set_default_company([self])
+        super().save(*args, **kwargs)
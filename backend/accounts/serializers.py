@@ -6,11 +6,13 @@ from .models import User
 class UserSerializer(serializers.ModelSerializer):
     """Serializer for User model."""
     role_display = serializers.CharField(source='get_role_display', read_only=True)
+    company_code = serializers.CharField(source='company.code', read_only=True)
+    company_name = serializers.CharField(source='company.name', read_only=True)
     
     class Meta:
         model = User
-        fields = ('id', 'username', 'email', 'role', 'role_display', 'phone', 'first_name', 'last_name', 'is_active', 'is_staff', 'is_superuser', 'date_joined', 'created_at', 'updated_at')
-        read_only_fields = ('id', 'date_joined', 'created_at', 'updated_at', 'is_superuser')
+        fields = ('id', 'username', 'email', 'role', 'role_display', 'company', 'company_code', 'company_name', 'phone', 'first_name', 'last_name', 'is_active', 'is_staff', 'is_superuser', 'date_joined', 'created_at', 'updated_at')
+        read_only_fields = ('id', 'company', 'date_joined', 'created_at', 'updated_at', 'is_superuser')
 
 
 class RegisterSerializer(serializers.ModelSerializer):
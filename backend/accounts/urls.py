@@ -1,7 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenRefreshView
-from .views import CustomTokenObtainPairView, RegisterView, get_current_user, UserViewSet
+from .views import CustomTokenObtainPairView, RegisterView, get_current_user, UserViewSet, admin_summary
 
 router = DefaultRouter()
 router.register(r'users', UserViewSet, basename='user')
@@ -11,6 +11,7 @@ urlpatterns = [
     path('refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('register/', RegisterView.as_view(), name='register'),
     path('me/', get_current_user, name='current_user'),
+    path('admin-summary/', admin_summary, name='admin_summary'),
     path('', include(router.urls)),
 ]
 
@@ -1,9 +1,14 @@
+from django.http import JsonResponse
 from rest_framework import generics, status, viewsets
 from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from enterprisepro.async_views import async_api_view, run_concurrently
+from enterprisepro.tenancy import current_company_id
+from inventory.models import Product
+from sales.models import Customer, SalesOrder
 from .models import User
 from .serializers import UserSerializer, RegisterSerializer, UserCreateUpdateSerializer
 
@@ -22,6 +27,8 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     def get_token(cls, user):
         token = super().get_token(user)
         token['role'] = user.role
+        # The company requests with this token are scoped to (see enterprisepro.tenancy)
+        token['company'] = user.company_id
         return token
 
 
@@ -48,6 +55,10 @@ class UserViewSet(viewsets.ModelViewSet):
     """ViewSet for user management (admin only)."""
     queryset = User.objects.all().order_by('-date_joined')
     permission_classes = [IsAdminUser]
+
+    def get_queryset(self):
+        """Users of the current company only."""
+        return super().get_queryset().filter(company_id=current_company_id())
     
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
@@ -70,3 +81,17 @@ class UserViewSet(viewsets.ModelViewSet):
         user.save()
         return Response({'status': 'user deactivated'})
 
+
+@async_api_view(IsAdminUser)
+async def admin_summary(request):
+    """User, order, product and customer counts for the admin dashboard in one round trip."""
+    users = User.objects.filter(company_id=current_company_id())
+    queries = {
+        'total_users': users.count,
+        'active_users': users.filter(is_active=True).count,
+        'admin_users': users.filter(role='admin').count,
+        'total_orders': SalesOrder.objects.count,
+        'total_products': Product.objects.filter(is_active=True).count,
+        'total_customers': Customer.objects.filter(is_active=True).count,
+    }
+    return JsonResponse(await run_concurrently(queries, user=request.user))
@@ -0,0 +1,29 @@
+from django.contrib import admin
+from .models import ArchivedInvoice, ArchivedSalesOrder, ArchivedSalesOrderItem
+
+
+class ArchivedSalesOrderItemInline(admin.TabularInline):
+    model = ArchivedSalesOrderItem
+    extra = 0
+    can_delete = False
+    raw_id_fields = ('product', 'warehouse')
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedSalesOrder)
+class ArchivedSalesOrderAdmin(admin.ModelAdmin):
+    list_display = ('order_number', 'customer', 'order_date', 'status', 'total_amount', 'archived_at')
+    list_filter = ('status',)
+    search_fields = ('order_number', 'customer__code', 'customer__name')
+    raw_id_fields = ('customer', 'created_by')
+    inlines = [ArchivedSalesOrderItemInline]
+
+
+@admin.register(ArchivedInvoice)
+class ArchivedInvoiceAdmin(admin.ModelAdmin):
+    list_display = ('invoice_number', 'sales_order', 'invoice_date', 'status', 'total_amount', 'archived_at')
+    list_filter = ('status',)
+    search_fields = ('invoice_number',)
+    raw_id_fields = ('sales_order',)
@@ -0,0 +1,161 @@
+"""
+Archival of closed sales documents.
+
+Sales orders that are ``invoiced`` or ``cancelled`` move to the archive
+tables together with their lines and their invoice, once the order and a
+``paid`` or ``cancelled`` invoice were last changed more than
+``ARCHIVE_AFTER_DAYS`` ago. The hot tables then only hold open and recent
+documents, however long the history grows.
+
+Rows keep their ids. Ledger entries, payments, bank statement lines and
+audit log entries still refer to them: those foreign keys carry no
+database constraint, and ``ArchiveFallbackMixin`` serves archived rows on
+retrieve. Stock reservations of archived orders, long consumed, released
+or expired, are deleted; orders still holding an active one are skipped.
+
+Each batch of orders is one transaction. The orders are locked, skipping
+rows another transaction holds. They are copied to the archive, their
+lines and invoice are moved with ``DELETE ... RETURNING``, and then the
+orders are deleted. The moves skip model signals. Archived orders stay in
+customer statistics (``sales.stats`` reads the archive on rebuild). They
+were closed, so credit exposure does not change, and the change feeds
+report no tombstones for them.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from enterprisepro.tenancy import current_company_id
+from finance.models import Invoice
+from sales.models import SalesOrder, SalesOrderItem, StockReservation
+from .models import ArchivedInvoice, ArchivedSalesOrder, ArchivedSalesOrderItem
+
+CLOSED_ORDER_STATUSES = ['invoiced', 'cancelled']
+CLOSED_INVOICE_STATUSES = ['paid', 'cancelled']
+# The dashboard's year-to-date revenue reads hot invoices only
+MIN_AGE_DAYS = 366
+
+
+def archive_documents(older_than_days=None, batch_size=None, progress=None):
+    """Move closed orders and invoices older than ``older_than_days`` to the archive; return counts."""
+    days = settings.ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+    if days < MIN_AGE_DAYS:
+        raise ValueError(f'Documents must be at least {MIN_AGE_DAYS} days old to be archived, not {days}.')
+    cutoff = timezone.now() - timedelta(days=days)
+
+    total = SalesOrder.objects.filter(status__in=CLOSED_ORDER_STATUSES, updated_at__lt=cutoff).count()
+    moved = Counter()
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            pks = _lock_batch(cutoff, last_pk, batch_size)
+            if not pks:
+                break
+            last_pk = pks[-1]
+            moved.update(_move(_drop_reopened(pks, cutoff)))
+        if progress is not None:
+            progress(min(moved['orders'], total), total)
+    return {
+        'orders': moved['orders'],
+        'items': moved['items'],
+        'invoices': moved['invoices'],
+        'reservations': moved['reservations'],
+    }
+
+
+def _lock_batch(cutoff, last_pk, batch_size):
+    """Lock the next closed orders (of the current company, if any) whose invoice, if any, is closed too."""
+    # Raw SQL bypasses the company scoping of the managers, as counted in ``total``
+    company = current_company_id()
+    company_filter = 'AND header.company_id = %s' if company is not None else ''
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT header.id FROM {SalesOrder._meta.db_table} header
+            WHERE header.status = ANY(%s) AND header.updated_at < %s AND header.id > %s {company_filter}
+              AND NOT EXISTS (
+                  SELECT 1 FROM {Invoice._meta.db_table} invoice
+                  WHERE invoice.sales_order_id = header.id
+                    AND NOT (invoice.status = ANY(%s) AND invoice.updated_at < %s)
+              )
+              AND NOT EXISTS (
+                  SELECT 1 FROM {StockReservation._meta.db_table} reservation
+                  WHERE reservation.sales_order_id = header.id AND reservation.status = 'active'
+              )
+            ORDER BY header.id
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+            """,
+            [CLOSED_ORDER_STATUSES, cutoff, last_pk]
+            + ([company] if company is not None else [])
+            + [CLOSED_INVOICE_STATUSES, cutoff, batch_size],
+        )
+        return [pk for pk, in cursor.fetchall()]
+
+
+def _drop_reopened(pks, cutoff):
+    """Lock the orders' invoices and leave out orders whose invoice changed since the batch was read."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT sales_order_id, status = ANY(%s) AND updated_at < %s FROM {Invoice._meta.db_table}
+            WHERE sales_order_id = ANY(%s)
+            ORDER BY id
+            FOR UPDATE
+            """,
+            [CLOSED_INVOICE_STATUSES, cutoff, pks],
+        )
+        reopened = {pk for pk, closed in cursor.fetchall() if not closed}
+    return [pk for pk in pks if pk not in reopened]
+
+
+def _move(pks):
+    if not pks:
+        return {}
+    now = timezone.now()
+    order_columns = _columns(ArchivedSalesOrder)
+    item_columns = _columns(ArchivedSalesOrderItem)
+    invoice_columns = _columns(ArchivedInvoice)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {ArchivedSalesOrder._meta.db_table} ({order_columns}, archived_at)
+            SELECT {order_columns}, %s FROM {SalesOrder._meta.db_table} WHERE id = ANY(%s)
+            """,
+            [now, pks],
+        )
+        orders = cursor.rowcount
+        cursor.execute(
+            f"""
+            WITH moved AS (
+                DELETE FROM {SalesOrderItem._meta.db_table} WHERE sales_order_id = ANY(%s) RETURNING {item_columns}
+            )
+            INSERT INTO {ArchivedSalesOrderItem._meta.db_table} ({item_columns}) SELECT {item_columns} FROM moved
+            """,
+            [pks],
+        )
+        items = cursor.rowcount
+        cursor.execute(
+            f"""
+            WITH moved AS (
+                DELETE FROM {Invoice._meta.db_table} WHERE sales_order_id = ANY(%s) RETURNING {invoice_columns}
+            )
+            INSERT INTO {ArchivedInvoice._meta.db_table} ({invoice_columns}, archived_at)
+            SELECT {invoice_columns}, %s FROM moved
+            """,
+            [pks, now],
+        )
+        invoices = cursor.rowcount
+        cursor.execute(f'DELETE FROM {StockReservation._meta.db_table} WHERE sales_order_id = ANY(%s)', [pks])
+        reservations = cursor.rowcount
+        cursor.execute(f'DELETE FROM {SalesOrder._meta.db_table} WHERE id = ANY(%s)', [pks])
+    return {'orders': orders, 'items': items, 'invoices': invoices, 'reservations': reservations}
+
+
+def _columns(model):
+    """The archive model's columns shared with its hot table."""
+    return ', '.join(field.column for field in model._meta.concrete_fields if field.name != 'archived_at')
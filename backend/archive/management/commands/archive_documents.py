@@ -0,0 +1,34 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import CommandError
+
+from archive.archiver import archive_documents
+from enterprisepro.tenancy import CompanyCommand
+
+
+class Command(CompanyCommand):
+    help = 'Move invoiced/cancelled sales orders with their lines and closed invoices to the archive tables.'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--older-than-days', type=int, default=settings.ARCHIVE_AFTER_DAYS,
+            help='Archive documents last changed more than this many days ago (default: ARCHIVE_AFTER_DAYS).',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.ARCHIVE_BATCH_SIZE,
+            help='Orders moved per transaction.',
+        )
+
+    def handle_company(self, company, **options):
+        started = time.monotonic()
+        try:
+            result = archive_documents(options['older_than_days'], options['batch_size'])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(
+            f"{company.code}: archived {result['orders']} orders ({result['items']} lines), "
+            f"{result['invoices']} invoices and deleted {result['reservations']} stock reservations "
+            f"in {time.monotonic() - started:.1f}s."
+        )
@@ -0,0 +1,83 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:03
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('inventory', '0008_abc_xyz_classification'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('sales', '0011_customer_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedSalesOrder',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('order_number', models.CharField(db_index=True, max_length=50)),
+                ('order_date', models.DateField()),
+                ('status', models.CharField(max_length=20)),
+                ('total_amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('notes', models.TextField(blank=True)),
+                ('allocation_policy', models.CharField(blank=True, max_length=20)),
+                ('idempotency_key', models.CharField(blank=True, max_length=100, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField()),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_orders', to='sales.customer')),
+            ],
+            options={
+                'ordering': ['-order_date', '-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedSalesOrderItem',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('quantity', models.IntegerField()),
+                ('unit_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('line_total', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('auto_allocated', models.BooleanField(default=False)),
+                ('cost_amount', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='inventory.product')),
+                ('sales_order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='archive.archivedsalesorder')),
+                ('warehouse', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='inventory.warehouse')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedInvoice',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('invoice_number', models.CharField(db_index=True, max_length=50)),
+                ('invoice_date', models.DateField()),
+                ('due_date', models.DateField()),
+                ('status', models.CharField(max_length=20)),
+                ('total_amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('tax_amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('amount_paid', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('notes', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField()),
+                ('sales_order', models.OneToOneField(on_delete=django.db.models.deletion.PROTECT, related_name='invoice', to='archive.archivedsalesorder')),
+            ],
+            options={
+                'ordering': ['-invoice_date', '-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedsalesorder',
+            index=models.Index(fields=['customer', '-order_date'], name='archivedorder_customer_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+import enterprisepro.tenancy
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_companies'),
+        ('archive', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedinvoice',
+            name='company',
+            field=models.ForeignKey(default=enterprisepro.tenancy.current_company_id, null=True, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.company'),
+        ),
+        migrations.AddField(
+            model_name='archivedsalesorder',
+            name='company',
+            field=models.ForeignKey(default=enterprisepro.tenancy.current_company_id, null=True, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.company'),
+        ),
+        enterprisepro.tenancy.fill_company('archive', 'archivedinvoice', 'archivedsalesorder'),
+        migrations.AlterField(
+            model_name='archivedinvoice',
+            name='company',
+            field=models.ForeignKey(default=enterprisepro.tenancy.current_company_id, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.company'),
+        ),
+        migrations.AlterField(
+            model_name='archivedsalesorder',
+            name='company',
+            field=models.ForeignKey(default=enterprisepro.tenancy.current_company_id, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.company'),
+        ),
+    ]
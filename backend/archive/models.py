@@ -0,0 +1,75 @@
+from django.db import models
+from enterprisepro.tenancy import TenantManager, TenantModel
+from sales.models import Customer
+
+
+class ArchivedSalesOrder(TenantModel):
+    """A closed sales order moved out of ``sales_salesorder`` (see archive.archiver); same id."""
+    id = models.BigIntegerField(primary_key=True)
+    order_number = models.CharField(max_length=50, db_index=True)
+    customer = models.ForeignKey(Customer, on_delete=models.PROTECT, related_name='archived_orders')
+    order_date = models.DateField()
+    status = models.CharField(max_length=20)
+    total_amount = models.DecimalField(max_digits=12, decimal_places=2)
+    notes = models.TextField(blank=True)
+    created_by = models.ForeignKey('accounts.User', on_delete=models.PROTECT, related_name='+')
+    allocation_policy = models.CharField(max_length=20, blank=True)
+    idempotency_key = models.CharField(max_length=100, null=True, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-order_date', '-created_at']
+        indexes = [
+            models.Index(fields=['customer', '-order_date'], name='archivedorder_customer_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.order_number} (archived)"
+
+
+class ArchivedSalesOrderItem(models.Model):
+    """A line of an archived sales order; same id."""
+    id = models.BigIntegerField(primary_key=True)
+    sales_order = models.ForeignKey(ArchivedSalesOrder, on_delete=models.CASCADE, related_name='items')
+    product = models.ForeignKey('inventory.Product', on_delete=models.PROTECT, related_name='+')
+    warehouse = models.ForeignKey('inventory.Warehouse', on_delete=models.PROTECT, related_name='+')
+    quantity = models.IntegerField()
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2)
+    line_total = models.DecimalField(max_digits=12, decimal_places=2)
+    auto_allocated = models.BooleanField(default=False)
+    cost_amount = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    created_at = models.DateTimeField()
+
+    objects = TenantManager()
+    tenant_lookup = 'sales_order__company'
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"{self.sales_order.order_number} - {self.product_id} x{self.quantity}"
+
+
+class ArchivedInvoice(TenantModel):
+    """A paid or cancelled invoice archived with its sales order; same id."""
+    id = models.BigIntegerField(primary_key=True)
+    invoice_number = models.CharField(max_length=50, db_index=True)
+    sales_order = models.OneToOneField(ArchivedSalesOrder, on_delete=models.PROTECT, related_name='invoice')
+    invoice_date = models.DateField()
+    due_date = models.DateField()
+    status = models.CharField(max_length=20)
+    total_amount = models.DecimalField(max_digits=12, decimal_places=2)
+    tax_amount = models.DecimalField(max_digits=12, decimal_places=2)
+    amount_paid = models.DecimalField(max_digits=12, decimal_places=2)
+    notes = models.TextField(blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-invoice_date', '-created_at']
+
+    def __str__(self):
+        return f"{self.invoice_number} (archived)"
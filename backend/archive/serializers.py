@@ -0,0 +1,37 @@
+from rest_framework import serializers
+from .models import ArchivedInvoice, ArchivedSalesOrder, ArchivedSalesOrderItem
+
+
+class ArchivedSalesOrderItemSerializer(serializers.ModelSerializer):
+    """Serializer for ArchivedSalesOrderItem, shaped like SalesOrderItemSerializer."""
+    product_name = serializers.CharField(source='product.name', read_only=True)
+    product_sku = serializers.CharField(source='product.sku', read_only=True)
+    warehouse_name = serializers.CharField(source='warehouse.name', read_only=True)
+
+    class Meta:
+        model = ArchivedSalesOrderItem
+        exclude = ('sales_order',)
+
+
+class ArchivedSalesOrderSerializer(serializers.ModelSerializer):
+    """Serializer for ArchivedSalesOrder, shaped like SalesOrderSerializer."""
+    items = ArchivedSalesOrderItemSerializer(many=True, read_only=True)
+    customer_name = serializers.CharField(source='customer.name', read_only=True)
+    customer_code = serializers.CharField(source='customer.code', read_only=True)
+    created_by_username = serializers.CharField(source='created_by.username', read_only=True)
+    archived = serializers.BooleanField(default=True, read_only=True)
+
+    class Meta:
+        model = ArchivedSalesOrder
+        fields = '__all__'
+
+
+class ArchivedInvoiceSerializer(serializers.ModelSerializer):
+    """Serializer for ArchivedInvoice, shaped like InvoiceSerializer."""
+    sales_order_number = serializers.CharField(source='sales_order.order_number', read_only=True)
+    customer_name = serializers.CharField(source='sales_order.customer.name', read_only=True)
+    archived = serializers.BooleanField(default=True, read_only=True)
+
+    class Meta:
+        model = ArchivedInvoice
+        fields = '__all__'
@@ -0,0 +1,25 @@
+from django.http import Http404
+from rest_framework import status
+from rest_framework.response import Response
+
+
+class ArchiveFallbackMixin:
+    """
+    Serves ``retrieve`` from the archive for rows moved there by
+    ``archive.archiver``, so links by id (ledger entries, payments, audit
+    logs) keep working. Set ``archive_queryset`` and
+    ``archive_serializer_class``. Archived rows are read-only.
+    """
+    archive_queryset = None
+    archive_serializer_class = None
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            pk = str(kwargs.get(self.lookup_url_kwarg or self.lookup_field, ''))
+            archived = self.archive_queryset.filter(pk=pk).first() if pk.isdigit() else None
+            if archived is None:
+                raise
+        serializer = self.archive_serializer_class(archived, context=self.get_serializer_context())
+        return Response(serializer.data, status=status.HTTP_200_OK)
@@ -2,6 +2,7 @@ from django.db import models
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericForeignKey
 from accounts.models import User
+from enterprisepro.tenancy import TenantManager, current_company_id
 
 
 class AuditLog(models.Model):
@@ -17,6 +18,10 @@ class AuditLog(models.Model):
         ('print', 'Print'),
     ]
 
+    company = models.ForeignKey(
+        'accounts.Company', on_delete=models.PROTECT, null=True, blank=True, related_name='+', editable=False,
+        default=current_company_id,
+    )
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='audit_logs')
     action = models.CharField(max_length=20, choices=ACTION_CHOICES)
     model_name = models.CharField(max_length=100)  # e.g., 'SalesOrder', 'Product'
@@ -28,10 +33,13 @@ class AuditLog(models.Model):
     timestamp = models.DateTimeField(auto_now_add=True)
     notes = models.TextField(blank=True)
 
+    objects = TenantManager()
+    tenant_lookup = 'company'
+
     class Meta:
         ordering = ['-timestamp']
         indexes = [
-            models.Index(fields=['-timestamp']),
+            models.Index(fields=['company', '-timestamp'], name='auditlog_company_idx'),
             models.Index(fields=['user', '-timestamp']),
             models.Index(fields=['model_name', '-timestamp']),
             models.Index(fields=['action', '-timestamp']),
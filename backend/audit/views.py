@@ -1,10 +1,12 @@
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
+from enterprisepro.db_router import ReplicaReadMixin
+from enterprisepro.projection import ProjectedListMixin
 from .models import AuditLog
 from .serializers import AuditLogSerializer
 
 
-class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
+class AuditLogViewSet(ReplicaReadMixin, ProjectedListMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet for AuditLog read operations (admin only)."""
     queryset = AuditLog.objects.select_related('user').all()
     serializer_class = AuditLogSerializer
@@ -0,0 +1,109 @@
+"""
+Helpers for async (ASGI) report views that fan out independent queries.
+
+Django 4.2's async ORM funnels every query through one thread and one
+connection, so independent aggregates would still run back to back.
+``run_concurrently`` instead runs each query on a bounded thread pool; every
+worker thread owns its own database connection, which caps the number of
+connections report views can hold at ``ASYNC_QUERY_CONCURRENCY``.
+"""
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import close_old_connections
+from django.http import JsonResponse
+from rest_framework import exceptions
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.settings import api_settings
+
+from .db_router import is_pinned_to_primary, use_read_replica
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_QUERY_CONCURRENCY,
+    thread_name_prefix='report-query',
+)
+
+
+def _run_query(query, use_replica):
+    # Worker threads live outside the request cycle, so apply
+    # CONN_MAX_AGE/CONN_HEALTH_CHECKS to their connections by hand
+    close_old_connections()
+    try:
+        if use_replica:
+            with use_read_replica():
+                return query()
+        return query()
+    finally:
+        close_old_connections()
+
+
+async def run_concurrently(queries, user=None):
+    """
+    Run a ``{name: callable}`` mapping of blocking ORM queries concurrently
+    and return ``{name: result}``. Reads go to a replica unless ``user`` is
+    pinned to the primary after a recent write.
+    """
+    loop = asyncio.get_running_loop()
+    use_replica = not is_pinned_to_primary(user)
+    futures = [
+        loop.run_in_executor(
+            _executor, contextvars.copy_context().run, _run_query, query, use_replica
+        )
+        for query in queries.values()
+    ]
+    results = await asyncio.gather(*futures)
+    return dict(zip(queries, results))
+
+
+def _check_access(request, permission_classes):
+    """Authenticate like a DRF view; return an error response or None."""
+    # Like DRF's Request: the session user set by AuthenticationMiddleware
+    # does not count unless an authentication class accepts the request
+    request.user, request.auth = AnonymousUser(), None
+    try:
+        for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+            result = authentication_class().authenticate(request)
+            if result is not None:
+                request.user, request.auth = result
+                break
+    except exceptions.AuthenticationFailed as exc:
+        return JsonResponse({'detail': str(exc.detail)}, status=401)
+
+    for permission_class in permission_classes:
+        if not permission_class().has_permission(request, None):
+            if not request.user.is_authenticated:
+                return JsonResponse(
+                    {'detail': 'Authentication credentials were not provided.'}, status=401
+                )
+            return JsonResponse(
+                {'detail': 'You do not have permission to perform this action.'}, status=403
+            )
+    return None
+
+
+def async_api_view(*permission_classes):
+    """
+    Wrap an async GET view with the project's DRF authentication classes
+    and the given permission classes (``IsAuthenticated`` by default).
+    """
+    permission_classes = permission_classes or (IsAuthenticated,)
+
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method != 'GET':
+                return JsonResponse(
+                    {'detail': f'Method "{request.method}" not allowed.'}, status=405
+                )
+            # Authentication and permission checks may touch the database
+            denied = await sync_to_async(_check_access)(request, permission_classes)
+            if denied is not None:
+                return denied
+            return await view(request, *args, **kwargs)
+        return wrapper
+    return decorator
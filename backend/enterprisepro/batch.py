@@ -0,0 +1,181 @@
+"""
+Transactional batch endpoint: run several API operations in one request.
+
+Example body::
+
+    {"operations": [
+        {"id": "cust", "method": "POST", "path": "/api/v1/sales/customers/",
+         "body": {"code": "C-100", "name": "Acme"}},
+        {"id": "order", "method": "POST", "path": "/api/v1/sales/orders/",
+         "body": {"customer": "$cust.id", "order_date": "2024-01-15", "items": [...]}},
+        {"method": "POST", "path": "/api/v1/sales/orders/$order.id/confirm/"}
+    ]}
+
+``$<operation id>.<field>`` refers to a field of an earlier operation's
+response. All operations share one transaction and the caller's already
+authenticated user; the first failure rolls everything back.
+"""
+import asyncio
+import io
+import json
+import re
+
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from rest_framework import serializers, status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.views import APIView
+
+REFERENCE_RE = re.compile(r'\$(\w+)\.(\w+)')
+
+
+class BatchError(Exception):
+    """An operation could not be prepared (bad path or reference)."""
+
+
+class _Rollback(Exception):
+    """Raised inside the batch transaction to undo it after a failed operation."""
+    def __init__(self, index):
+        self.index = index
+
+
+class BatchOperationSerializer(serializers.Serializer):
+    """A single operation within a batch request."""
+    id = serializers.CharField(required=False, max_length=50)
+    method = serializers.ChoiceField(choices=['GET', 'POST', 'PUT', 'PATCH', 'DELETE'])
+    path = serializers.CharField(max_length=500)
+    body = serializers.JSONField(required=False)
+
+
+class BatchRequestSerializer(serializers.Serializer):
+    """Serializer for the batch request envelope."""
+    operations = BatchOperationSerializer(many=True)
+
+    def validate_operations(self, value):
+        if not value:
+            raise serializers.ValidationError("A batch must contain at least one operation.")
+        if len(value) > settings.BATCH_MAX_OPERATIONS:
+            raise serializers.ValidationError(
+                f"A batch may contain at most {settings.BATCH_MAX_OPERATIONS} operations."
+            )
+        ids = [op['id'] for op in value if 'id' in op]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError("Operation ids must be unique.")
+        return value
+
+
+class BatchView(APIView):
+    """Execute an ordered list of operations in a single database transaction."""
+
+    def post(self, request):
+        serializer = BatchRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = []
+        outputs = {}
+        try:
+            with transaction.atomic():
+                for index, operation in enumerate(serializer.validated_data['operations']):
+                    try:
+                        response = self._execute(request, operation, outputs)
+                    except BatchError as exc:
+                        response = Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+                    results.append({
+                        'id': operation.get('id'),
+                        'status': response.status_code,
+                        'body': response.data,
+                    })
+                    if response.status_code >= 400:
+                        raise _Rollback(index)
+                    if 'id' in operation:
+                        outputs[operation['id']] = response.data
+        except _Rollback as rollback:
+            return Response(
+                {
+                    'error': f'Operation {rollback.index} failed; no changes were saved.',
+                    'failed_operation': rollback.index,
+                    'results': results,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response({'results': results}, status=status.HTTP_200_OK)
+
+    def _execute(self, request, operation, outputs):
+        path = REFERENCE_RE.sub(lambda m: str(_dereference(m, outputs)), operation['path'])
+        body = _substitute(operation.get('body'), outputs)
+        path, _, query_string = path.partition('?')
+
+        if not path.startswith(tuple(settings.BATCH_ALLOWED_PREFIXES)):
+            raise BatchError(f'Path {path} is not available in batches.')
+        try:
+            match = resolve(path)
+        except Resolver404:
+            raise BatchError(f'No endpoint matches {path}.')
+        if asyncio.iscoroutinefunction(match.func):
+            raise BatchError(f'Path {path} is not available in batches.')
+
+        sub_request = _build_request(request, operation['method'], path, query_string, body)
+        sub_request.resolver_match = match
+        try:
+            return match.func(sub_request, *match.args, **match.kwargs)
+        except ValueError as exc:
+            # Views such as fulfill signal business errors by raising ValueError
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+def _dereference(match, outputs):
+    ref, field = match.groups()
+    if ref not in outputs:
+        raise BatchError(f'Unknown reference ${ref}; it must name an earlier operation.')
+    data = outputs[ref]
+    if not isinstance(data, dict) or field not in data:
+        raise BatchError(f'Operation {ref} has no field "{field}".')
+    return data[field]
+
+
+def _substitute(value, outputs):
+    """Replace ``$ref.field`` strings anywhere inside a JSON body."""
+    if isinstance(value, dict):
+        return {key: _substitute(item, outputs) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_substitute(item, outputs) for item in value]
+    if isinstance(value, str):
+        whole = REFERENCE_RE.fullmatch(value)
+        if whole:
+            # Keep the referenced value's type (e.g. integer ids)
+            return _dereference(whole, outputs)
+        return REFERENCE_RE.sub(lambda m: str(_dereference(m, outputs)), value)
+    return value
+
+
+def _build_request(request, method, path, query_string, body):
+    """
+    Build an in-process request that reuses the batch request's
+    authentication instead of decoding the JWT again.
+    """
+    payload = json.dumps(body, cls=JSONEncoder).encode() if body is not None else b''
+    django_request = request._request
+
+    sub_request = HttpRequest()
+    sub_request.method = method
+    sub_request.path = sub_request.path_info = path
+    sub_request.META = {
+        **django_request.META,
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': query_string,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(payload)),
+    }
+    sub_request.GET = QueryDict(query_string)
+    sub_request._stream = io.BytesIO(payload)
+    sub_request._read_started = False
+    sub_request.user = request.user
+    # Picked up by rest_framework.request.Request (ForcedAuthentication)
+    sub_request._force_auth_user = request.user
+    sub_request._force_auth_token = request.auth
+    return sub_request
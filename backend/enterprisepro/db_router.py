@@ -0,0 +1,152 @@
+"""
+Read-replica database routing.
+
+Replicas are configured as ``replica_<n>`` aliases in ``DATABASES`` (see
+``DB_REPLICAS`` in settings). Nothing is read from a replica unless a view
+opts in with ``ReplicaReadMixin`` or code runs inside ``use_read_replica()``;
+all writes and migrations always go to ``default``.
+"""
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+
+logger = logging.getLogger(__name__)
+
+_read_alias = ContextVar('read_alias', default=None)
+
+_health = {}
+_health_lock = threading.Lock()
+
+LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+class ReplicaRouter:
+    """Route reads to the replica chosen for the current request, if any."""
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias.startswith('replica_')]
+
+
+def _replication_lag(alias):
+    """Return the replica's lag in seconds, or None if it is unreachable."""
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute(LAG_SQL)
+            return float(cursor.fetchone()[0])
+    except DatabaseError:
+        logger.warning('Read replica %s is unreachable', alias, exc_info=True)
+        connections[alias].close()
+        return None
+
+
+def is_replica_healthy(alias):
+    """
+    Check reachability and replication lag, caching the result for
+    ``REPLICA_HEALTH_CHECK_INTERVAL`` seconds per process.
+    """
+    now = time.monotonic()
+    checked_at, healthy = _health.get(alias, (None, False))
+    if checked_at is not None and now - checked_at < settings.REPLICA_HEALTH_CHECK_INTERVAL:
+        return healthy
+
+    with _health_lock:
+        lag = _replication_lag(alias)
+        healthy = lag is not None and lag <= settings.REPLICA_MAX_LAG_SECONDS
+        if lag is not None and not healthy:
+            logger.warning('Read replica %s is %.1fs behind; using primary', alias, lag)
+        _health[alias] = (now, healthy)
+    return healthy
+
+
+def choose_replica():
+    """Pick a healthy replica alias at random, or None to use the primary."""
+    candidates = [alias for alias in replica_aliases() if is_replica_healthy(alias)]
+    return random.choice(candidates) if candidates else None
+
+
+def _pin_key(user):
+    return f'replica-pin:{user.pk}'
+
+
+def pin_to_primary(user):
+    """
+    Send ``user``'s reads to the primary for ``REPLICA_PIN_SECONDS``. The pin
+    is kept in the ``shared`` cache, so it holds whichever worker process
+    serves the next read. Without replicas there is nothing to pin.
+    """
+    if replica_aliases() and user is not None and user.is_authenticated:
+        caches['shared'].set(_pin_key(user), True, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned_to_primary(user):
+    return (
+        bool(replica_aliases()) and user is not None and user.is_authenticated
+        and bool(caches['shared'].get(_pin_key(user)))
+    )
+
+
+@contextmanager
+def use_read_replica():
+    """Route ORM reads inside the block to a healthy replica, if one exists."""
+    token = _read_alias.set(choose_replica())
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+class ReplicaReadMixin:
+    """
+    Serve ``replica_actions`` (safe methods only) from a read replica.
+
+    Falls back to the primary when no replica is healthy, the user wrote
+    something within the last ``REPLICA_PIN_SECONDS``, or the request runs
+    inside an open transaction (e.g. as part of a batch) whose writes a
+    replica could not see yet.
+    """
+    replica_actions = ('list', 'retrieve')
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (
+            self.action in self.replica_actions
+            and request.method in SAFE_METHODS
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+            and not is_pinned_to_primary(request.user)
+        ):
+            self._replica_token = _read_alias.set(choose_replica())
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_replica_token', None)
+        if token is not None:
+            _read_alias.reset(token)
+            self._replica_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
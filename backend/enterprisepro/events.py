@@ -0,0 +1,209 @@
+"""
+Server-push events (Server-Sent Events over the ASGI app).
+
+Model signals call ``publish()`` once their transaction commits. The
+configured broker delivers each event to every web process, and the
+process-local ``hub`` fans it out to connected streams, each filtered by
+the subscriber's company and role:
+
+* ``inprocess`` (default) delivers straight to this process's hub, which
+  is enough for a single worker.
+* ``postgres`` sends events with ``pg_notify`` and runs one ``LISTEN``
+  thread per process, so every worker's subscribers see every event with
+  no broker beyond the database.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from functools import wraps
+
+import psycopg2
+from django.conf import settings
+from django.db import connection, transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.utils.encoders import JSONEncoder
+
+from .async_views import async_api_view
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'erp_events'
+
+
+class _Subscriber:
+    def __init__(self, loop, user, topics):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=settings.EVENTS_QUEUE_SIZE)
+        self.company = user.company_id
+        self.role = 'admin' if user.is_superuser else user.role
+        self.topics = topics
+
+    def wants(self, event):
+        if event['company'] != self.company or self.role not in event['roles']:
+            return False
+        return not self.topics or event['type'].split('.')[0] in self.topics
+
+    def deliver(self, event):
+        # Runs on the subscriber's event loop
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            logger.warning('Dropping %s event for a slow event stream', event['type'])
+
+
+class EventHub:
+    """Process-local fan-out from the broker to connected streams."""
+
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, user, topics=()):
+        subscriber = _Subscriber(asyncio.get_running_loop(), user, set(topics))
+        with self._lock:
+            self._subscribers.add(subscriber)
+        broker.ensure_listening()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def dispatch(self, event):
+        """Hand ``event`` to every interested subscriber; safe from any thread."""
+        with self._lock:
+            subscribers = [s for s in self._subscribers if s.wants(event)]
+        for subscriber in subscribers:
+            subscriber.loop.call_soon_threadsafe(subscriber.deliver, event)
+
+
+hub = EventHub()
+
+
+class InProcessBroker:
+    """Delivers events to this process only."""
+
+    def publish(self, event):
+        hub.dispatch(event)
+
+    def ensure_listening(self):
+        pass
+
+
+class PostgresBroker:
+    """Delivers events to every process through PostgreSQL LISTEN/NOTIFY."""
+
+    def __init__(self):
+        self._listener = None
+        self._lock = threading.Lock()
+
+    def publish(self, event):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [CHANNEL, json.dumps(event, cls=JSONEncoder)])
+
+    def ensure_listening(self):
+        with self._lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(target=self._listen, name='event-listener', daemon=True)
+                self._listener.start()
+
+    def _listen(self):
+        db = settings.DATABASES['default']
+        while True:
+            listener = None
+            try:
+                listener = psycopg2.connect(
+                    dbname=db['NAME'], user=db['USER'], password=db['PASSWORD'],
+                    host=db['HOST'], port=db['PORT'],
+                )
+                listener.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with listener.cursor() as cursor:
+                    cursor.execute(f'LISTEN {CHANNEL}')
+                while True:
+                    if select.select([listener], [], [], 30) == ([], [], []):
+                        continue
+                    listener.poll()
+                    while listener.notifies:
+                        self._dispatch(listener.notifies.pop(0).payload)
+            except psycopg2.Error:
+                logger.exception('Event listener lost its database connection; reconnecting')
+                time.sleep(5)
+            finally:
+                if listener is not None:
+                    listener.close()
+
+    @staticmethod
+    def _dispatch(payload):
+        """Deliver one notification; a bad one is logged and skipped."""
+        try:
+            hub.dispatch(json.loads(payload))
+        except Exception:
+            logger.exception('Could not dispatch event notification %.200s', payload)
+
+
+broker = PostgresBroker() if settings.EVENTS_BROKER == 'postgres' else InProcessBroker()
+
+
+def publish(event_type, data, roles, company):
+    """
+    Publish an event to subscribers of ``company`` (an id) whose role is in
+    ``roles`` once the current transaction commits (immediately outside a
+    transaction).
+    """
+    event = {
+        'type': event_type,
+        'company': company,
+        'data': data,
+        'roles': list(roles),
+        'timestamp': timezone.now().isoformat(),
+    }
+    transaction.on_commit(lambda: broker.publish(event))
+
+
+def _token_from_query(view):
+    """EventSource cannot send headers, so accept ``?access_token=`` too."""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        token = request.GET.get('access_token')
+        if token and 'HTTP_AUTHORIZATION' not in request.META:
+            request.META['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+@_token_from_query
+@async_api_view()
+async def event_stream(request):
+    """
+    Stream events as ``text/event-stream``. ``?topics=inventory,sales``
+    narrows the stream. Connections are closed after
+    ``EVENTS_STREAM_MAX_SECONDS`` and browsers reconnect automatically.
+    """
+    topics = [t for t in request.GET.get('topics', '').split(',') if t]
+    subscriber = hub.subscribe(request.user, topics)
+
+    async def stream():
+        deadline = time.monotonic() + settings.EVENTS_STREAM_MAX_SECONDS
+        try:
+            yield 'retry: 3000\n\n'
+            while time.monotonic() < deadline:
+                try:
+                    event = await asyncio.wait_for(
+                        subscriber.queue.get(), timeout=settings.EVENTS_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ': keepalive\n\n'
+                    continue
+                payload = {key: event[key] for key in ('type', 'data', 'timestamp')}
+                yield f"event: {event['type']}\ndata: {json.dumps(payload, cls=JSONEncoder)}\n\n"
+        finally:
+            hub.unsubscribe(subscriber)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
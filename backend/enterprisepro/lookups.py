@@ -0,0 +1,85 @@
+"""
+Compact lookup endpoints for dropdowns and autocomplete widgets.
+"""
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db.models import Q
+from django.utils.cache import patch_cache_control
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .tenancy import current_company_id
+
+
+def _version_key(model):
+    return f'lookup-version:{model._meta.label_lower}'
+
+
+def get_lookup_version(model):
+    """
+    Return the current cache generation for a model's lookup results, from
+    the ``shared`` cache so a bump reaches every worker process.
+    """
+    return caches['shared'].get_or_set(_version_key(model), 1, None)
+
+
+def bump_lookup_version(sender, **kwargs):
+    """Signal handler that invalidates every cached lookup for ``sender``."""
+    shared = caches['shared']
+    try:
+        shared.incr(_version_key(sender))
+    except ValueError:
+        shared.set(_version_key(sender), 1, None)
+
+
+class LookupMixin:
+    """
+    Adds a ``lookup`` list action returning ``{id, code, label}`` rows.
+
+    Rows are projected with ``values_list`` (no model instances, no
+    serializer) and filtered by a case-insensitive prefix match on the code
+    and label columns, which are backed by ``UPPER(col) text_pattern_ops``
+    indexes on the models.
+    """
+    lookup_code_field = 'code'
+    lookup_label_field = 'name'
+
+    def get_lookup_queryset(self):
+        return self.get_queryset()
+
+    @action(detail=False, methods=['get'])
+    def lookup(self, request):
+        """Return id/code/label rows, optionally filtered by ``?q=`` prefix."""
+        term = request.query_params.get('q', '').strip()
+        max_results = settings.LOOKUP_MAX_RESULTS
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', max_results)), max_results))
+        except ValueError:
+            return Response({'error': 'limit must be a whole number.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = self.get_lookup_queryset()
+        model = queryset.model
+        cache_key = 'lookup:{}:{}:{}:{}:{}'.format(
+            model._meta.label_lower, current_company_id(), get_lookup_version(model), limit, term.upper()
+        )
+        rows = cache.get(cache_key)
+        if rows is None:
+            code_field = self.lookup_code_field
+            label_field = self.lookup_label_field
+            if term:
+                queryset = queryset.filter(
+                    Q(**{f'{code_field}__istartswith': term})
+                    | Q(**{f'{label_field}__istartswith': term})
+                )
+            rows = [
+                {'id': pk, 'code': code, 'label': label}
+                for pk, code, label in queryset.order_by(code_field).values_list(
+                    'pk', code_field, label_field
+                )[:limit]
+            ]
+            cache.set(cache_key, rows, settings.LOOKUP_CACHE_TIMEOUT)
+
+        response = Response(rows)
+        patch_cache_control(response, private=True, max_age=settings.LOOKUP_CACHE_TIMEOUT)
+        return response
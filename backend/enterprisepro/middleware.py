@@ -0,0 +1,26 @@
+"""
+Project-wide middleware.
+"""
+from rest_framework.permissions import SAFE_METHODS
+
+from .db_router import pin_to_primary
+
+
+class ReadYourWritesMiddleware:
+    """
+    After a successful write, pin the user's reads to the primary database
+    for a short window so replica lag never hides their own changes.
+
+    DRF authenticates inside the view and copies the user back onto the
+    Django request, so ``request.user`` is populated by the time the
+    response passes through here.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_to_primary(getattr(request, 'user', None))
+        return response
@@ -0,0 +1,185 @@
+"""
+List responses built from ``values()`` projections.
+
+A serialized list builds a model instance per row, then walks every
+field's ``source`` through attributes (``sales_order.customer.name``).
+``ProjectedListMixin`` serves the ``list`` action from one ``values()``
+query instead: each readable serializer field becomes a column, dotted
+sources become joins in the same query, and each raw value goes through
+that field's own ``to_representation``, so the JSON is the serializer's
+byte for byte.
+
+Fields whose source is a model property are evaluated on the row when the
+serializer names the columns the property reads in
+``projected_properties``. Anything else a projection cannot reproduce
+(nested serializers, method fields, a custom ``to_representation``) raises
+``ImproperlyConfigured`` when the projection is built.
+"""
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from rest_framework import serializers
+from rest_framework.fields import empty
+from rest_framework.response import Response
+
+# A field whose source crosses an empty relation is left out of
+# the row, as Field.get_attribute does for read-only fields without a default
+_SKIP = object()
+
+
+class _Row(dict):
+    """A ``values()`` row whose columns model properties read as attributes."""
+    __getattr__ = dict.__getitem__
+
+
+def _same(value):
+    return value
+
+
+_STRINGS = ('CharField', 'TextField', 'EmailField', 'SlugField', 'URLField')
+_INTEGERS = (
+    'AutoField', 'BigAutoField', 'SmallAutoField', 'IntegerField', 'BigIntegerField', 'SmallIntegerField',
+    'PositiveIntegerField', 'PositiveBigIntegerField', 'PositiveSmallIntegerField',
+)
+# Serializer fields whose to_representation returns these model fields' values unchanged
+_UNCHANGED = {
+    serializers.CharField: _STRINGS,
+    serializers.EmailField: _STRINGS,
+    serializers.SlugField: _STRINGS,
+    serializers.URLField: _STRINGS,
+    serializers.IntegerField: _INTEGERS,
+    serializers.BooleanField: ('BooleanField',),
+}
+
+
+class RowProjection:
+    """The columns a serializer reads and how each becomes its JSON value."""
+
+    def __init__(self, serializer):
+        serializer_class = type(serializer)
+        if serializer_class.to_representation is not serializers.Serializer.to_representation:
+            raise ImproperlyConfigured(f'{serializer_class.__name__} customizes to_representation.')
+        self.model = serializer.Meta.model
+        self.properties = getattr(serializer, 'projected_properties', {})
+        self.columns = set()
+        # (name, column, property getter, columns that are None when the source
+        # crosses an empty relation, the value then, to_representation or None)
+        self.fields = []
+        for field in serializer.fields.values():
+            if not field.write_only:
+                self.fields.append(self._plan(serializer_class, field))
+
+    def _plan(self, serializer_class, field):
+        name, attrs = field.field_name, field.source_attrs
+        unsupported = ImproperlyConfigured(f'{serializer_class.__name__}.{name} cannot be read from values().')
+        if isinstance(field, (serializers.BaseSerializer, serializers.ManyRelatedField, serializers.SerializerMethodField)):
+            raise unsupported
+
+        if len(attrs) == 1 and attrs[0] in self.properties:
+            self.columns.update(self.properties[attrs[0]])
+            getter = getattr(self.model, attrs[0]).fget
+            return name, None, getter, (), None, field.to_representation
+
+        resolved = self._resolve(attrs)
+        if resolved is None:
+            raise unsupported
+        column, guards, model_field = resolved
+        if len(attrs) > 1 and not model_field.null:
+            # Also None when the joined row is missing (a dangling db_constraint=False key)
+            guards += (column,)
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            if not model_field.is_relation:
+                raise unsupported
+            represent = field.pk_field.to_representation if field.pk_field is not None else _same
+        elif isinstance(field, serializers.RelatedField) or model_field.is_relation:
+            raise unsupported
+        else:
+            represent = self._representation(field, model_field)
+
+        if field.default is not empty:
+            missing = field.get_default()
+        elif field.allow_null:
+            missing = None
+        else:
+            missing = _SKIP
+        self.columns.add(column)
+        self.columns.update(guards)
+        return name, column, None, guards, missing, represent
+
+    @staticmethod
+    def _representation(field, model_field):
+        """``field.to_representation``, or None where it returns the column value unchanged."""
+        internal_type = model_field.get_internal_type()
+        if internal_type in _UNCHANGED.get(type(field), ()):
+            return None
+        if type(field) is serializers.ChoiceField and internal_type in _STRINGS:
+            if all(isinstance(choice, str) for choice in field.choices):
+                return None
+        if type(field) is serializers.JSONField and not field.binary:
+            return None
+        if isinstance(field, serializers.DateTimeField) and not hasattr(field, 'timezone'):
+            # Looked up once per list instead of once per value
+            field.timezone = field.default_timezone()
+        return field.to_representation
+
+    def _resolve(self, attrs):
+        """
+        The ``values()`` column of a source path and the columns of the
+        nullable relations it crosses, or None if it is not a column.
+        """
+        model, path, guards = self.model, [], []
+        for index, attr in enumerate(attrs):
+            try:
+                model_field = model._meta.pk if attr == 'pk' else model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                return None
+            if not model_field.concrete or model_field.many_to_many:
+                return None
+            path.append(model_field.name)
+            if index == len(attrs) - 1:
+                break
+            if not model_field.is_relation:
+                return None
+            if model_field.null:
+                guards.append('__'.join(path))
+            model = model_field.related_model
+        return '__'.join(path), tuple(guards), model_field
+
+    def project(self, queryset):
+        """``queryset`` as rows of the projected columns."""
+        return queryset.prefetch_related(None).values(*sorted(self.columns))
+
+    def represent(self, rows):
+        """The serializer's representation of ``project()`` rows."""
+        data = []
+        for values in rows:
+            if self.properties:
+                values = _Row(values)
+            row = {}
+            for name, column, getter, guards, missing, represent in self.fields:
+                if getter is not None:
+                    value = getter(values)
+                elif guards and any(values[guard] is None for guard in guards):
+                    if missing is _SKIP:
+                        continue
+                    value = missing
+                else:
+                    value = values[column]
+                row[name] = value if value is None or represent is None else represent(value)
+            data.append(row)
+        return data
+
+
+class ProjectedListMixin:
+    """
+    Serves the ``list`` action from ``values()`` rows (see the module
+    docstring) instead of serialized model instances.
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        projection = RowProjection(self.get_serializer())
+        rows = projection.project(queryset)
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(projection.represent(page))
+        return Response(projection.represent(rows))
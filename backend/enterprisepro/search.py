@@ -0,0 +1,48 @@
+"""
+Ranked search backend built on PostgreSQL full-text vectors and pg_trgm.
+"""
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+from rest_framework.filters import SearchFilter
+
+SEARCH_CONFIG = 'simple'
+
+
+class RankedSearchFilter(SearchFilter):
+    """
+    ``?search=`` filter that matches a view's ``search_vector_field`` (GIN
+    indexed tsvector kept current by database triggers) and its
+    ``search_trigram_fields`` (GIN ``gin_trgm_ops`` indexes, fuzzy word
+    matching), then orders results by the best of the two scores.
+
+    Views that only declare ``search_fields`` keep DRF's default behaviour.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        vector_field = getattr(view, 'search_vector_field', None)
+        trigram_fields = getattr(view, 'search_trigram_fields', ())
+        if not vector_field and not trigram_fields:
+            return super().filter_queryset(request, queryset, view)
+
+        term = request.query_params.get(self.search_param, '').replace('\x00', '').strip()
+        if not term:
+            return queryset
+
+        conditions = Q()
+        scores = []
+        if vector_field:
+            query = SearchQuery(term, config=SEARCH_CONFIG, search_type='websearch')
+            conditions |= Q(**{vector_field: query})
+            scores.append(SearchRank(F(vector_field), query))
+        for field in trigram_fields:
+            conditions |= Q(**{f'{field}__trigram_word_similar': term})
+            scores.append(TrigramWordSimilarity(term, field))
+
+        rank = Greatest(*scores) if len(scores) > 1 else scores[0]
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        return (
+            queryset.filter(conditions)
+            .annotate(search_rank=rank)
+            .order_by('-search_rank', *ordering)
+        )
@@ -0,0 +1,37 @@
+"""
+Shared serializer helpers.
+"""
+from rest_framework.validators import UniqueValidator
+
+
+def unique_in_company(model, field_name):
+    """
+    Validator for a field unique per company (a ``UniqueConstraint`` with
+    ``company``, which DRF does not check). The queryset is scoped to the
+    current company when the validator runs.
+    """
+    field = model._meta.get_field(field_name)
+    return UniqueValidator(
+        queryset=model.objects.all(),
+        message=f'{model._meta.verbose_name} with this {field.verbose_name} already exists.',
+    )
+
+
+class SparseFieldsMixin:
+    """
+    Lets GET requests trim the representation with ``?fields=a,b,c``.
+
+    Unknown names are ignored; write requests always use the full field set.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method != 'GET':
+            return
+        requested = request.query_params.get('fields')
+        if not requested:
+            return
+        allowed = {name.strip() for name in requested.split(',') if name.strip()}
+        for name in set(self.fields) - allowed:
+            self.fields.pop(name)
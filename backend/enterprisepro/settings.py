@@ -4,6 +4,7 @@ Django settings for enterprisepro project.
 import os
 from pathlib import Path
 from datetime import timedelta
+from corsheaders.defaults import default_headers
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -33,14 +34,19 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'corsheaders',
     'accounts',
     'inventory',
     'sales',
+    'purchasing',
     'finance',
     'audit',
+    'sync',
+    'jobs',
+    'archive',
 ]
 
 MIDDLEWARE = [
@@ -50,6 +56,8 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'enterprisepro.tenancy.TenantMiddleware',
+    'enterprisepro.middleware.ReadYourWritesMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -73,6 +81,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'enterprisepro.wsgi.application'
+ASGI_APPLICATION = 'enterprisepro.asgi.application'
 
 
 # Database
@@ -86,9 +95,127 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD', 'postgres'),
         'HOST': os.getenv('DB_HOST', 'localhost'),
         'PORT': os.getenv('DB_PORT', '5432'),
+        # Persistent connections, verified before reuse
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Read replicas, e.g. DB_REPLICAS=replica1:5432,replica2:5432
+# Each becomes a "replica_<n>" alias with the primary's credentials.
+for _index, _replica in enumerate(filter(None, os.getenv('DB_REPLICAS', '').split(',')), start=1):
+    _host, _, _port = _replica.strip().partition(':')
+    DATABASES[f'replica_{_index}'] = {
+        **DATABASES['default'],
+        'HOST': _host,
+        'PORT': _port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['enterprisepro.tenancy.TenantRouter', 'enterprisepro.db_router.ReplicaRouter']
+
+# Companies (see enterprisepro/tenancy.py). Rows created outside a request
+# (shell, commands) go to this company, created on first use.
+DEFAULT_COMPANY_CODE = os.getenv('DEFAULT_COMPANY_CODE', 'MAIN')
+# search_path of connections while no company with its own schema is current
+DEFAULT_SEARCH_PATH = '"$user", public'
+
+# Replicas further behind than this are skipped until the next health check
+REPLICA_MAX_LAG_SECONDS = float(os.getenv('REPLICA_MAX_LAG_SECONDS', '5'))
+REPLICA_HEALTH_CHECK_INTERVAL = float(os.getenv('REPLICA_HEALTH_CHECK_INTERVAL', '10'))
+# After a write, the user's reads stay on the primary for this long.
+# Use a shared cache backend when running several processes.
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', '10'))
+
+# Batch endpoint (/api/v1/batch/)
+BATCH_MAX_OPERATIONS = int(os.getenv('BATCH_MAX_OPERATIONS', '50'))
+BATCH_ALLOWED_PREFIXES = ['/api/v1/inventory/', '/api/v1/sales/', '/api/v1/purchasing/', '/api/v1/finance/']
+
+# Warehouse allocation for order lines given without a warehouse:
+# fewest_splits, priority or balance (see inventory/allocation.py)
+ALLOCATION_DEFAULT_POLICY = os.getenv('ALLOCATION_DEFAULT_POLICY', 'fewest_splits')
+
+# Stock reserved on confirmation is released if the order is not fulfilled
+# within this many hours (python manage.py expire_reservations, run from cron)
+RESERVATION_TTL_HOURS = int(os.getenv('RESERVATION_TTL_HOURS', '72'))
+
+# Demand forecasting for reorder points (see inventory/forecasting.py)
+FORECAST_HISTORY_WEEKS = int(os.getenv('FORECAST_HISTORY_WEEKS', '104'))
+FORECAST_WINDOW_WEEKS = int(os.getenv('FORECAST_WINDOW_WEEKS', '12'))
+FORECAST_LEAD_TIME_WEEKS = int(os.getenv('FORECAST_LEAD_TIME_WEEKS', '2'))
+FORECAST_COVER_WEEKS = int(os.getenv('FORECAST_COVER_WEEKS', '4'))
+FORECAST_SERVICE_LEVEL = float(os.getenv('FORECAST_SERVICE_LEVEL', '0.95'))
+
+# ABC/XYZ classification window (see inventory/classification.py)
+CLASSIFICATION_WINDOW_WEEKS = int(os.getenv('CLASSIFICATION_WINDOW_WEEKS', '52'))
+
+# Bulk order ingestion (/api/v1/sales/orders/bulk/)
+BULK_ORDER_MAX_ORDERS = int(os.getenv('BULK_ORDER_MAX_ORDERS', '5000'))
+
+# Bank statement import (/api/v1/finance/bank-statements/)
+BANK_STATEMENT_MAX_LINES = int(os.getenv('BANK_STATEMENT_MAX_LINES', '100000'))
+
+# Delta-sync change feeds (?updated_since= / ?cursor=)
+SYNC_PAGE_SIZE = int(os.getenv('SYNC_PAGE_SIZE', '500'))
+# Rows younger than this are held back so slow commits are never skipped
+SYNC_SETTLE_SECONDS = int(os.getenv('SYNC_SETTLE_SECONDS', '5'))
+
+# Archival of closed orders and invoices (python manage.py archive_documents,
+# see archive/archiver.py); at least 366 days
+ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', '730'))
+ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', '1000'))
+
+# Columnar BI extracts (python manage.py export_snapshots, see sync/export.py)
+EXPORT_DIR = os.getenv('EXPORT_DIR', str(BASE_DIR / 'exports'))
+
+# Server-push events (/api/v1/events/stream/)
+# "inprocess" for a single worker, "postgres" (LISTEN/NOTIFY) for several
+EVENTS_BROKER = os.getenv('EVENTS_BROKER', 'inprocess')
+EVENTS_QUEUE_SIZE = 100
+EVENTS_HEARTBEAT_SECONDS = 15
+EVENTS_STREAM_MAX_SECONDS = int(os.getenv('EVENTS_STREAM_MAX_SECONDS', '300'))
+
+# Background jobs (manage.py run_jobs)
+JOBS_WORKER_PROCESSES = int(os.getenv('JOBS_WORKER_PROCESSES', '4'))
+JOBS_POLL_INTERVAL = float(os.getenv('JOBS_POLL_INTERVAL', '1'))
+# Running jobs write a heartbeat (and their progress) this often; jobs
+# silent for JOBS_STALE_SECONDS are assumed lost and retried
+JOBS_HEARTBEAT_SECONDS = 5
+JOBS_STALE_SECONDS = int(os.getenv('JOBS_STALE_SECONDS', '120'))
+# Failed attempts are retried after base * 2^(attempt-1) seconds, capped
+JOBS_RETRY_BASE_SECONDS = 10
+JOBS_RETRY_MAX_SECONDS = 600
+
+# Worker threads (and so database connections) per process for the
+# concurrent sub-queries of async report views
+ASYNC_QUERY_CONCURRENCY = int(os.getenv('ASYNC_QUERY_CONCURRENCY', '8'))
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+# 'default' is per process, for results that are cheap to rebuild. 'shared'
+# holds what every worker process must agree on (lookup and price list cache
+# versions, read-your-writes pins): Redis when REDIS_URL is set (needs the
+# redis package), else a database table (python manage.py createcachetable).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'enterprisepro',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('REDIS_URL'),
+    } if os.getenv('REDIS_URL') else {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'enterprisepro_cache',
+    },
+}
+
+# Lookup (dropdown/autocomplete) endpoints
+LOOKUP_MAX_RESULTS = int(os.getenv('LOOKUP_MAX_RESULTS', '50'))
+LOOKUP_CACHE_TIMEOUT = int(os.getenv('LOOKUP_CACHE_TIMEOUT', '60'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -137,11 +264,14 @@ AUTH_USER_MODEL = 'accounts.User'
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'enterprisepro.tenancy.TenantJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_FILTER_BACKENDS': [
+        'enterprisepro.search.RankedSearchFilter',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
 }
@@ -161,3 +291,6 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_CREDENTIALS = True
 
+# "Prefer: respond-async" asks long operations to run as background jobs
+CORS_ALLOW_HEADERS = (*default_headers, 'prefer')
+
@@ -0,0 +1,297 @@
+"""
+Multi-company tenancy.
+
+Every business row belongs to a company (``accounts.Company``). The current
+company is held in a context variable for the duration of a request, job or
+``company_context()`` block:
+
+* API requests take it from the access token's ``company`` claim
+  (``TenantJWTAuthentication``; the claim is set at login, see
+  ``accounts.views.CustomTokenObtainPairSerializer``).
+* Session requests (the Django admin) take it from the logged-in user
+  (``TenantMiddleware``).
+* Background jobs run in the company of the request that queued them.
+
+Models using ``TenantManager`` are scoped to the current company
+automatically. The filter is added whenever a queryset is cloned, so
+querysets built at import time (``ViewSet.queryset``, serializer field
+querysets) are scoped when a request uses them too. Batch management
+commands (``CompanyCommand``) run as each company in turn. Without a current
+company (other commands, the shell) nothing is filtered, only the shared
+schema is reached, and new rows go to the default company
+(``DEFAULT_COMPANY_CODE``).
+
+Companies with a ``schema`` keep their data in that PostgreSQL schema
+instead of the shared ``public`` one, so a large company gets its own
+tables, indexes and statistics. Every connection's ``search_path`` is
+switched to the current company's schema before its next query; users, jobs
+and other shared tables stay in ``public``, which remains on the path.
+``manage.py migrate_company_schema`` creates a company's schema.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import migrations, models
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+# Apps whose tables live in a company's schema; the rest are shared
+TENANT_APPS = ('inventory', 'sales', 'purchasing', 'finance', 'archive', 'audit', 'sync')
+SCHEMAS_CACHE_KEY = 'tenancy:schemas'
+SCHEMAS_CACHE_TIMEOUT = 60
+
+# (company id, schema) of the current company, if any
+_tenant = ContextVar('tenant', default=None)
+_default_company_id = None
+
+
+def current_company_id():
+    tenant = _tenant.get()
+    return tenant[0] if tenant is not None else None
+
+
+def current_schema():
+    """The current company's schema, or '' for the shared one."""
+    tenant = _tenant.get()
+    return tenant[1] if tenant is not None else ''
+
+
+def default_company_id():
+    """The id of the ``DEFAULT_COMPANY_CODE`` company, created on first use."""
+    global _default_company_id
+    if _default_company_id is None:
+        company, _ = apps.get_model('accounts', 'Company').objects.get_or_create(
+            code=settings.DEFAULT_COMPANY_CODE, defaults={'name': settings.DEFAULT_COMPANY_CODE}
+        )
+        _default_company_id = company.pk
+    return _default_company_id
+
+
+def set_default_company(objs):
+    """Assign the default company to new rows created without a current company."""
+    for obj in objs:
+        if obj.company_id is None:
+            obj.company_id = default_company_id()
+
+
+def fill_company(app_label, *model_names):
+    """
+    Migration operation for models gaining a ``company``: rows created before
+    it (added nullable first) go to the default company.
+    """
+    def forwards(apps, schema_editor):
+        company, _ = apps.get_model('accounts', 'Company').objects.get_or_create(
+            code=settings.DEFAULT_COMPANY_CODE, defaults={'name': settings.DEFAULT_COMPANY_CODE}
+        )
+        for name in model_names:
+            apps.get_model(app_label, name).objects.filter(company__isnull=True).update(company=company)
+
+    return migrations.RunPython(forwards, migrations.RunPython.noop)
+
+
+def company_schemas():
+    """``{company id: schema}`` for companies placed in their own schema."""
+    schemas = cache.get(SCHEMAS_CACHE_KEY)
+    if schemas is None:
+        schemas = dict(
+            apps.get_model('accounts', 'Company').objects.exclude(schema='').values_list('pk', 'schema')
+        )
+        cache.set(SCHEMAS_CACHE_KEY, schemas, SCHEMAS_CACHE_TIMEOUT)
+    return schemas
+
+
+def activate(company_id):
+    """Make ``company_id`` (None for none) current; returns a token for ``deactivate``."""
+    tenant = None if company_id is None else (company_id, company_schemas().get(company_id, ''))
+    return _tenant.set(tenant)
+
+
+def deactivate(token):
+    _tenant.reset(token)
+
+
+@contextmanager
+def company_context(company_id):
+    """Run the block as ``company_id``, e.g. in a job or management command."""
+    token = activate(company_id)
+    try:
+        yield
+    finally:
+        deactivate(token)
+
+
+class TenantQuerySet(models.QuerySet):
+    """Adds the current company filter to every clone, once per company."""
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._tenant_company = getattr(self, '_tenant_company', None)
+        return clone
+
+    def _chain(self):
+        return super()._chain()._scope()
+
+    def _scope(self):
+        company_id = current_company_id()
+        if (
+            company_id is None
+            or getattr(self, '_tenant_company', None) == company_id
+            or self.query.is_sliced
+            or self.query.combinator
+        ):
+            return self
+        self.query.add_q(models.Q(**{self.model.tenant_lookup: company_id}))
+        self._tenant_company = company_id
+        return self
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        if self.model.tenant_lookup == 'company':
+            set_default_company(objs)
+        return super().bulk_create(objs, *args, **kwargs)
+
+
+class TenantManager(models.Manager.from_queryset(TenantQuerySet)):
+    def get_queryset(self):
+        return super().get_queryset()._scope()
+
+
+class TenantModel(models.Model):
+    """Abstract base of models owned by a company."""
+    company = models.ForeignKey(
+        'accounts.Company', on_delete=models.PROTECT, related_name='+', editable=False,
+        default=current_company_id,
+    )
+
+    objects = TenantManager()
+
+    # Lookup from the model to its company, for models scoped through a parent
+    tenant_lookup = 'company'
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        set_default_company([self])
+        super().save(*args, **kwargs)
+
+
+class TenantJWTAuthentication(JWTAuthentication):
+    """JWT authentication that makes the token's company current."""
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is not None:
+            user, token = result
+            # Tokens issued before tenancy carry no claim
+            company_id = token.get('company', user.company_id)
+            if company_id != user.company_id:
+                # Refreshed tokens keep their claims after the user moved
+                raise AuthenticationFailed('Token company does not match the user; log in again.')
+            activate(company_id)
+        return result
+
+
+class TenantMiddleware:
+    """
+    Scope each request to the session user's company (the admin), and undo
+    whatever company the request made current when it ends.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        user = getattr(request, 'user', None)
+        token = activate(user.company_id if user is not None and user.is_authenticated else None)
+        try:
+            return self.get_response(request)
+        finally:
+            deactivate(token)
+
+
+class CompanyCommand(BaseCommand):
+    """
+    Management command run as each company in turn, or only the one given
+    with ``--company``, so companies in their own schema are covered too.
+    Subclasses implement ``handle_company``.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--company', dest='company_code', help='Code of the only company to run for (default: each in turn).',
+        )
+
+    def handle(self, *args, **options):
+        companies = apps.get_model('accounts', 'Company').objects.order_by('code')
+        if options['company_code']:
+            companies = companies.filter(code=options['company_code'])
+            if not companies:
+                raise CommandError(f"No company with code {options['company_code']}.")
+        for company in companies:
+            with company_context(company.pk):
+                self.handle_company(company, **options)
+
+    def handle_company(self, company, **options):
+        raise NotImplementedError('subclasses of CompanyCommand must provide a handle_company() method')
+
+
+def switch_schema(execute, sql, params, many, context):
+    """
+    Database execute wrapper (installed on every connection) that points the
+    connection's ``search_path`` at the current company's schema first.
+    """
+    connection = context['connection']
+    schema = current_schema()
+    if _search_path_schema(connection) != schema:
+        with connection.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT set_config('search_path', %s, false)",
+                [f'"{schema}", public' if schema else settings.DEFAULT_SEARCH_PATH],
+            )
+        connection.tenant_schema = schema
+        connection.tenant_schema_hook = None
+        if connection.in_atomic_block:
+            # A rollback of the transaction (or savepoint) undoes the change
+            # and discards this hook, which is how the change is known lost
+            def committed():
+                if connection.tenant_schema_hook is committed:
+                    connection.tenant_schema_hook = None
+
+            connection.tenant_schema_hook = committed
+            connection.on_commit(committed)
+    return execute(sql, params, many, context)
+
+
+def _search_path_schema(connection):
+    """The schema ``switch_schema`` last set on the connection, or None if a rollback undid it."""
+    hook = getattr(connection, 'tenant_schema_hook', None)
+    if hook is not None and all(pending[1] is not hook for pending in connection.run_on_commit):
+        return None
+    return getattr(connection, 'tenant_schema', '')
+
+
+def install_schema_switch(sender, connection, **kwargs):
+    """``connection_created`` receiver: new connections start on the shared schema."""
+    connection.tenant_schema = ''
+    connection.tenant_schema_hook = None
+    if switch_schema not in connection.execute_wrappers:
+        connection.execute_wrappers.append(switch_schema)
+
+
+class TenantRouter:
+    """
+    Keeps the shared apps out of company schemas: while a company with a
+    schema is current (``migrate_company_schema``), only ``TENANT_APPS`` are
+    migrated. Reads and writes use whatever alias the other routers pick;
+    the schema is selected on the connection by ``switch_schema``.
+    """
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if current_schema():
+            return app_label in TENANT_APPS
+        return None
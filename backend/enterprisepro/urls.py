@@ -3,13 +3,19 @@ URL configuration for enterprisepro project.
 """
 from django.contrib import admin
 from django.urls import path, include
+from .batch import BatchView
+from .events import event_stream
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/v1/auth/', include('accounts.urls')),
     path('api/v1/inventory/', include('inventory.urls')),
     path('api/v1/sales/', include('sales.urls')),
+    path('api/v1/purchasing/', include('purchasing.urls')),
     path('api/v1/finance/', include('finance.urls')),
     path('api/v1/audit/', include('audit.urls')),
+    path('api/v1/jobs/', include('jobs.urls')),
+    path('api/v1/batch/', BatchView.as_view(), name='batch'),
+    path('api/v1/events/stream/', event_stream, name='event_stream'),
 ]
 
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Account, Invoice, GeneralLedger
+from .models import Account, BankStatement, BankStatementLine, Invoice, GeneralLedger, Payment
 
 
 @admin.register(Account)
@@ -11,10 +11,31 @@ class AccountAdmin(admin.ModelAdmin):
 
 @admin.register(Invoice)
 class InvoiceAdmin(admin.ModelAdmin):
-    list_display = ('invoice_number', 'sales_order', 'invoice_date', 'status', 'total_amount')
+    list_display = ('invoice_number', 'sales_order', 'invoice_date', 'status', 'total_amount', 'amount_paid')
     list_filter = ('status', 'invoice_date')
     search_fields = ('invoice_number', 'sales_order__order_number')
-    readonly_fields = ('total_amount', 'created_at', 'updated_at')
+    readonly_fields = ('total_amount', 'amount_paid', 'created_at', 'updated_at')
+
+
+@admin.register(Payment)
+class PaymentAdmin(admin.ModelAdmin):
+    list_display = ('invoice', 'amount', 'payment_date', 'method', 'reference')
+    list_filter = ('method', 'payment_date')
+    search_fields = ('invoice__invoice_number', 'reference')
+    raw_id_fields = ('invoice', 'statement_line')
+
+
+@admin.register(BankStatement)
+class BankStatementAdmin(admin.ModelAdmin):
+    list_display = ('id', 'reference', 'line_count', 'matched_count', 'imported_by', 'created_at')
+
+
+@admin.register(BankStatementLine)
+class BankStatementLineAdmin(admin.ModelAdmin):
+    list_display = ('statement', 'line_number', 'transaction_date', 'amount', 'reference', 'status', 'invoice')
+    list_filter = ('status', 'match_rule')
+    search_fields = ('reference', 'counterparty')
+    raw_id_fields = ('statement', 'invoice')
 
 
 @admin.register(GeneralLedger)
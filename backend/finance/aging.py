@@ -0,0 +1,74 @@
+"""
+Accounts receivable aging.
+
+The unpaid balance of open (draft or sent) invoices is bucketed by how many days past their
+``due_date`` they are on an as-of date. Totals per customer come from one
+grouped query using conditional sums, served from the (status, due_date)
+index, so the report never loads invoices into Python.
+
+Invoices issued after the as-of date are left out. Balances are current
+ones: payments received after the as-of date are already deducted.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce
+
+from .models import Invoice
+
+# Bucket name -> (fewest, most) days past due; None is unbounded
+BUCKETS = {
+    'current': (None, 0),
+    'days_1_30': (1, 30),
+    'days_31_60': (31, 60),
+    'days_61_90': (61, 90),
+    'days_over_90': (91, None),
+}
+
+
+def open_invoices(as_of):
+    """Invoices unpaid and already issued on ``as_of``."""
+    return Invoice.objects.filter(status__in=Invoice.OPEN_STATUSES, invoice_date__lte=as_of)
+
+
+def bucket_filter(bucket, as_of):
+    """A Q matching the invoices in ``bucket`` on ``as_of``."""
+    fewest, most = BUCKETS[bucket]
+    condition = Q()
+    # d days past due <=> due_date == as_of - d
+    if fewest is not None:
+        condition &= Q(due_date__lte=as_of - timedelta(days=fewest))
+    if most is not None:
+        condition &= Q(due_date__gte=as_of - timedelta(days=most))
+    return condition
+
+
+def aging_report(as_of, customer=None):
+    """
+    Totals per bucket overall and per customer (largest balance first) on
+    ``as_of``, optionally for one customer.
+    """
+    invoices = open_invoices(as_of)
+    if customer is not None:
+        invoices = invoices.filter(sales_order__customer=customer)
+    balance = F('total_amount') - F('amount_paid')
+    sums = {
+        bucket: Coalesce(Sum(balance, filter=bucket_filter(bucket, as_of)), Decimal(0))
+        for bucket in BUCKETS
+    }
+    rows = list(
+        invoices.order_by()
+        .values(
+            customer_id=F('sales_order__customer_id'),
+            customer_code=F('sales_order__customer__code'),
+            customer_name=F('sales_order__customer__name'),
+        )
+        .annotate(**sums, total=Sum(balance), invoice_count=Count('*'))
+        .order_by('-total', 'customer_code')
+    )
+
+    totals = {bucket: sum(row[bucket] for row in rows) for bucket in BUCKETS}
+    totals['total'] = sum(row['total'] for row in rows)
+    totals['invoice_count'] = sum(row['invoice_count'] for row in rows)
+    return {'as_of': as_of, 'totals': totals, 'customers': rows}
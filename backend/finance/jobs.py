@@ -0,0 +1,21 @@
+from jobs.registry import register
+from .payments import import_statement
+from .serializers import InvoiceSerializer
+
+
+@register('finance.create_invoice', concurrency=2)
+def create_invoice(job):
+    """Create an invoice and its ledger entries (queued by invoice create)."""
+    serializer = InvoiceSerializer(data=job.payload['data'])
+    # Re-validated: the order may have changed since the job was queued
+    serializer.is_valid(raise_exception=True)
+    serializer.save()
+    return serializer.data
+
+
+@register('finance.import_bank_statement', concurrency=1)
+def import_bank_statement_job(job):
+    """Import and match a bank statement (queued by the statement import)."""
+    return import_statement(
+        job.payload['lines'], job.created_by, reference=job.payload.get('reference', ''), progress=job.set_progress
+    )
@@ -0,0 +1,55 @@
+"""
+Posting to the general ledger.
+
+Default accounts are created on first use, so a fresh install can post
+without a configured chart of accounts.
+"""
+from .models import Account, GeneralLedger
+
+DEFAULT_ACCOUNTS = {
+    'cash': ('1000', 'Cash', 'asset'),
+    'accounts_receivable': ('1200', 'Accounts Receivable', 'asset'),
+    'inventory': ('1300', 'Inventory', 'asset'),
+    'accounts_payable': ('2000', 'Accounts Payable', 'liability'),
+    'sales_revenue': ('4000', 'Sales Revenue', 'revenue'),
+    'cost_of_goods_sold': ('5000', 'Cost of Goods Sold', 'expense'),
+}
+
+
+def get_account(name):
+    """The account for a ``DEFAULT_ACCOUNTS`` name, created if missing."""
+    code, account_name, account_type = DEFAULT_ACCOUNTS[name]
+    account, _ = Account.objects.get_or_create(
+        code=code,
+        defaults={'name': account_name, 'account_type': account_type}
+    )
+    return account
+
+
+def post_entry(debit, credit, amount, description, transaction_date, **links):
+    """
+    Post a balanced entry: debit one account and credit another by
+    ``amount``. ``links`` (``invoice=``, ``sales_order=``, ``payment=``) are
+    set on both rows.
+    """
+    return post_entries(debit, credit, [(amount, description, transaction_date, links)])
+
+
+def post_entries(debit, credit, entries):
+    """
+    Post many entries between the same two accounts with one INSERT per
+    batch; ``entries`` are ``(amount, description, transaction_date, links)``.
+    """
+    debit_account, credit_account = get_account(debit), get_account(credit)
+    return GeneralLedger.objects.bulk_create([
+        GeneralLedger(
+            account=account,
+            transaction_type=transaction_type,
+            amount=amount,
+            description=description,
+            transaction_date=transaction_date,
+            **links
+        )
+        for amount, description, transaction_date, links in entries
+        for account, transaction_type in ((debit_account, 'debit'), (credit_account, 'credit'))
+    ], batch_size=2000)
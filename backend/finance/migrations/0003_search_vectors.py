@@ -0,0 +1,123 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:01
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+INVOICE_SEARCH_SQL = """
+CREATE FUNCTION finance_invoice_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', coalesce(NEW.invoice_number, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(
+            (SELECT o.order_number || ' ' || c.code || ' ' || c.name
+             FROM sales_salesorder o JOIN sales_customer c ON c.id = o.customer_id
+             WHERE o.id = NEW.sales_order_id), ''
+        )), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER finance_invoice_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF invoice_number, sales_order_id ON finance_invoice
+    FOR EACH ROW EXECUTE FUNCTION finance_invoice_search_vector_update();
+
+-- Re-index a customer's invoices only when the denormalized code/name change
+CREATE FUNCTION finance_customer_invoices_search_refresh() RETURNS trigger AS $$
+BEGIN
+    UPDATE finance_invoice SET sales_order_id = sales_order_id
+    WHERE sales_order_id IN (SELECT id FROM sales_salesorder WHERE customer_id = NEW.id);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER finance_customer_invoices_search_refresh_trigger
+    AFTER UPDATE OF code, name ON sales_customer
+    FOR EACH ROW
+    WHEN (OLD.code IS DISTINCT FROM NEW.code OR OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION finance_customer_invoices_search_refresh();
+
+UPDATE finance_invoice SET invoice_number = invoice_number;
+"""
+
+INVOICE_SEARCH_REVERSE_SQL = """
+DROP TRIGGER IF EXISTS finance_customer_invoices_search_refresh_trigger ON sales_customer;
+DROP FUNCTION IF EXISTS finance_customer_invoices_search_refresh();
+DROP TRIGGER IF EXISTS finance_invoice_search_vector_trigger ON finance_invoice;
+DROP FUNCTION IF EXISTS finance_invoice_search_vector_update();
+"""
+
+LEDGER_SEARCH_SQL = """
+CREATE FUNCTION finance_generalledger_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', coalesce(
+            (SELECT a.code || ' ' || a.name FROM finance_account a WHERE a.id = NEW.account_id), ''
+        )), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER finance_generalledger_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF description, account_id ON finance_generalledger
+    FOR EACH ROW EXECUTE FUNCTION finance_generalledger_search_vector_update();
+
+CREATE FUNCTION finance_account_ledger_search_refresh() RETURNS trigger AS $$
+BEGIN
+    UPDATE finance_generalledger SET account_id = account_id WHERE account_id = NEW.id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER finance_account_ledger_search_refresh_trigger
+    AFTER UPDATE OF code, name ON finance_account
+    FOR EACH ROW
+    WHEN (OLD.code IS DISTINCT FROM NEW.code OR OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION finance_account_ledger_search_refresh();
+
+UPDATE finance_generalledger SET description = description;
+"""
+
+LEDGER_SEARCH_REVERSE_SQL = """
+DROP TRIGGER IF EXISTS finance_account_ledger_search_refresh_trigger ON finance_account;
+DROP FUNCTION IF EXISTS finance_account_ledger_search_refresh();
+DROP TRIGGER IF EXISTS finance_generalledger_search_vector_trigger ON finance_generalledger;
+DROP FUNCTION IF EXISTS finance_generalledger_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0002_prefix_lookup_indexes'),
+        ('sales', '0003_search_vectors'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generalledger',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='generalledger',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='ledger_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='invoice_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['invoice_number'], name='invoice_number_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.RunSQL(INVOICE_SEARCH_SQL, INVOICE_SEARCH_REVERSE_SQL),
+        migrations.RunSQL(LEDGER_SEARCH_SQL, LEDGER_SEARCH_REVERSE_SQL),
+    ]
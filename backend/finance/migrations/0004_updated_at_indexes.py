@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0003_search_vectors'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['updated_at', 'id'], name='invoice_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0008_line_cost'),
+        ('finance', '0004_updated_at_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generalledger',
+            name='sales_order',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='ledger_entries', to='sales.salesorder'),
+        ),
+    ]
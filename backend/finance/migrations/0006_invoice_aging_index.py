@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0005_ledger_sales_order'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['status', 'due_date'], include=('invoice_date', 'total_amount', 'sales_order'), name='invoice_status_due_idx'),
+        ),
+    ]
@@ -0,0 +1,114 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:48
+
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('finance', '0006_invoice_aging_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankStatement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reference', models.CharField(blank=True, max_length=100)),
+                ('line_count', models.IntegerField(default=0)),
+                ('matched_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='BankStatementLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('line_number', models.IntegerField()),
+                ('transaction_date', models.DateField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('reference', models.CharField(blank=True, max_length=500)),
+                ('counterparty', models.CharField(blank=True, max_length=200)),
+                ('status', models.CharField(choices=[('matched', 'Matched'), ('review', 'Needs review'), ('ignored', 'Ignored')], default='review', max_length=20)),
+                ('match_rule', models.CharField(blank=True, choices=[('invoice_number', 'Invoice number in reference'), ('customer_amount', 'Customer and amount'), ('manual', 'Manual')], max_length=20)),
+                ('note', models.CharField(blank=True, max_length=200)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['statement', 'line_number'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Payment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12, validators=[django.core.validators.MinValueValidator(0.01)])),
+                ('payment_date', models.DateField()),
+                ('method', models.CharField(choices=[('bank_transfer', 'Bank transfer'), ('cash', 'Cash'), ('card', 'Card'), ('cheque', 'Cheque')], default='bank_transfer', max_length=20)),
+                ('reference', models.CharField(blank=True, max_length=500)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-payment_date', '-created_at'],
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='invoice',
+            name='invoice_status_due_idx',
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='amount_paid',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['status', 'due_date'], include=('invoice_date', 'total_amount', 'amount_paid', 'sales_order'), name='invoice_status_due_idx'),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='created_by',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='payments', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='invoice',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='payments', to='finance.invoice'),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='statement_line',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='payment', to='finance.bankstatementline'),
+        ),
+        migrations.AddField(
+            model_name='bankstatementline',
+            name='invoice',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='statement_lines', to='finance.invoice'),
+        ),
+        migrations.AddField(
+            model_name='bankstatementline',
+            name='statement',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='finance.bankstatement'),
+        ),
+        migrations.AddField(
+            model_name='bankstatement',
+            name='imported_by',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='bank_statements', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='generalledger',
+            name='payment',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='ledger_entries', to='finance.payment'),
+        ),
+        migrations.AddIndex(
+            model_name='bankstatementline',
+            index=models.Index(fields=['status', 'transaction_date'], name='statementline_status_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0011_customer_stats'),
+        ('finance', '0007_payments'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bankstatementline',
+            name='invoice',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='statement_lines', to='finance.invoice'),
+        ),
+        migrations.AlterField(
+            model_name='generalledger',
+            name='invoice',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='ledger_entries', to='finance.invoice'),
+        ),
+        migrations.AlterField(
+            model_name='generalledger',
+            name='sales_order',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='ledger_entries', to='sales.salesorder'),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='invoice',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.PROTECT, related_name='payments', to='finance.invoice'),
+        ),
+    ]
@@ -0,0 +1,135 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:14
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django.db.models.deletion
+import django.db.models.functions.text
+import enterprisepro.tenancy
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_companies'),
+        ('finance', '0008_unconstrained_archive_links'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='account',
+            name='account_code_prefix_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='account',
+            name='account_name_prefix_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='invoice',
+            name='invoice_updated_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='invoice',
+            name='invoice_status_due_idx',
+        ),
+        migrations.AddField(
+            model_name='account',
+            name='company',
+            field=models.ForeignKey(default=enterprisepro.tenancy.current_company_id, null=True, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.company'),
+        ),
+        migrations.AddField(
+            model_name='bankstatement',
+            name='company',
+            field=models.ForeignKey(default=enterprisepro.tenancy.current_company_id, null=True, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.company'),
+        ),
+        migrations.AddField(
+            model_name='generalledger',
+            name='company',
+            field=models.ForeignKey(default=enterprisepro.tenancy.current_company_id, null=True, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.company'),
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='company',
+            field=models.ForeignKey(default=enterprisepro.tenancy.current_company_id, null=True, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.company'),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='company',
+            field=models.ForeignKey(default=enterprisepro.tenancy.current_company_id, null=True, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.company'),
+        ),
+        enterprisepro.tenancy.fill_company('finance', 'account', 'bankstatement', 'generalledger', 'invoice', 'payment'),
+        migrations.AlterField(
+            model_name='account',
+            name='company',
+            field=models.ForeignKey(default=enterprisepro.tenancy.current_company_id, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.company'),
+        ),
+        migrations.AlterField(
+            model_name='bankstatement',
+            name='company',
+            field=models.ForeignKey(default=enterprisepro.tenancy.current_company_id, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.company'),
+        ),
+        migrations.AlterField(
+            model_name='generalledger',
+            name='company',
+            field=models.ForeignKey(default=enterprisepro.tenancy.current_company_id, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.company'),
+        ),
+        migrations.AlterField(
+            model_name='invoice',
+            name='company',
+            field=models.ForeignKey(default=enterprisepro.tenancy.current_company_id, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.company'),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='company',
+            field=models.ForeignKey(default=enterprisepro.tenancy.current_company_id, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.company'),
+        ),
+        migrations.AlterField(
+            model_name='account',
+            name='code',
+            field=models.CharField(max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='invoice',
+            name='invoice_number',
+            field=models.CharField(max_length=50),
+        ),
+        migrations.AddIndex(
+            model_name='account',
+            index=models.Index(models.F('company'), django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('code'), name='text_pattern_ops'), name='account_code_prefix_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='account',
+            index=models.Index(models.F('company'), django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('name'), name='text_pattern_ops'), name='account_name_prefix_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bankstatement',
+            index=models.Index(fields=['company', '-created_at'], name='bankstatement_company_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='generalledger',
+            index=models.Index(fields=['company', '-transaction_date', '-created_at'], name='ledger_company_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['company', 'updated_at', 'id'], name='invoice_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['company', '-invoice_date', '-created_at'], name='invoice_company_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['company', 'status', 'due_date'], include=('invoice_date', 'total_amount', 'amount_paid', 'sales_order'), name='invoice_status_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['company', '-payment_date', '-created_at'], name='payment_company_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='account',
+            constraint=models.UniqueConstraint(fields=('company', 'code'), name='account_company_code_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='invoice',
+            constraint=models.UniqueConstraint(fields=('company', 'invoice_number'), name='invoice_company_number_uniq'),
+        ),
+    ]
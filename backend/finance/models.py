@@ -1,9 +1,14 @@
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Upper
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator
+from enterprisepro.tenancy import TenantManager, TenantModel
 from sales.models import SalesOrder
 
 
-class Account(models.Model):
+class Account(TenantModel):
     """Chart of Accounts."""
     ACCOUNT_TYPE_CHOICES = [
         ('asset', 'Asset'),
@@ -13,7 +18,7 @@ class Account(models.Model):
         ('expense', 'Expense'),
     ]
 
-    code = models.CharField(max_length=50, unique=True, db_index=True)
+    code = models.CharField(max_length=50)
     name = models.CharField(max_length=200)
     account_type = models.CharField(max_length=20, choices=ACCOUNT_TYPE_CHOICES)
     parent = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='children')
@@ -23,12 +28,20 @@ class Account(models.Model):
 
     class Meta:
         ordering = ['code']
+        constraints = [
+            models.UniqueConstraint(fields=['company', 'code'], name='account_company_code_uniq'),
+        ]
+        indexes = [
+            # Prefix lookups (UPPER(col) LIKE 'TERM%') for autocomplete, within a company
+            models.Index(F('company'), OpClass(Upper('code'), name='text_pattern_ops'), name='account_code_prefix_idx'),
+            models.Index(F('company'), OpClass(Upper('name'), name='text_pattern_ops'), name='account_name_prefix_idx'),
+        ]
 
     def __str__(self):
         return f"{self.code} - {self.name}"
 
 
-class Invoice(models.Model):
+class Invoice(TenantModel):
     """Invoice linked to Sales Order."""
     STATUS_CHOICES = [
         ('draft', 'Draft'),
@@ -36,26 +49,151 @@ class Invoice(models.Model):
         ('paid', 'Paid'),
         ('cancelled', 'Cancelled'),
     ]
+    # Statuses still owed by the customer (open receivables)
+    OPEN_STATUSES = ('draft', 'sent')
 
-    invoice_number = models.CharField(max_length=50, unique=True, db_index=True)
+    invoice_number = models.CharField(max_length=50)
     sales_order = models.OneToOneField(SalesOrder, on_delete=models.PROTECT, related_name='invoice')
     invoice_date = models.DateField()
     due_date = models.DateField()
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
     total_amount = models.DecimalField(max_digits=12, decimal_places=2, validators=[MinValueValidator(0)])
     tax_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0, validators=[MinValueValidator(0)])
+    # Sum of the invoice's payments (see finance.payments)
+    amount_paid = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False)
     notes = models.TextField(blank=True)
+    # Maintained by a database trigger from invoice_number, order number and customer name
+    search_vector = SearchVectorField(null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-invoice_date', '-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['company', 'invoice_number'], name='invoice_company_number_uniq'),
+        ]
+        indexes = [
+            GinIndex(fields=['search_vector'], name='invoice_search_vector_idx'),
+            GinIndex(fields=['invoice_number'], opclasses=['gin_trgm_ops'], name='invoice_number_trgm_idx'),
+            models.Index(fields=['company', 'updated_at', 'id'], name='invoice_updated_idx'),
+            # The invoice list, latest first
+            models.Index(fields=['company', '-invoice_date', '-created_at'], name='invoice_company_date_idx'),
+            # Accounts receivable aging (open invoices by due date); the included
+            # columns let the report read open invoices from the index alone
+            models.Index(
+                fields=['company', 'status', 'due_date'],
+                include=['invoice_date', 'total_amount', 'amount_paid', 'sales_order'],
+                name='invoice_status_due_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.invoice_number} - {self.sales_order.customer.name} ({self.get_status_display()})"
 
+    @property
+    def balance_due(self):
+        return self.total_amount - self.amount_paid
 
-class GeneralLedger(models.Model):
+    @property
+    def open_amount(self):
+        """What the invoice adds to the customer's open receivables."""
+        return self.balance_due if self.status in self.OPEN_STATUSES else 0
+
+
+class BankStatement(TenantModel):
+    """An imported bank statement; its lines are matched to open invoices on import."""
+    reference = models.CharField(max_length=100, blank=True)
+    imported_by = models.ForeignKey('accounts.User', on_delete=models.PROTECT, related_name='bank_statements')
+    line_count = models.IntegerField(default=0)
+    matched_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['company', '-created_at'], name='bankstatement_company_idx'),
+        ]
+
+    def __str__(self):
+        return f"Statement {self.reference or self.pk} ({self.matched_count}/{self.line_count} matched)"
+
+
+class BankStatementLine(models.Model):
+    """One credit on a bank statement, matched to an invoice or queued for review."""
+    STATUS_CHOICES = [
+        ('matched', 'Matched'),
+        ('review', 'Needs review'),
+        ('ignored', 'Ignored'),
+    ]
+    MATCH_RULE_CHOICES = [
+        ('invoice_number', 'Invoice number in reference'),
+        ('customer_amount', 'Customer and amount'),
+        ('manual', 'Manual'),
+    ]
+
+    statement = models.ForeignKey(BankStatement, on_delete=models.CASCADE, related_name='lines')
+    line_number = models.IntegerField()
+    transaction_date = models.DateField()
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    reference = models.CharField(max_length=500, blank=True)
+    counterparty = models.CharField(max_length=200, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='review')
+    match_rule = models.CharField(max_length=20, choices=MATCH_RULE_CHOICES, blank=True)
+    # The matched invoice, or for lines in review the best candidate found
+    # No database constraint: archived invoices keep their ids (see archive.archiver)
+    invoice = models.ForeignKey(
+        Invoice, on_delete=models.SET_NULL, null=True, blank=True, related_name='statement_lines', db_constraint=False
+    )
+    # Why a line needs review
+    note = models.CharField(max_length=200, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = TenantManager()
+    tenant_lookup = 'statement__company'
+
+    class Meta:
+        ordering = ['statement', 'line_number']
+        indexes = [
+            # Review queue
+            models.Index(fields=['status', 'transaction_date'], name='statementline_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.statement_id}/{self.line_number} {self.amount} ({self.get_status_display()})"
+
+
+class Payment(TenantModel):
+    """Money received against an invoice; an invoice may be paid in several parts."""
+    METHOD_CHOICES = [
+        ('bank_transfer', 'Bank transfer'),
+        ('cash', 'Cash'),
+        ('card', 'Card'),
+        ('cheque', 'Cheque'),
+    ]
+
+    # No database constraint: archived invoices keep their ids (see archive.archiver)
+    invoice = models.ForeignKey(Invoice, on_delete=models.PROTECT, related_name='payments', db_constraint=False)
+    amount = models.DecimalField(max_digits=12, decimal_places=2, validators=[MinValueValidator(0.01)])
+    payment_date = models.DateField()
+    method = models.CharField(max_length=20, choices=METHOD_CHOICES, default='bank_transfer')
+    reference = models.CharField(max_length=500, blank=True)
+    statement_line = models.OneToOneField(
+        BankStatementLine, on_delete=models.PROTECT, null=True, blank=True, related_name='payment'
+    )
+    created_by = models.ForeignKey('accounts.User', on_delete=models.PROTECT, related_name='payments')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-payment_date', '-created_at']
+        indexes = [
+            models.Index(fields=['company', '-payment_date', '-created_at'], name='payment_company_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.invoice.invoice_number} - {self.amount} on {self.payment_date}"
+
+
+class GeneralLedger(TenantModel):
     """General Ledger entries (simplified double-entry accounting)."""
     TRANSACTION_TYPE_CHOICES = [
         ('debit', 'Debit'),
@@ -63,15 +201,29 @@ class GeneralLedger(models.Model):
     ]
 
     account = models.ForeignKey(Account, on_delete=models.PROTECT, related_name='ledger_entries')
-    invoice = models.ForeignKey(Invoice, on_delete=models.PROTECT, null=True, blank=True, related_name='ledger_entries')
+    # Neither link has a database constraint: archived invoices and orders keep their ids (see archive.archiver)
+    invoice = models.ForeignKey(
+        Invoice, on_delete=models.PROTECT, null=True, blank=True, related_name='ledger_entries', db_constraint=False
+    )
+    # Set on entries a sales order posts itself, e.g. cost of goods sold on fulfillment
+    sales_order = models.ForeignKey(
+        SalesOrder, on_delete=models.PROTECT, null=True, blank=True, related_name='ledger_entries', db_constraint=False
+    )
+    payment = models.ForeignKey('Payment', on_delete=models.PROTECT, null=True, blank=True, related_name='ledger_entries')
     transaction_type = models.CharField(max_length=10, choices=TRANSACTION_TYPE_CHOICES)
     amount = models.DecimalField(max_digits=12, decimal_places=2, validators=[MinValueValidator(0)])
     description = models.CharField(max_length=500)
     transaction_date = models.DateField()
+    # Maintained by a database trigger from description and the account's code/name
+    search_vector = SearchVectorField(null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ['-transaction_date', '-created_at']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='ledger_search_vector_idx'),
+            models.Index(fields=['company', '-transaction_date', '-created_at'], name='ledger_company_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.account.code} - {self.transaction_type} - {self.amount}"
@@ -0,0 +1,356 @@
+"""
+Customer payments and bank statement matching.
+
+A payment settles part or all of an open invoice's balance: it is posted
+to the ledger (Debit: Cash 1000, Credit: Accounts Receivable 1200) and the
+invoice becomes ``paid`` once nothing is left to pay.
+
+Imported bank statement lines are matched against hash indexes built from
+all open invoices with one query, so each line costs a few dict lookups
+instead of a comparison with every invoice. In order:
+
+1. an invoice number found in the line's reference
+2. the customer (code or name in the counterparty or reference) and an
+   open balance equal to the amount, oldest due date first
+
+Lines matching neither, paying more than the balance left, or matching an
+invoice paid or changed while the statement was being matched go to the
+review queue (status ``review``), with the invoice that has exactly the
+line's amount open as a candidate if there is only one. Non-positive
+amounts (debits) are ``ignored``.
+
+Matched lines are written in bulk: one INSERT per table and one UPDATE for
+all invoices, which skips the ``Invoice`` signals, so the customers' open
+receivable counters are adjusted here too and no status change events are
+published.
+"""
+import re
+from collections import Counter, defaultdict
+from decimal import Decimal, InvalidOperation
+
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from sales.models import Customer
+from .ledger import post_entries, post_entry
+from .models import BankStatement, BankStatementLine, Invoice, Payment
+
+CENT = Decimal('0.01')
+# Invoice numbers and customer codes in free-text references
+TOKEN_PATTERN = re.compile(r'[A-Z0-9][A-Z0-9/_.-]*[A-Z0-9]|[A-Z0-9]')
+UPDATE_CHUNK_SIZE = 10000
+
+
+def record_payment(invoice_id, amount, payment_date, user, method='bank_transfer', reference='', statement_line=None):
+    """
+    Record a payment of ``amount`` against an open invoice and post it.
+    Raises ValueError if the invoice is not open or the amount is more than
+    its balance due.
+    """
+    with transaction.atomic():
+        invoice = (
+            Invoice.objects.select_for_update(of=('self',))
+            .select_related('sales_order__customer')
+            .get(pk=invoice_id)
+        )
+        if invoice.status not in Invoice.OPEN_STATUSES:
+            raise ValueError(
+                f'Invoice {invoice.invoice_number} is {invoice.status}; only draft or sent invoices take payments.'
+            )
+        if amount > invoice.balance_due:
+            raise ValueError(
+                f'Payment of {amount} exceeds the balance due on {invoice.invoice_number}. '
+                f'Balance due: {invoice.balance_due}'
+            )
+
+        payment = Payment.objects.create(
+            invoice=invoice,
+            amount=amount,
+            payment_date=payment_date,
+            method=method,
+            reference=reference,
+            statement_line=statement_line,
+            created_by=user,
+        )
+        invoice.amount_paid += amount
+        if invoice.balance_due == 0:
+            invoice.status = 'paid'
+        # Signals move the customer's open receivables and publish the status change
+        invoice.save(update_fields=['amount_paid', 'status', 'updated_at'])
+        post_entry(
+            'cash',
+            'accounts_receivable',
+            amount,
+            f'Payment {invoice.invoice_number} - {invoice.sales_order.customer.name}',
+            payment_date,
+            invoice=invoice,
+            payment=payment,
+        )
+    return payment
+
+
+def parse_statement_lines(raw_lines):
+    """
+    Validate raw ``{"date", "amount", "reference", "counterparty"}`` lines;
+    return ``(lines, errors)`` where ``errors`` maps line index to messages.
+    """
+    lines, errors = [], {}
+    for index, raw in enumerate(raw_lines):
+        if not isinstance(raw, dict):
+            errors[index] = ['Expected an object.']
+            continue
+        line_errors = []
+        transaction_date = None
+        try:
+            transaction_date = parse_date(str(raw.get('date', '')))
+        except ValueError:
+            pass
+        if transaction_date is None:
+            line_errors.append('date: Expected a date in YYYY-MM-DD format.')
+        try:
+            amount = Decimal(str(raw.get('amount'))).quantize(CENT)
+        except (InvalidOperation, ValueError):
+            line_errors.append('amount: A valid number is required.')
+        if line_errors:
+            errors[index] = line_errors
+            continue
+        lines.append({
+            'transaction_date': transaction_date,
+            'amount': amount,
+            'reference': str(raw.get('reference') or '')[:500],
+            'counterparty': str(raw.get('counterparty') or '')[:200],
+        })
+    return lines, errors
+
+
+class _OpenInvoices:
+    """Hash indexes over every open invoice, loaded with one query."""
+
+    def __init__(self):
+        # invoice id -> [balance left for this statement, customer id, invoice number]
+        self.invoices = {}
+        # invoice id -> balance due when loaded
+        self.loaded = {}
+        self.by_number = {}
+        self.by_customer_amount = defaultdict(list)
+        self.by_amount = defaultdict(list)
+        # Upper-cased customer code or name -> customer id (None if the name is shared)
+        self.customers = {}
+        rows = (
+            Invoice.objects.filter(status__in=Invoice.OPEN_STATUSES, total_amount__gt=F('amount_paid'))
+            .order_by('due_date', 'id')
+            .values_list(
+                'id', 'invoice_number', 'total_amount', 'amount_paid',
+                'sales_order__customer_id', 'sales_order__customer__code', 'sales_order__customer__name',
+            )
+        )
+        for pk, number, total, paid, customer_id, code, name in rows:
+            balance = total - paid
+            self.invoices[pk] = [balance, customer_id, number]
+            self.loaded[pk] = balance
+            self.by_number[number.upper()] = pk
+            self.by_customer_amount[customer_id, balance].append(pk)
+            self.by_amount[balance].append(pk)
+            self.customers[code.upper()] = customer_id
+            name = name.strip().upper()
+            if self.customers.get(name, customer_id) != customer_id:
+                customer_id = None
+            self.customers[name] = customer_id
+
+    def match(self, line):
+        """Return ``(status, match rule, invoice id, note)`` for a parsed line, taking matches off the balances."""
+        amount = line['amount']
+        if amount <= 0:
+            return 'ignored', '', None, 'Not a receipt.'
+        tokens = TOKEN_PATTERN.findall(line['reference'].upper())
+
+        for token in tokens:
+            pk = self.by_number.get(token)
+            if pk is None:
+                continue
+            balance = self.invoices[pk][0]
+            if balance == 0:
+                return 'review', '', pk, 'Invoice already settled by an earlier line.'
+            if amount > balance:
+                return 'review', '', pk, f'Amount exceeds the balance due of {balance}.'
+            self.invoices[pk][0] -= amount
+            return 'matched', 'invoice_number', pk, ''
+
+        customer_id = self.customers.get(line['counterparty'].strip().upper())
+        if customer_id is None:
+            customer_id = next((self.customers[token] for token in tokens if self.customers.get(token)), None)
+        if customer_id is not None:
+            pk = self._take(self.by_customer_amount.get((customer_id, amount), ()), amount)
+            if pk is not None:
+                self.invoices[pk][0] = Decimal(0)
+                return 'matched', 'customer_amount', pk, ''
+
+        candidates = [pk for pk in self.by_amount.get(amount, ()) if self.invoices[pk][0] == amount]
+        if len(candidates) == 1:
+            return 'review', '', candidates[0], f'Only {self.invoices[candidates[0]][2]} has this amount open.'
+        return 'review', '', None, 'No matching invoice.'
+
+    def _take(self, candidates, amount):
+        # Oldest due first; skip invoices already paid by earlier lines
+        return next((pk for pk in candidates if self.invoices[pk][0] == amount), None)
+
+
+def match_statement_line(line_id, invoice_id, user):
+    """
+    Settle a statement line from the review queue against ``invoice_id``.
+    Raises ValueError if the line is not awaiting review or the invoice
+    cannot take its amount.
+    """
+    with transaction.atomic():
+        line = BankStatementLine.objects.select_for_update().get(pk=line_id)
+        if line.status != 'review':
+            raise ValueError(f'Only lines awaiting review can be matched. Current status: {line.status}')
+        payment = record_payment(
+            invoice_id, line.amount, line.transaction_date, user, reference=line.reference, statement_line=line
+        )
+        line.status, line.match_rule, line.invoice_id, line.note = 'matched', 'manual', invoice_id, ''
+        line.save(update_fields=['status', 'match_rule', 'invoice', 'note', 'updated_at'])
+        BankStatement.objects.filter(pk=line.statement_id).update(matched_count=F('matched_count') + 1)
+    return payment
+
+
+def import_statement(raw_lines, user, reference='', progress=None):
+    """
+    Import and match a bank statement; return a summary. Raises ValueError
+    listing the invalid lines, if any.
+    """
+    lines, errors = parse_statement_lines(raw_lines)
+    if errors:
+        shown = '; '.join(f'line {index + 1}: {", ".join(messages)}' for index, messages in list(errors.items())[:20])
+        raise ValueError(f'{len(errors)} invalid statement lines. {shown}')
+
+    open_invoices = _OpenInvoices()
+    outcomes = [open_invoices.match(line) for line in lines]
+    if progress is not None:
+        progress(1, 2)
+
+    with transaction.atomic():
+        _drop_changed_matches(outcomes, open_invoices)
+        statement = BankStatement.objects.create(reference=reference, imported_by=user, line_count=len(lines))
+        statement_lines = BankStatementLine.objects.bulk_create([
+            BankStatementLine(
+                statement=statement,
+                line_number=number,
+                status=status,
+                match_rule=rule,
+                invoice_id=invoice_id,
+                note=note,
+                **line
+            )
+            for number, (line, (status, rule, invoice_id, note)) in enumerate(zip(lines, outcomes), start=1)
+        ], batch_size=2000)
+        matched = [line for line in statement_lines if line.status == 'matched']
+        _post_matches(matched, open_invoices, user)
+        statement.matched_count = len(matched)
+        statement.save(update_fields=['matched_count'])
+    if progress is not None:
+        progress(2, 2)
+
+    counts = Counter(status for status, _, _, _ in outcomes)
+    return {
+        'statement': statement.pk,
+        'lines': len(lines),
+        'matched': counts['matched'],
+        'review': counts['review'],
+        'ignored': counts['ignored'],
+        'matched_amount': str(sum((line.amount for line in matched), Decimal(0))),
+    }
+
+
+def _drop_changed_matches(outcomes, open_invoices):
+    """
+    Lock the matched invoices and send the lines matched to any invoice paid
+    or changed since it was loaded to review instead.
+    """
+    matched_ids = sorted({invoice_id for status, _, invoice_id, _ in outcomes if status == 'matched'})
+    if not matched_ids:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT id, status, total_amount - amount_paid FROM {Invoice._meta.db_table} '
+            f'WHERE id = ANY(%s) ORDER BY id FOR UPDATE',
+            [matched_ids],
+        )
+        current = {pk: (status, balance) for pk, status, balance in cursor.fetchall()}
+    changed = {
+        pk for pk in matched_ids
+        if current.get(pk) not in {(status, open_invoices.loaded[pk]) for status in Invoice.OPEN_STATUSES}
+    }
+    for index, (status, _, invoice_id, _) in enumerate(outcomes):
+        if status == 'matched' and invoice_id in changed:
+            outcomes[index] = ('review', '', invoice_id, 'Invoice changed during import.')
+
+
+def _post_matches(lines, open_invoices, user):
+    """Create payments for matched lines, update their invoices, post them and reduce receivables."""
+    if not lines:
+        return
+    payments = Payment.objects.bulk_create([
+        Payment(
+            invoice_id=line.invoice_id,
+            amount=line.amount,
+            payment_date=line.transaction_date,
+            method='bank_transfer',
+            reference=line.reference,
+            statement_line=line,
+            created_by=user,
+        )
+        for line in lines
+    ], batch_size=2000)
+
+    paid = Counter()
+    for payment in payments:
+        paid[payment.invoice_id] += payment.amount
+    ids, amounts = list(paid), [paid[pk] for pk in paid]
+    now = timezone.now()
+    with connection.cursor() as cursor:
+        for start in range(0, len(ids), UPDATE_CHUNK_SIZE):
+            chunk = slice(start, start + UPDATE_CHUNK_SIZE)
+            cursor.execute(
+                f"""
+                UPDATE {Invoice._meta.db_table} AS invoice
+                SET amount_paid = invoice.amount_paid + new.amount,
+                    status = CASE WHEN invoice.amount_paid + new.amount >= invoice.total_amount
+                                  THEN 'paid' ELSE invoice.status END,
+                    updated_at = %s
+                FROM unnest(%s::integer[], %s::numeric[]) AS new(id, amount)
+                WHERE invoice.id = new.id
+                """,
+                [now, ids[chunk], amounts[chunk]],
+            )
+
+    post_entries('cash', 'accounts_receivable', [
+        (
+            payment.amount,
+            f'Payment {open_invoices.invoices[payment.invoice_id][2]} - statement line {line.line_number}',
+            payment.payment_date,
+            {'invoice_id': payment.invoice_id, 'payment_id': payment.pk},
+        )
+        for payment, line in zip(payments, lines)
+    ])
+
+    # The UPDATE skipped the signals that keep the open receivables counters
+    received = Counter()
+    for pk, amount in paid.items():
+        received[open_invoices.invoices[pk][1]] += amount
+    customer_ids, customer_amounts = list(received), [received[pk] for pk in received]
+    with connection.cursor() as cursor:
+        for start in range(0, len(customer_ids), UPDATE_CHUNK_SIZE):
+            chunk = slice(start, start + UPDATE_CHUNK_SIZE)
+            cursor.execute(
+                f"""
+                UPDATE {Customer._meta.db_table} AS customer
+                SET open_receivables_amount = customer.open_receivables_amount - new.amount,
+                    updated_at = %s
+                FROM unnest(%s::integer[], %s::numeric[]) AS new(id, amount)
+                WHERE customer.id = new.id
+                """,
+                [now, customer_ids[chunk], customer_amounts[chunk]],
+            )
@@ -1,7 +1,17 @@
+import csv
+import io
+from decimal import Decimal
+
 from rest_framework import serializers
+from django.conf import settings
 from django.db import transaction
-from sales.models import SalesOrder
-from .models import Account, Invoice, GeneralLedger
+from django.utils import timezone
+from enterprisepro.serializers import unique_in_company
+from sales.models import Customer, SalesOrder
+from .aging import BUCKETS
+from .ledger import post_entry
+from .models import Account, BankStatement, BankStatementLine, Invoice, GeneralLedger, Payment
+from .payments import parse_statement_lines
 
 
 class AccountSerializer(serializers.ModelSerializer):
@@ -9,6 +19,7 @@ class AccountSerializer(serializers.ModelSerializer):
     class Meta:
         model = Account
         fields = '__all__'
+        extra_kwargs = {'code': {'validators': [unique_in_company(Account, 'code')]}}
 
 
 class InvoiceSerializer(serializers.ModelSerializer):
@@ -18,8 +29,9 @@ class InvoiceSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Invoice
-        fields = '__all__'
+        exclude = ('search_vector',)
         read_only_fields = ('total_amount', 'created_at', 'updated_at')
+        extra_kwargs = {'invoice_number': {'validators': [unique_in_company(Invoice, 'invoice_number')]}}
 
     def validate_sales_order(self, value):
         """Validate that sales order is fulfilled and not already invoiced."""
@@ -47,7 +59,7 @@ class InvoiceSerializer(serializers.ModelSerializer):
 
         # Update sales order status
         sales_order.status = 'invoiced'
-        sales_order.save(update_fields=['status'])
+        sales_order.save(update_fields=['status', 'updated_at'])
 
         # Create general ledger entries (simplified double-entry)
         self._create_ledger_entries(invoice)
@@ -71,34 +83,15 @@ class InvoiceSerializer(serializers.ModelSerializer):
 
     def _create_ledger_entries(self, invoice):
         """Create double-entry ledger entries for invoice."""
-        # Get or create default accounts
-        sales_revenue_account, _ = Account.objects.get_or_create(
-            code='4000',
-            defaults={'name': 'Sales Revenue', 'account_type': 'revenue'}
-        )
-        accounts_receivable_account, _ = Account.objects.get_or_create(
-            code='1200',
-            defaults={'name': 'Accounts Receivable', 'account_type': 'asset'}
-        )
-
         # Debit: Accounts Receivable (Asset increases)
-        GeneralLedger.objects.create(
-            account=accounts_receivable_account,
-            invoice=invoice,
-            transaction_type='debit',
-            amount=invoice.total_amount,
-            description=f'Invoice {invoice.invoice_number} - {invoice.sales_order.customer.name}',
-            transaction_date=invoice.invoice_date
-        )
-
         # Credit: Sales Revenue (Revenue increases)
-        GeneralLedger.objects.create(
-            account=sales_revenue_account,
+        post_entry(
+            'accounts_receivable',
+            'sales_revenue',
+            invoice.total_amount,
+            f'Invoice {invoice.invoice_number} - {invoice.sales_order.customer.name}',
+            invoice.invoice_date,
             invoice=invoice,
-            transaction_type='credit',
-            amount=invoice.total_amount,
-            description=f'Invoice {invoice.invoice_number} - {invoice.sales_order.customer.name}',
-            transaction_date=invoice.invoice_date
         )
 
 
@@ -110,7 +103,7 @@ class GeneralLedgerSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = GeneralLedger
-        fields = '__all__'
+        exclude = ('search_vector',)
 
 
 class DashboardKPISerializer(serializers.Serializer):
@@ -120,3 +113,147 @@ class DashboardKPISerializer(serializers.Serializer):
     pending_invoices = serializers.IntegerField()
     total_accounts_receivable = serializers.DecimalField(max_digits=12, decimal_places=2)
 
+
+
+class AgingQuerySerializer(serializers.Serializer):
+    """Options for an accounts receivable aging report or its drill-down."""
+    as_of = serializers.DateField(required=False)
+    customer = serializers.PrimaryKeyRelatedField(queryset=Customer.objects.all(), required=False)
+    # Drill-down only
+    bucket = serializers.ChoiceField(choices=list(BUCKETS), required=False)
+
+    def validate(self, attrs):
+        attrs.setdefault('as_of', timezone.localdate())
+        return attrs
+
+
+class AgingBucketsSerializer(serializers.Serializer):
+    """Open receivables per aging bucket."""
+    current = serializers.DecimalField(max_digits=16, decimal_places=2)
+    days_1_30 = serializers.DecimalField(max_digits=16, decimal_places=2)
+    days_31_60 = serializers.DecimalField(max_digits=16, decimal_places=2)
+    days_61_90 = serializers.DecimalField(max_digits=16, decimal_places=2)
+    days_over_90 = serializers.DecimalField(max_digits=16, decimal_places=2)
+    total = serializers.DecimalField(max_digits=16, decimal_places=2)
+    invoice_count = serializers.IntegerField()
+
+
+class AgingCustomerSerializer(AgingBucketsSerializer):
+    customer_id = serializers.IntegerField()
+    customer_code = serializers.CharField()
+    customer_name = serializers.CharField()
+
+
+class AgingReportSerializer(serializers.Serializer):
+    """Serializer for an accounts receivable aging report."""
+    as_of = serializers.DateField()
+    totals = AgingBucketsSerializer()
+    customers = AgingCustomerSerializer(many=True)
+
+
+class AgingInvoiceSerializer(serializers.Serializer):
+    """An open invoice in an aging drill-down."""
+    id = serializers.IntegerField()
+    invoice_number = serializers.CharField()
+    invoice_date = serializers.DateField()
+    due_date = serializers.DateField()
+    status = serializers.CharField()
+    total_amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+    sales_order = serializers.IntegerField(source='sales_order_id')
+    customer_code = serializers.CharField()
+    days_past_due = serializers.SerializerMethodField()
+
+    def get_days_past_due(self, row):
+        return max((self.context['as_of'] - row['due_date']).days, 0)
+
+
+class PaymentSerializer(serializers.ModelSerializer):
+    """Serializer for Payment model."""
+    # None once the invoice is archived
+    invoice_number = serializers.CharField(source='invoice.invoice_number', read_only=True, default=None)
+
+    class Meta:
+        model = Payment
+        fields = '__all__'
+        read_only_fields = ('invoice', 'statement_line', 'created_by', 'created_at')
+
+
+class InvoicePaymentSerializer(serializers.Serializer):
+    """A payment recorded against an invoice."""
+    amount = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=Decimal('0.01'))
+    payment_date = serializers.DateField(required=False)
+    method = serializers.ChoiceField(choices=Payment.METHOD_CHOICES, default='bank_transfer')
+    reference = serializers.CharField(max_length=500, required=False, default='')
+
+    def validate(self, attrs):
+        attrs.setdefault('payment_date', timezone.localdate())
+        return attrs
+
+
+class BankStatementSerializer(serializers.ModelSerializer):
+    """Serializer for BankStatement model."""
+    imported_by_username = serializers.CharField(source='imported_by.username', read_only=True)
+
+    class Meta:
+        model = BankStatement
+        fields = '__all__'
+
+
+class BankStatementLineSerializer(serializers.ModelSerializer):
+    """Serializer for BankStatementLine model."""
+    invoice_number = serializers.CharField(source='invoice.invoice_number', read_only=True, default=None)
+
+    class Meta:
+        model = BankStatementLine
+        fields = '__all__'
+
+
+class BankStatementImportSerializer(serializers.Serializer):
+    """
+    A bank statement to import: a CSV ``file`` with columns date, amount,
+    reference, counterparty, or the same as a JSON list of ``lines``.
+    """
+    REQUIRED_COLUMNS = ('date', 'amount')
+
+    reference = serializers.CharField(max_length=100, required=False, default='')
+    file = serializers.FileField(required=False)
+    lines = serializers.ListField(
+        child=serializers.DictField(),
+        required=False,
+        allow_empty=False,
+        max_length=settings.BANK_STATEMENT_MAX_LINES,
+    )
+
+    def validate_file(self, value):
+        """Parse the CSV into a list of line dicts."""
+        try:
+            reader = csv.DictReader(io.StringIO(value.read().decode('utf-8-sig')))
+            rows = [{column: cell for column, cell in row.items() if column} for row in reader]
+        except (UnicodeDecodeError, csv.Error) as exc:
+            raise serializers.ValidationError(f"Could not read CSV file: {exc}")
+
+        missing = [c for c in self.REQUIRED_COLUMNS if c not in (reader.fieldnames or [])]
+        if missing:
+            raise serializers.ValidationError(f"Missing required columns: {', '.join(missing)}")
+        if not rows:
+            raise serializers.ValidationError("The file contains no lines.")
+        if len(rows) > settings.BANK_STATEMENT_MAX_LINES:
+            raise serializers.ValidationError(f"At most {settings.BANK_STATEMENT_MAX_LINES} lines per statement.")
+        return rows
+
+    def validate(self, attrs):
+        if ('file' in attrs) == ('lines' in attrs):
+            raise serializers.ValidationError("Send either a CSV file or a list of lines.")
+        attrs['lines'] = attrs.pop('file', None) or attrs['lines']
+        _, errors = parse_statement_lines(attrs['lines'])
+        if errors:
+            # Line numbers as in the statement, first line 1
+            raise serializers.ValidationError({
+                'lines': {index + 1: messages for index, messages in list(errors.items())[:100]}
+            })
+        return attrs
+
+
+class StatementLineMatchSerializer(serializers.Serializer):
+    """The invoice a reviewed statement line pays."""
+    invoice = serializers.PrimaryKeyRelatedField(queryset=Invoice.objects.filter(status__in=Invoice.OPEN_STATUSES))
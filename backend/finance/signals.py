@@ -0,0 +1,81 @@
+from django.db.models.signals import post_init, pre_save, post_save, post_delete
+from django.dispatch import receiver
+from enterprisepro.events import publish
+from enterprisepro.lookups import bump_lookup_version
+from sales.models import adjust_exposure
+from .models import Account, Invoice
+
+INVOICE_EVENT_ROLES = ('admin', 'manager')
+
+
+@receiver([post_save, post_delete], sender=Account)
+def invalidate_account_lookup(sender, **kwargs):
+    """Drop cached account lookup rows when an account changes."""
+    bump_lookup_version(sender)
+
+
+@receiver(post_init, sender=Invoice)
+def remember_invoice_status(sender, instance, **kwargs):
+    """Remember the status an invoice was loaded with."""
+    if instance.pk is None or 'status' in instance.get_deferred_fields():
+        instance._saved_status = None
+    else:
+        instance._saved_status = instance.status
+
+
+@receiver(post_init, sender=Invoice)
+def remember_open_amount(sender, instance, **kwargs):
+    """Remember what a loaded invoice adds to its customer's open receivables."""
+    if instance.pk is None:
+        instance._saved_open_amount = 0
+    elif {'status', 'total_amount', 'amount_paid'} & instance.get_deferred_fields():
+        instance._saved_open_amount = None
+    else:
+        instance._saved_open_amount = instance.open_amount
+
+
+@receiver(pre_save, sender=Invoice)
+def load_open_amount(sender, instance, **kwargs):
+    """Read the stored open amount of an invoice loaded without status or amounts."""
+    if instance._saved_open_amount is None:
+        stored = Invoice.objects.filter(pk=instance.pk).only('status', 'total_amount', 'amount_paid').first()
+        instance._saved_open_amount = stored.open_amount if stored else 0
+
+
+@receiver(post_save, sender=Invoice)
+def update_customer_receivables(sender, instance, **kwargs):
+    """Keep the customer's open receivables counter in step with the invoice, in the same transaction."""
+    amount = instance.open_amount
+    if amount != instance._saved_open_amount:
+        adjust_exposure(instance.sales_order.customer_id, receivables=amount - instance._saved_open_amount)
+    instance._saved_open_amount = amount
+
+
+@receiver(post_delete, sender=Invoice)
+def remove_deleted_receivable(sender, instance, **kwargs):
+    """Take a deleted invoice off its customer's open receivables."""
+    if instance._saved_open_amount:
+        adjust_exposure(instance.sales_order.customer_id, receivables=-instance._saved_open_amount)
+
+
+@receiver(post_save, sender=Invoice)
+def publish_invoice_status_change(sender, instance, created, **kwargs):
+    """Push an event when an invoice moves to a new status."""
+    previous = instance._saved_status
+    instance._saved_status = instance.status
+    if created or previous is None or previous == instance.status:
+        return
+
+    publish(
+        'finance.invoice_status_changed',
+        {
+            'invoice': instance.pk,
+            'invoice_number': instance.invoice_number,
+            'sales_order': instance.sales_order_id,
+            'from_status': previous,
+            'to_status': instance.status,
+            'total_amount': instance.total_amount,
+        },
+        INVOICE_EVENT_ROLES,
+        instance.company_id,
+    )
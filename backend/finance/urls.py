@@ -1,14 +1,27 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import AccountViewSet, InvoiceViewSet, GeneralLedgerViewSet, DashboardViewSet
+from .views import (
+    AccountViewSet,
+    BankStatementLineViewSet,
+    BankStatementViewSet,
+    DashboardViewSet,
+    GeneralLedgerViewSet,
+    InvoiceViewSet,
+    PaymentViewSet,
+    dashboard_kpis_async,
+)
 
 router = DefaultRouter()
 router.register(r'accounts', AccountViewSet)
 router.register(r'invoices', InvoiceViewSet)
 router.register(r'ledger', GeneralLedgerViewSet)
+router.register(r'payments', PaymentViewSet)
+router.register(r'bank-statements', BankStatementViewSet)
+router.register(r'bank-statement-lines', BankStatementLineViewSet)
 router.register(r'dashboard', DashboardViewSet, basename='dashboard')
 
 urlpatterns = [
+    path('dashboard/kpis/async/', dashboard_kpis_async, name='dashboard_kpis_async'),
     path('', include(router.urls)),
 ]
 
@@ -1,19 +1,40 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Sum, Q, Count
+from django.db.models import Sum, Q, Count, F
+from django.http import JsonResponse
 from django.utils import timezone
 from datetime import datetime, timedelta
-from .models import Account, Invoice, GeneralLedger
+from archive.models import ArchivedInvoice
+from archive.serializers import ArchivedInvoiceSerializer
+from archive.views import ArchiveFallbackMixin
+from enterprisepro.async_views import async_api_view, run_concurrently
+from enterprisepro.db_router import ReplicaReadMixin
+from enterprisepro.lookups import LookupMixin
+from enterprisepro.projection import ProjectedListMixin
+from jobs.views import BackgroundJobMixin
+from sync.views import ChangeFeedMixin
+from .aging import aging_report, bucket_filter, open_invoices
+from .models import Account, BankStatement, BankStatementLine, Invoice, GeneralLedger, Payment
+from .payments import import_statement, match_statement_line, record_payment
 from .serializers import (
     AccountSerializer,
+    AgingInvoiceSerializer,
+    AgingQuerySerializer,
+    AgingReportSerializer,
+    BankStatementImportSerializer,
+    BankStatementLineSerializer,
+    BankStatementSerializer,
+    InvoicePaymentSerializer,
     InvoiceSerializer,
+    PaymentSerializer,
+    StatementLineMatchSerializer,
     GeneralLedgerSerializer,
     DashboardKPISerializer
 )
 
 
-class AccountViewSet(viewsets.ModelViewSet):
+class AccountViewSet(LookupMixin, viewsets.ModelViewSet):
     """ViewSet for Account CRUD operations."""
     queryset = Account.objects.filter(is_active=True)
     serializer_class = AccountSerializer
@@ -21,66 +42,227 @@ class AccountViewSet(viewsets.ModelViewSet):
     filterset_fields = ['account_type']
 
 
-class InvoiceViewSet(viewsets.ModelViewSet):
+class InvoiceViewSet(
+    ArchiveFallbackMixin, ReplicaReadMixin, ChangeFeedMixin, BackgroundJobMixin, ProjectedListMixin,
+    viewsets.ModelViewSet
+):
     """ViewSet for Invoice CRUD operations."""
+    replica_actions = ('list', 'retrieve', 'aging', 'aging_invoices')
     queryset = Invoice.objects.select_related('sales_order__customer').all()
     serializer_class = InvoiceSerializer
+    archive_queryset = ArchivedInvoice.objects.select_related('sales_order__customer')
+    archive_serializer_class = ArchivedInvoiceSerializer
     filterset_fields = ['status', 'invoice_date']
-    search_fields = ['invoice_number', 'sales_order__order_number', 'sales_order__customer__name']
+    search_vector_field = 'search_vector'
+    search_trigram_fields = ['invoice_number']
 
     def get_queryset(self):
         """Filter queryset based on query parameters."""
         queryset = super().get_queryset()
         return queryset
 
+    def create(self, request, *args, **kwargs):
+        """Create an invoice; with ``Prefer: respond-async`` as a background job (202)."""
+        if not self.wants_background(request):
+            return super().create(request, *args, **kwargs)
 
-class GeneralLedgerViewSet(viewsets.ReadOnlyModelViewSet):
+        # Reject bad input now rather than in a failed job
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return self.enqueue_job(request, 'finance.create_invoice', {'data': dict(request.data.items())})
+
+    @action(detail=True, methods=['post'], serializer_class=InvoicePaymentSerializer)
+    def pay(self, request, pk=None):
+        """
+        Record a (partial) payment: posts Debit Cash / Credit Accounts
+        Receivable and marks the invoice paid once its balance is settled.
+        """
+        invoice = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            payment = record_payment(invoice.pk, user=request.user, **serializer.validated_data)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(PaymentSerializer(payment).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['get'])
+    def aging(self, request):
+        """
+        Accounts receivable aging: unpaid invoices bucketed by days past due
+        on ``?as_of=`` (default today), in total and per customer
+        (``?customer=`` for one). One aggregate query.
+        """
+        options = AgingQuerySerializer(data=request.query_params)
+        options.is_valid(raise_exception=True)
+        report = aging_report(options.validated_data['as_of'], options.validated_data.get('customer'))
+        return Response(AgingReportSerializer(report).data)
+
+    @action(detail=False, methods=['get'], url_path='aging/invoices')
+    def aging_invoices(self, request):
+        """
+        Drill-down of the aging report: the open invoices on ``?as_of=``,
+        narrowed by ``?customer=`` and ``?bucket=``, most overdue first.
+        """
+        options = AgingQuerySerializer(data=request.query_params)
+        options.is_valid(raise_exception=True)
+        as_of = options.validated_data['as_of']
+        invoices = open_invoices(as_of)
+        if 'customer' in options.validated_data:
+            invoices = invoices.filter(sales_order__customer=options.validated_data['customer'])
+        if 'bucket' in options.validated_data:
+            invoices = invoices.filter(bucket_filter(options.validated_data['bucket'], as_of))
+        rows = invoices.order_by('due_date', 'id').values(
+            'id', 'invoice_number', 'invoice_date', 'due_date', 'status', 'total_amount', 'sales_order_id',
+            customer_code=F('sales_order__customer__code'),
+        )
+
+        page = self.paginate_queryset(rows)
+        serializer = AgingInvoiceSerializer(page, many=True, context={'as_of': as_of})
+        return self.get_paginated_response(serializer.data)
+
+
+class PaymentViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
+    """ViewSet for Payment read operations; ``?invoice=`` narrows to one invoice."""
+    # Prefetched rather than joined, so payments of archived invoices still list
+    queryset = Payment.objects.prefetch_related('invoice').all()
+    serializer_class = PaymentSerializer
+    filterset_fields = ['invoice']
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        invoice = self.request.query_params.get('invoice')
+        if invoice and invoice.isdigit():
+            queryset = queryset.filter(invoice_id=invoice)
+        return queryset
+
+
+class BankStatementViewSet(BackgroundJobMixin, viewsets.ReadOnlyModelViewSet):
+    """Imported bank statements; POST imports and matches a new one."""
+    queryset = BankStatement.objects.select_related('imported_by').all()
+    serializer_class = BankStatementSerializer
+
+    def get_serializer_class(self):
+        if self.action == 'create':
+            return BankStatementImportSerializer
+        return super().get_serializer_class()
+
+    def create(self, request):
+        """
+        Import a statement (CSV ``file`` or JSON ``lines``) and match its
+        lines to open invoices; see ``finance.payments``. With ``Prefer:
+        respond-async`` it runs as a background job (202).
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        lines, reference = serializer.validated_data['lines'], serializer.validated_data['reference']
+
+        if self.wants_background(request):
+            return self.enqueue_job(
+                request, 'finance.import_bank_statement', {'lines': lines, 'reference': reference}
+            )
+        try:
+            result = import_statement(lines, request.user, reference=reference)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_201_CREATED)
+
+
+class BankStatementLineViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Bank statement lines; ``?status=review`` is the review queue and
+    ``?statement=`` narrows to one statement.
+    """
+    queryset = BankStatementLine.objects.select_related('invoice').all()
+    serializer_class = BankStatementLineSerializer
+    filterset_fields = ['status', 'statement']
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        line_status = self.request.query_params.get('status')
+        if line_status:
+            queryset = queryset.filter(status=line_status).order_by('transaction_date', 'id')
+        statement = self.request.query_params.get('statement')
+        if statement and statement.isdigit():
+            queryset = queryset.filter(statement_id=statement)
+        return queryset
+
+    @action(detail=True, methods=['post'], serializer_class=StatementLineMatchSerializer)
+    def match(self, request, pk=None):
+        """Settle a line from the review queue against an invoice."""
+        line = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            match_statement_line(line.pk, serializer.validated_data['invoice'].pk, request.user)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        line.refresh_from_db()
+        return Response(BankStatementLineSerializer(line).data, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['post'])
+    def ignore(self, request, pk=None):
+        """Take a line out of the review queue without matching it."""
+        line = self.get_object()
+        if line.status != 'review':
+            return Response(
+                {'error': f'Only lines awaiting review can be ignored. Current status: {line.status}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        line.status = 'ignored'
+        line.save(update_fields=['status', 'updated_at'])
+        return Response(BankStatementLineSerializer(line).data, status=status.HTTP_200_OK)
+
+
+class GeneralLedgerViewSet(ReplicaReadMixin, ProjectedListMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet for GeneralLedger read operations."""
     queryset = GeneralLedger.objects.select_related('account', 'invoice').all()
     serializer_class = GeneralLedgerSerializer
     filterset_fields = ['account', 'transaction_type', 'transaction_date']
-    search_fields = ['account__code', 'description']
+    search_vector_field = 'search_vector'
 
 
-class DashboardViewSet(viewsets.ViewSet):
+class DashboardViewSet(ReplicaReadMixin, viewsets.ViewSet):
     """ViewSet for dashboard KPI endpoints."""
+    replica_actions = ('kpis',)
 
     @action(detail=False, methods=['get'])
     def kpis(self, request):
         """Get dashboard KPIs including monthly revenue."""
-        now = timezone.now()
-        start_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        start_of_year = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+        data = {name: query() for name, query in dashboard_kpi_queries().items()}
+        serializer = DashboardKPISerializer(data)
+        return Response(serializer.data)
+
+
+def dashboard_kpi_queries():
+    """The independent aggregate queries behind the dashboard KPIs, by field name."""
+    now = timezone.now()
+    start_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    start_of_year = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    unpaid = Invoice.objects.filter(status__in=['draft', 'sent'])
 
+    return {
         # Total revenue for current month
-        monthly_revenue = Invoice.objects.filter(
+        'total_revenue_month': lambda: Invoice.objects.filter(
             status='paid',
             invoice_date__gte=start_of_month
-        ).aggregate(total=Sum('total_amount'))['total'] or 0
-
+        ).aggregate(total=Sum('total_amount'))['total'] or 0,
         # Total revenue for current year
-        yearly_revenue = Invoice.objects.filter(
+        'total_revenue_year': lambda: Invoice.objects.filter(
             status='paid',
             invoice_date__gte=start_of_year
-        ).aggregate(total=Sum('total_amount'))['total'] or 0
-
+        ).aggregate(total=Sum('total_amount'))['total'] or 0,
         # Pending invoices count
-        pending_invoices = Invoice.objects.filter(
-            status__in=['draft', 'sent']
-        ).count()
-
-        # Total accounts receivable (unpaid invoices)
-        accounts_receivable = Invoice.objects.filter(
-            status__in=['draft', 'sent']
-        ).aggregate(total=Sum('total_amount'))['total'] or 0
-
-        data = {
-            'total_revenue_month': monthly_revenue,
-            'total_revenue_year': yearly_revenue,
-            'pending_invoices': pending_invoices,
-            'total_accounts_receivable': accounts_receivable,
-        }
+        'pending_invoices': unpaid.count,
+        # Total accounts receivable (unpaid balance of open invoices)
+        'total_accounts_receivable': lambda: unpaid.aggregate(
+            total=Sum(F('total_amount') - F('amount_paid'))
+        )['total'] or 0,
+    }
 
-        serializer = DashboardKPISerializer(data)
-        return Response(serializer.data)
 
+@async_api_view()
+async def dashboard_kpis_async(request):
+    """Dashboard KPIs with the four aggregates running concurrently."""
+    data = await run_concurrently(dashboard_kpi_queries(), user=request.user)
+    return JsonResponse(DashboardKPISerializer(data).data)
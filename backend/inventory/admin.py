@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Product, Warehouse, InventoryItem
+from .models import CostLayer, Product, Warehouse, InventoryItem
 
 
 @admin.register(Product)
@@ -17,7 +17,13 @@ class WarehouseAdmin(admin.ModelAdmin):
 
 @admin.register(InventoryItem)
 class InventoryItemAdmin(admin.ModelAdmin):
-    list_display = ('product', 'warehouse', 'quantity', 'minimum_stock_level', 'needs_reorder')
+    list_display = ('product', 'warehouse', 'quantity', 'reserved', 'minimum_stock_level', 'needs_reorder')
     list_filter = ('warehouse', 'product__category')
     search_fields = ('product__sku', 'product__name')
 
+
+
+@admin.register(CostLayer)
+class CostLayerAdmin(admin.ModelAdmin):
+    list_display = ('inventory_item', 'quantity', 'remaining', 'unit_cost', 'reference', 'received_at')
+    raw_id_fields = ('inventory_item',)
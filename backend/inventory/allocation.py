@@ -0,0 +1,174 @@
+"""
+Multi-warehouse stock allocation.
+
+Given order lines as ``(product_id, quantity)``, decide which warehouses
+ship how much of each line. The candidate stock for every product in the
+order (or a whole batch of orders) is loaded with one query. Each order is
+then allocated in a single pass over those rows in memory, so large orders
+spread over dozens of warehouses stay cheap.
+
+Policies:
+
+* ``fewest_splits`` - ship the order from as few warehouses as possible
+  (greedy set cover: repeatedly use the warehouse that can ship the most of
+  what is still open, ties broken by priority).
+* ``priority`` - fill each line from warehouses in ``Warehouse.priority``
+  order.
+* ``balance`` - draw from the warehouses holding the most stock first,
+  levelling quantities across warehouses.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import F
+
+from .models import InventoryItem
+
+POLICY_CHOICES = [
+    ('fewest_splits', 'Fewest splits'),
+    ('priority', 'Warehouse priority'),
+    ('balance', 'Balance stock'),
+]
+POLICIES = [value for value, _ in POLICY_CHOICES]
+
+
+class AllocationError(ValueError):
+    """Not enough stock across all warehouses to allocate an order."""
+
+
+class Allocator:
+    """
+    Allocates orders against stock loaded once for ``product_ids``.
+
+    Allocations are deducted from the loaded stock, so several orders (e.g.
+    a bulk ingestion batch) can be allocated in turn without overcommitting.
+    """
+
+    def __init__(self, product_ids):
+        # product_id -> {warehouse_id: available (unreserved) quantity}
+        self.stock = defaultdict(dict)
+        # warehouse_id -> sort key, lower ships first
+        self.priority = {}
+        rows = InventoryItem.objects.filter(
+            product_id__in=set(product_ids),
+            quantity__gt=F('reserved'),
+            warehouse__is_active=True,
+        ).values_list('product_id', 'warehouse_id', F('quantity') - F('reserved'), 'warehouse__priority')
+        for product_id, warehouse_id, available, priority in rows:
+            self.stock[product_id][warehouse_id] = available
+            self.priority[warehouse_id] = (priority, warehouse_id)
+
+    def fork(self, product_ids):
+        """
+        An allocator over a copy of the stock of ``product_ids``, for
+        allocations that may be discarded; ``join`` keeps them.
+        """
+        fork = Allocator.__new__(Allocator)
+        fork.stock = defaultdict(dict, {
+            product_id: dict(self.stock[product_id]) for product_id in set(product_ids)
+        })
+        fork.priority = self.priority
+        return fork
+
+    def join(self, fork):
+        """Deduct what was allocated or held on ``fork`` from this allocator's stock."""
+        self.stock.update(fork.stock)
+
+    def hold(self, product_id, warehouse_id, quantity):
+        """Take stock already promised to a line with a fixed warehouse out of the pool."""
+        stock = self.stock[product_id]
+        if warehouse_id in stock:
+            stock[warehouse_id] = max(stock[warehouse_id] - quantity, 0)
+
+    def allocate(self, lines, policy=None, describe=str):
+        """
+        Allocate ``lines`` (``[(product_id, quantity), ...]``) and return
+        ``[(line_index, warehouse_id, quantity), ...]``.
+
+        Raises AllocationError, leaving the stock untouched, if any product
+        is short; ``describe(product_id)`` names the product in the message.
+        """
+        policy = policy or settings.ALLOCATION_DEFAULT_POLICY
+        if policy not in POLICIES:
+            raise AllocationError(f'Unknown allocation policy "{policy}".')
+
+        demand = defaultdict(int)
+        for product_id, quantity in lines:
+            demand[product_id] += quantity
+        for product_id, quantity in demand.items():
+            available = sum(self.stock[product_id].values())
+            if available < quantity:
+                raise AllocationError(
+                    f'Insufficient inventory for {describe(product_id)} across all warehouses. '
+                    f'Available: {available}, Required: {quantity}'
+                )
+
+        # Every line fits, so stock is deducted as allocation proceeds
+        if policy == 'fewest_splits':
+            return self._fewest_splits(lines)
+        take = self._priority if policy == 'priority' else self._balance
+        allocation = []
+        for index, (product_id, quantity) in enumerate(lines):
+            for warehouse_id, taken in take(product_id, quantity):
+                self.stock[product_id][warehouse_id] -= taken
+                allocation.append((index, warehouse_id, taken))
+        return allocation
+
+    def _priority(self, product_id, quantity):
+        stock = self.stock[product_id]
+        plan = []
+        for warehouse_id in sorted(stock, key=self.priority.__getitem__):
+            if quantity == 0:
+                break
+            taken = min(stock[warehouse_id], quantity)
+            if taken:
+                quantity -= taken
+                plan.append((warehouse_id, taken))
+        return plan
+
+    def _balance(self, product_id, quantity):
+        """Water-fill: draw the fullest warehouses down to a common level."""
+        levels = sorted(
+            ((available, warehouse_id) for warehouse_id, available in self.stock[product_id].items() if available),
+            key=lambda level: (-level[0], self.priority[level[1]]),
+        )
+        # Find how many of the fullest warehouses must be drawn down
+        drawn, total = len(levels), sum(available for available, _ in levels)
+        running = 0
+        for count, (available, _) in enumerate(levels, start=1):
+            running += available
+            below = levels[count][0] if count < len(levels) else 0
+            if running - below * count >= quantity:
+                drawn, total = count, running
+                break
+        level, extra = divmod(total - quantity, drawn)
+        plan = []
+        for position, (available, warehouse_id) in enumerate(levels[:drawn]):
+            # The first ``extra`` warehouses keep one unit more than the level
+            taken = available - level - (1 if position < extra else 0)
+            if taken:
+                plan.append((warehouse_id, taken))
+        return plan
+
+    def _fewest_splits(self, lines):
+        remaining = [quantity for _, quantity in lines]
+        warehouses = {warehouse_id for product_id, _ in lines for warehouse_id in self.stock[product_id]}
+
+        def coverage(warehouse_id):
+            return sum(
+                min(remaining[index], self.stock[product_id].get(warehouse_id, 0))
+                for index, (product_id, _) in enumerate(lines)
+            )
+
+        allocation = []
+        while any(remaining):
+            # Most open units covered; on ties the higher-priority warehouse
+            best = min(warehouses, key=lambda w: (-coverage(w), self.priority[w]))
+            warehouses.discard(best)
+            for index, (product_id, _) in enumerate(lines):
+                taken = min(remaining[index], self.stock[product_id].get(best, 0))
+                if taken:
+                    remaining[index] -= taken
+                    self.stock[product_id][best] -= taken
+                    allocation.append((index, best, taken))
+        return allocation
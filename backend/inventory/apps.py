@@ -5,3 +5,6 @@ class InventoryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'inventory'
 
+    def ready(self):
+        from . import signals  # noqa: F401
+
@@ -0,0 +1,196 @@
+"""
+ABC/XYZ classification of inventory items (product + warehouse).
+
+* ABC ranks the items of each warehouse by revenue over the last
+  ``CLASSIFICATION_WINDOW_WEEKS``: the items making up the first 80% of the
+  warehouse's revenue are A, the next 15% B, the rest (and items without
+  sales) C.
+* XYZ grades the week-to-week variability of demand over the same window by
+  its coefficient of variation (std / mean): up to 0.5 is X, up to 1.0 Y,
+  above that (or no demand) Z.
+
+Revenue and variability are computed with NumPy over an items x weeks
+matrix loaded with one grouped query. An incremental run only re-reads the
+sales of products with orders created or changed since the previous run;
+the other items keep their stored revenue and variability, and all items
+are ranked again. Old sales leaving the window are only accounted for by a
+``full`` run, which should be scheduled regularly (e.g. weekly).
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from sales.models import SalesOrder, SalesOrderItem
+from .forecasting import DEMAND_STATUSES
+from .models import ClassificationRun, InventoryItem
+
+ABC_THRESHOLDS = (0.80, 0.95)
+XYZ_THRESHOLDS = (0.5, 1.0)
+UPDATE_CHUNK_SIZE = 10000
+
+
+def classify_inventory(full=False, progress=None):
+    """Reclassify inventory items; return a summary of the run."""
+    started_at = timezone.now()
+    previous = ClassificationRun.objects.first()
+    full = full or previous is None
+
+    products = None
+    if not full:
+        products = list(
+            SalesOrderItem.objects.filter(sales_order__updated_at__gte=previous.started_at)
+            .order_by()
+            .values_list('product_id', flat=True)
+            .distinct()
+        )
+
+    rows = list(InventoryItem.objects.order_by('pk').values_list(
+        'pk', 'product_id', 'warehouse_id', 'class_revenue', 'demand_variation', 'abc_class', 'xyz_class'
+    ))
+    ids = np.array([row[0] for row in rows], dtype=np.int64)
+    item_products = np.array([row[1] for row in rows], dtype=np.int64)
+    warehouses = np.array([row[2] for row in rows], dtype=np.int64)
+    revenue = np.array([row[3] for row in rows], dtype=np.float64)
+    variation = np.array([np.nan if row[4] is None else row[4] for row in rows], dtype=np.float64)
+    old_abc = np.array([row[5] for row in rows], dtype='<U1')
+    old_xyz = np.array([row[6] for row in rows], dtype='<U1')
+    if progress is not None:
+        progress(1, 3)
+
+    # Items whose sales are re-read
+    touched = np.ones(len(ids), dtype=bool) if products is None else np.isin(item_products, products)
+    if touched.any():
+        weekly, weekly_revenue = _weekly_sales(item_products, warehouses, touched, products)
+        revenue[touched] = weekly_revenue
+        mean = weekly.mean(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            variation[touched] = np.where(mean > 0, weekly.std(axis=1) / mean, np.nan)
+    if progress is not None:
+        progress(2, 3)
+
+    abc = _abc(warehouses, revenue)
+    xyz = np.where(
+        np.isnan(variation), 'Z',
+        np.where(variation <= XYZ_THRESHOLDS[0], 'X', np.where(variation <= XYZ_THRESHOLDS[1], 'Y', 'Z'))
+    )
+    reclassified = (abc != old_abc) | (xyz != old_xyz)
+    # Re-read items also store their new revenue and variability
+    changed = reclassified | touched
+
+    with transaction.atomic():
+        _save(ids[changed], abc[changed], xyz[changed], revenue[changed], variation[changed])
+        ClassificationRun.objects.create(
+            started_at=started_at,
+            full=full,
+            products=len(np.unique(item_products)) if products is None else len(products),
+            changed=int(reclassified.sum()),
+        )
+    if progress is not None:
+        progress(3, 3)
+
+    return {
+        'full': full,
+        'items': len(ids),
+        'reclassified': int(reclassified.sum()),
+        'classes': {
+            f'{a}{x}': int(((abc == a) & (xyz == x)).sum())
+            for a in 'ABC' for x in 'XYZ'
+        },
+    }
+
+
+def _weekly_sales(item_products, warehouses, touched, products):
+    """
+    Return (touched items x weeks demand matrix, revenue per touched item)
+    over the classification window.
+    """
+    weeks = settings.CLASSIFICATION_WINDOW_WEEKS
+    today = timezone.localdate()
+    end = today - timedelta(days=today.weekday())
+    start = end - timedelta(weeks=weeks)
+    sql = f"""
+        SELECT line.product_id, line.warehouse_id, (header.order_date - %s) / 7,
+               SUM(line.quantity), SUM(line.line_total)
+        FROM {SalesOrderItem._meta.db_table} line
+        JOIN {SalesOrder._meta.db_table} header ON header.id = line.sales_order_id
+        WHERE header.status IN %s AND header.order_date >= %s AND header.order_date < %s
+        {'AND line.product_id = ANY(%s)' if products is not None else ''}
+        GROUP BY 1, 2, 3
+    """
+    params = [start, DEMAND_STATUSES, start, end] + ([products] if products is not None else [])
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        sales = np.array(cursor.fetchall(), dtype=np.float64).reshape(-1, 5)
+
+    item_products, warehouses = item_products[touched], warehouses[touched]
+    demand = np.zeros((len(item_products), weeks))
+    revenue = np.zeros(len(item_products))
+    if not len(item_products) or not len(sales):
+        return demand, revenue
+    # Match (product, warehouse) pairs to items by a combined key
+    sale_products, sale_warehouses = sales[:, 0].astype(np.int64), sales[:, 1].astype(np.int64)
+    stride = int(max(warehouses.max(), sale_warehouses.max())) + 1
+    keys = item_products * stride + warehouses
+    by_key = np.argsort(keys)
+    sale_keys = sale_products * stride + sale_warehouses
+    row = by_key[np.searchsorted(keys, sale_keys, sorter=by_key).clip(max=len(keys) - 1)]
+    found = keys[row] == sale_keys
+    demand[row[found], sales[found, 2].astype(np.int64)] = sales[found, 3]
+    np.add.at(revenue, row[found], sales[found, 4])
+    return demand, revenue
+
+
+def _abc(warehouses, revenue):
+    """
+    Classify by cumulative share of each warehouse's revenue, highest first
+    (ties in item order, so unchanged revenue keeps its class).
+    """
+    classes = np.full(len(revenue), 'C', dtype='<U1')
+    if not len(revenue):
+        return classes
+    order = np.lexsort((np.arange(len(revenue)), -revenue, warehouses))
+    sorted_warehouses, sorted_revenue = warehouses[order], revenue[order]
+    cumulative = np.cumsum(sorted_revenue)
+    # Offset each warehouse's running total to start at zero
+    starts = np.flatnonzero(np.r_[True, sorted_warehouses[1:] != sorted_warehouses[:-1]])
+    group = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(order)]))
+    before = np.r_[0, cumulative][starts][group]
+    totals = np.add.reduceat(sorted_revenue, starts)[group]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Share of the warehouse's revenue ranked above the item
+        share_before = np.where(totals > 0, (cumulative - sorted_revenue - before) / totals, 1.0)
+    sorted_classes = np.where(
+        sorted_revenue <= 0, 'C',
+        np.where(share_before < ABC_THRESHOLDS[0], 'A', np.where(share_before < ABC_THRESHOLDS[1], 'B', 'C'))
+    )
+    classes[order] = sorted_classes
+    return classes
+
+
+def _save(ids, abc, xyz, revenue, variation):
+    table = InventoryItem._meta.db_table
+    now = timezone.now()
+    with connection.cursor() as cursor:
+        for start in range(0, len(ids), UPDATE_CHUNK_SIZE):
+            chunk = slice(start, start + UPDATE_CHUNK_SIZE)
+            cursor.execute(
+                f"""
+                UPDATE {table} AS item
+                SET abc_class = new.abc, xyz_class = new.xyz,
+                    class_revenue = new.revenue, demand_variation = new.variation, updated_at = %s
+                FROM unnest(%s::integer[], %s::varchar[], %s::varchar[], %s::numeric[], %s::double precision[])
+                    AS new(id, abc, xyz, revenue, variation)
+                WHERE item.id = new.id
+                """,
+                [
+                    now,
+                    ids[chunk].tolist(),
+                    abc[chunk].tolist(),
+                    xyz[chunk].tolist(),
+                    np.round(revenue[chunk], 2).tolist(),
+                    [None if np.isnan(value) else value for value in variation[chunk].tolist()],
+                ],
+            )
@@ -0,0 +1,144 @@
+"""
+Inventory costing.
+
+Every receipt of stock adds a ``CostLayer`` (units at one unit cost) and
+every issue consumes layers oldest first, so the layers always hold the
+units on hand. What an issue costs depends on the product's
+``costing_method``:
+
+* ``fifo`` - the cost of the layers it consumed
+* ``average`` - the item's running weighted-average cost per unit
+
+``InventoryItem.stock_value`` is kept up to date on every movement, so
+valuation reports sum one column instead of replaying receipts.
+``receive_many`` books large receipts (whole purchase orders) with bulk
+statements instead.
+
+The functions below work on an ``InventoryItem`` locked with
+``select_for_update()`` and update its ``quantity`` and ``stock_value`` in
+memory; the caller saves them. Units on hand when cost tracking started
+got an opening layer at the product's ``unit_price`` (migration
+``0011_opening_cost_layers``); units without a layer are issued at no cost.
+"""
+from collections import Counter
+from decimal import Decimal
+
+from django.db import connection
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import CostLayer, InventoryItem
+
+COST_PLACES = Decimal('0.0001')
+UPDATE_CHUNK_SIZE = 10000
+
+
+def receive(item, quantity, unit_cost, reference=''):
+    """Add ``quantity`` units at ``unit_cost`` to a locked ``item``."""
+    unit_cost = Decimal(unit_cost).quantize(COST_PLACES)
+    layer = CostLayer.objects.create(
+        inventory_item=item,
+        quantity=quantity,
+        remaining=quantity,
+        unit_cost=unit_cost,
+        reference=reference,
+    )
+    item.quantity += quantity
+    item.stock_value += quantity * unit_cost
+    return layer
+
+
+def receive_many(receipts):
+    """
+    Receive ``[(item_id, quantity, unit_cost, reference), ...]`` into items
+    the caller has locked: one cost layer per receipt, inserted in batches,
+    and one UPDATE of the items' quantity and stock value per chunk. Skips
+    model signals; returns the total value received.
+    """
+    layers = []
+    quantities, values = Counter(), Counter()
+    for item_id, quantity, unit_cost, reference in receipts:
+        unit_cost = Decimal(unit_cost).quantize(COST_PLACES)
+        layers.append(CostLayer(
+            inventory_item_id=item_id, quantity=quantity, remaining=quantity, unit_cost=unit_cost, reference=reference,
+        ))
+        quantities[item_id] += quantity
+        values[item_id] += quantity * unit_cost
+    CostLayer.objects.bulk_create(layers, batch_size=2000)
+
+    ids = list(quantities)
+    now = timezone.now()
+    with connection.cursor() as cursor:
+        for start in range(0, len(ids), UPDATE_CHUNK_SIZE):
+            chunk = ids[start:start + UPDATE_CHUNK_SIZE]
+            cursor.execute(
+                f"""
+                UPDATE {InventoryItem._meta.db_table} AS item
+                SET quantity = item.quantity + new.quantity, stock_value = item.stock_value + new.value,
+                    updated_at = %s
+                FROM unnest(%s::integer[], %s::integer[], %s::numeric[]) AS new(id, quantity, value)
+                WHERE item.id = new.id
+                """,
+                [now, chunk, [quantities[pk] for pk in chunk], [values[pk] for pk in chunk]],
+            )
+    return sum(values.values(), Decimal(0))
+
+
+def issue(item, quantities):
+    """
+    Take each of ``quantities`` out of a locked ``item`` in turn and return
+    the cost of each. Consumed layers are saved with one query.
+    """
+    layers = list(item.cost_layers.filter(remaining__gt=0).order_by('received_at', 'id'))
+    touched = {}
+    costs = []
+    position = 0
+    for quantity in quantities:
+        fifo_cost = Decimal(0)
+        open_units = quantity
+        while open_units and position < len(layers):
+            layer = layers[position]
+            taken = min(layer.remaining, open_units)
+            layer.remaining -= taken
+            open_units -= taken
+            fifo_cost += taken * layer.unit_cost
+            touched[layer.pk] = layer
+            if not layer.remaining:
+                position += 1
+
+        if item.product.costing_method == 'average':
+            cost = item.stock_value if quantity >= item.quantity else item.average_cost * quantity
+        else:
+            cost = fifo_cost
+        cost = min(Decimal(cost).quantize(COST_PLACES), item.stock_value)
+        item.quantity -= quantity
+        item.stock_value -= cost
+        costs.append(cost)
+
+    CostLayer.objects.bulk_update(touched.values(), ['remaining'])
+    return costs
+
+
+def adjust(item, quantity, unit_cost=None, reference='adjustment'):
+    """
+    Move a locked ``item`` to ``quantity`` on hand, e.g. after a stock
+    count: extra units are received at ``unit_cost`` (default: the current
+    average cost) and missing ones are issued.
+    """
+    difference = quantity - item.quantity
+    if difference > 0:
+        receive(item, difference, item.average_cost if unit_cost is None else unit_cost, reference)
+    elif difference < 0:
+        issue(item, [-difference])
+
+
+def valuation(queryset=None, group_by=None):
+    """
+    Total quantity and value of ``queryset`` (all inventory items by
+    default), optionally grouped by a field path such as ``warehouse__code``.
+    """
+    queryset = InventoryItem.objects.all() if queryset is None else queryset
+    totals = {'quantity': Sum('quantity'), 'value': Sum('stock_value')}
+    if group_by is None:
+        return queryset.aggregate(**totals)
+    return queryset.order_by().values(group_by).annotate(**totals).order_by(group_by)
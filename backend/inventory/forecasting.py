@@ -0,0 +1,177 @@
+"""
+Demand forecasting for reorder points.
+
+Weekly demand per inventory item (product + warehouse) is read from sales
+order lines with one grouped query and laid out as an items x weeks NumPy
+matrix. Every statistic is then computed for all items at once:
+
+* level - mean weekly demand over the last ``FORECAST_WINDOW_WEEKS``
+* seasonality - with a year of history, last year's demand over the coming
+  lead time + cover period relative to last year's level at that point
+  (clipped to ``SEASONAL_FACTOR_RANGE``)
+* variability - standard deviation of weekly demand over the window
+
+and turned into
+
+* ``minimum_stock_level`` (reorder point) = forecast demand over the lead
+  time + safety stock (z for ``FORECAST_SERVICE_LEVEL`` x std x sqrt(lead time))
+* ``reorder_quantity`` = forecast demand over ``FORECAST_COVER_WEEKS``
+
+Items without any demand in the history keep their hand-entered values.
+Changed rows are written with one ``UPDATE ... FROM unnest(...)`` per chunk,
+which skips model signals.
+"""
+import math
+from datetime import timedelta
+from statistics import NormalDist
+
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from enterprisepro.tenancy import current_company_id
+from sales.models import SalesOrder, SalesOrderItem
+from .models import InventoryItem
+
+# Order statuses that count as demand
+DEMAND_STATUSES = ('confirmed', 'fulfilled', 'invoiced')
+SEASON_WEEKS = 52
+SEASONAL_FACTOR_RANGE = (0.5, 2.0)
+UPDATE_CHUNK_SIZE = 10000
+# Largest changes reported back in the result
+TOP_CHANGES = 50
+
+
+def forecast_reorder_points(apply=False, warehouse=None, progress=None):
+    """
+    Recommend ``minimum_stock_level`` and ``reorder_quantity`` for every
+    inventory item (of ``warehouse`` if given) and, with ``apply``, save
+    the changed ones. ``progress(done, total)`` is called per phase.
+    """
+    history = settings.FORECAST_HISTORY_WEEKS
+    window = min(settings.FORECAST_WINDOW_WEEKS, history)
+    lead_time = settings.FORECAST_LEAD_TIME_WEEKS
+    cover = settings.FORECAST_COVER_WEEKS
+    z = NormalDist().inv_cdf(settings.FORECAST_SERVICE_LEVEL)
+
+    items = InventoryItem.objects.order_by()
+    if warehouse is not None:
+        items = items.filter(warehouse=warehouse)
+    rows = np.array(
+        list(items.values_list('pk', 'product_id', 'warehouse_id', 'minimum_stock_level', 'reorder_quantity')),
+        dtype=np.int64,
+    ).reshape(-1, 5)
+    ids, products, warehouses, old_minimum, old_reorder = rows.T
+
+    # Whole weeks only, ending with the last full week before today
+    today = timezone.localdate()
+    end = today - timedelta(days=today.weekday())
+    start = end - timedelta(weeks=history)
+    demand = _weekly_demand(products, warehouses, start, end, history, warehouse)
+    if progress is not None:
+        progress(1, 3)
+
+    has_history = demand.any(axis=1)
+    recent = demand[:, -window:]
+    level = recent.mean(axis=1)
+    spread = recent.std(axis=1)
+
+    horizon = lead_time + cover
+    seasonal = np.ones(len(ids))
+    if history >= SEASON_WEEKS + window and horizon <= SEASON_WEEKS:
+        last_year = history - SEASON_WEEKS
+        level_then = demand[:, last_year - window:last_year].mean(axis=1)
+        demand_then = demand[:, last_year:last_year + horizon].sum(axis=1)
+        # Only items already selling a year ago carry a seasonal pattern
+        known = level_then > 0
+        seasonal[known] = np.clip(
+            demand_then[known] / (level_then[known] * horizon), *SEASONAL_FACTOR_RANGE
+        )
+    forecast = level * seasonal
+
+    minimum = np.ceil(forecast * lead_time + z * spread * math.sqrt(lead_time)).astype(np.int64)
+    reorder = np.ceil(forecast * cover).astype(np.int64)
+    changed = has_history & ((minimum != old_minimum) | (reorder != old_reorder))
+    if progress is not None:
+        progress(2, 3)
+
+    if apply and changed.any():
+        _save(ids[changed], minimum[changed], reorder[changed])
+    if progress is not None:
+        progress(3, 3)
+
+    # Report the largest moves in the reorder point
+    top = np.flatnonzero(changed)
+    top = top[np.argsort(-np.abs(minimum - old_minimum)[top], kind='stable')[:TOP_CHANGES]]
+    changes = [
+        {
+            'inventory_item': int(ids[i]),
+            'product': int(products[i]),
+            'warehouse': int(warehouses[i]),
+            'weekly_forecast': round(float(forecast[i]), 2),
+            'minimum_stock_level': [int(old_minimum[i]), int(minimum[i])],
+            'reorder_quantity': [int(old_reorder[i]), int(reorder[i])],
+        }
+        for i in top
+    ]
+    return {
+        'items': len(ids),
+        'forecast': int(has_history.sum()),
+        'changed': int(changed.sum()),
+        'applied': bool(apply),
+        'history_start': start,
+        'history_end': end - timedelta(days=1),
+        'changes': changes,
+    }
+
+
+def _weekly_demand(products, warehouses, start, end, weeks, warehouse):
+    """Return an items x weeks matrix of units ordered, oldest week first."""
+    company = current_company_id()
+    sql = f"""
+        SELECT line.product_id, line.warehouse_id, (header.order_date - %s) / 7, SUM(line.quantity)
+        FROM {SalesOrderItem._meta.db_table} line
+        JOIN {SalesOrder._meta.db_table} header ON header.id = line.sales_order_id
+        WHERE header.status IN %s AND header.order_date >= %s AND header.order_date < %s
+        {'AND header.company_id = %s' if company is not None else ''}
+        {'AND line.warehouse_id = %s' if warehouse is not None else ''}
+        GROUP BY 1, 2, 3
+    """
+    params = [start, DEMAND_STATUSES, start, end]
+    params += ([company] if company is not None else []) + ([warehouse] if warehouse is not None else [])
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        sales = np.array(cursor.fetchall(), dtype=np.int64).reshape(-1, 4)
+
+    matrix = np.zeros((len(products), weeks))
+    if not len(products) or not len(sales):
+        return matrix
+    # Match (product, warehouse) pairs to inventory rows by a combined key
+    stride = int(max(warehouses.max(), sales[:, 1].max())) + 1
+    keys = products * stride + warehouses
+    by_key = np.argsort(keys)
+    sale_keys = sales[:, 0] * stride + sales[:, 1]
+    position = np.searchsorted(keys, sale_keys, sorter=by_key).clip(max=len(keys) - 1)
+    row = by_key[position]
+    # Sales of pairs with no inventory record are dropped
+    found = keys[row] == sale_keys
+    matrix[row[found], sales[found, 2]] = sales[found, 3]
+    return matrix
+
+
+def _save(ids, minimum, reorder):
+    table = InventoryItem._meta.db_table
+    now = timezone.now()
+    with transaction.atomic(), connection.cursor() as cursor:
+        for start in range(0, len(ids), UPDATE_CHUNK_SIZE):
+            chunk = slice(start, start + UPDATE_CHUNK_SIZE)
+            cursor.execute(
+                f"""
+                UPDATE {table} AS item
+                SET minimum_stock_level = new.minimum, reorder_quantity = new.reorder, updated_at = %s
+                FROM unnest(%s::integer[], %s::integer[], %s::integer[]) AS new(id, minimum, reorder)
+                WHERE item.id = new.id
+                """,
+                [now, ids[chunk].tolist(), minimum[chunk].tolist(), reorder[chunk].tolist()],
+            )
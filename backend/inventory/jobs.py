@@ -0,0 +1,74 @@
+from django.db import transaction
+from enterprisepro.lookups import bump_lookup_version
+from jobs.registry import register
+from .classification import classify_inventory
+from .forecasting import forecast_reorder_points
+from .models import Product
+from .serializers import ProductImportRowSerializer
+
+IMPORT_CHUNK_SIZE = 500
+
+
+def import_products(rows, progress=None):
+    """
+    Create or update products by SKU from CSV rows (dicts keyed by header).
+
+    Rows are validated and upserted in chunks, one ``INSERT ... ON CONFLICT``
+    per chunk. Only the columns present in the file are updated on existing
+    products. Invalid rows are skipped and reported by line number.
+    """
+    columns = set(rows[0]) & set(ProductImportRowSerializer.Meta.fields) if rows else set()
+    update_fields = sorted(columns - {'sku'}) + ['updated_at']
+    created = updated = 0
+    errors = []
+
+    for start in range(0, len(rows), IMPORT_CHUNK_SIZE):
+        products = {}
+        # Line 1 of the file is the header
+        for line, row in enumerate(rows[start:start + IMPORT_CHUNK_SIZE], start=start + 2):
+            serializer = ProductImportRowSerializer(data=row)
+            if serializer.is_valid():
+                # A SKU repeated in the file: the last row wins
+                products[serializer.validated_data['sku']] = Product(**serializer.validated_data)
+            else:
+                errors.append({'line': line, 'errors': serializer.errors})
+
+        if products:
+            existing = set(Product.objects.filter(sku__in=products).values_list('sku', flat=True))
+            with transaction.atomic():
+                Product.objects.bulk_create(
+                    products.values(),
+                    update_conflicts=True,
+                    unique_fields=['company', 'sku'],
+                    update_fields=update_fields,
+                )
+            created += len(products.keys() - existing)
+            updated += len(existing)
+        if progress is not None:
+            progress(min(start + IMPORT_CHUNK_SIZE, len(rows)), len(rows))
+
+    # bulk_create does not send post_save
+    bump_lookup_version(Product)
+    return {'created': created, 'updated': updated, 'errors': errors}
+
+
+@register('inventory.import_products', concurrency=1)
+def import_products_job(job):
+    """Run a product CSV import (queued by the import action)."""
+    return import_products(job.payload['rows'], progress=job.set_progress)
+
+
+@register('inventory.forecast_reorder_points', concurrency=1)
+def forecast_reorder_points_job(job):
+    """Recommend, and optionally save, reorder points from sales history."""
+    return forecast_reorder_points(
+        apply=job.payload.get('apply', False),
+        warehouse=job.payload.get('warehouse'),
+        progress=job.set_progress,
+    )
+
+
+@register('inventory.classify_inventory', concurrency=1)
+def classify_inventory_job(job):
+    """Recompute ABC/XYZ classes (incrementally unless ``full``)."""
+    return classify_inventory(full=job.payload.get('full', False), progress=job.set_progress)
@@ -0,0 +1,31 @@
+import time
+
+from enterprisepro.tenancy import CompanyCommand
+from inventory.forecasting import forecast_reorder_points
+
+
+class Command(CompanyCommand):
+    help = 'Recompute minimum stock levels and reorder quantities from sales history.'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Report the recommended changes without saving them.',
+        )
+        parser.add_argument('--warehouse', type=int, help='Only items of this warehouse id.')
+
+    def handle_company(self, company, **options):
+        started = time.monotonic()
+        result = forecast_reorder_points(apply=not options['dry_run'], warehouse=options['warehouse'])
+        for change in result['changes'][:10]:
+            self.stdout.write(
+                f"  item {change['inventory_item']}: min {change['minimum_stock_level'][0]} -> "
+                f"{change['minimum_stock_level'][1]}, reorder {change['reorder_quantity'][0]} -> "
+                f"{change['reorder_quantity'][1]}"
+            )
+        verb = 'updated' if result['applied'] else 'would update'
+        self.stdout.write(
+            f"{company.code}: {verb} {result['changed']} of {result['forecast']} forecast items "
+            f"({result['items']} total) in {time.monotonic() - started:.1f}s."
+        )
@@ -0,0 +1,61 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:01
+
+from django.contrib.postgres.operations import TrigramExtension
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+PRODUCT_SEARCH_SQL = """
+CREATE FUNCTION inventory_product_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', coalesce(NEW.sku, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.category, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER inventory_product_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF sku, name, category, description ON inventory_product
+    FOR EACH ROW EXECUTE FUNCTION inventory_product_search_vector_update();
+
+-- Backfill existing rows through the trigger
+UPDATE inventory_product SET sku = sku;
+"""
+
+PRODUCT_SEARCH_REVERSE_SQL = """
+DROP TRIGGER IF EXISTS inventory_product_search_vector_trigger ON inventory_product;
+DROP FUNCTION IF EXISTS inventory_product_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0002_prefix_lookup_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='product_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['sku'], name='product_sku_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='product_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.RunSQL(PRODUCT_SEARCH_SQL, PRODUCT_SEARCH_REVERSE_SQL),
+    ]
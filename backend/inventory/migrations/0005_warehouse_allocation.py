@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_updated_at_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='warehouse',
+            name='priority',
+            field=models.PositiveSmallIntegerField(default=100),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:26
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_warehouse_allocation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventoryitem',
+            name='reserved',
+            field=models.IntegerField(default=0, editable=False, validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+    ]
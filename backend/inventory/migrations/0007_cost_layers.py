@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:31
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0006_stock_reservations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventoryitem',
+            name='stock_value',
+            field=models.DecimalField(decimal_places=4, default=0, editable=False, max_digits=16),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='costing_method',
+            field=models.CharField(choices=[('fifo', 'FIFO'), ('average', 'Weighted average')], default='fifo', max_length=10),
+        ),
+        migrations.CreateModel(
+            name='CostLayer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.IntegerField(validators=[django.core.validators.MinValueValidator(1)])),
+                ('remaining', models.IntegerField(validators=[django.core.validators.MinValueValidator(0)])),
+                ('unit_cost', models.DecimalField(decimal_places=4, max_digits=12, validators=[django.core.validators.MinValueValidator(0)])),
+                ('reference', models.CharField(blank=True, max_length=100)),
+                ('received_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('inventory_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cost_layers', to='inventory.inventoryitem')),
+            ],
+            options={
+                'ordering': ['received_at', 'id'],
+                'indexes': [models.Index(condition=models.Q(('remaining__gt', 0)), fields=['inventory_item', 'received_at', 'id'], name='costlayer_open_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0007_cost_layers'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClassificationRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField()),
+                ('full', models.BooleanField(default=False)),
+                ('products', models.IntegerField(default=0)),
+                ('changed', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='inventoryitem',
+            name='abc_class',
+            field=models.CharField(blank=True, choices=[('A', 'A - top revenue'), ('B', 'B - middle revenue'), ('C', 'C - low or no revenue')], editable=False, max_length=1),
+        ),
+        migrations.AddField(
+            model_name='inventoryitem',
+            name='class_revenue',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='inventoryitem',
+            name='demand_variation',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='inventoryitem',
+            name='xyz_class',
+            field=models.CharField(blank=True, choices=[('X', 'X - steady demand'), ('Y', 'Y - variable demand'), ('Z', 'Z - erratic or no demand')], editable=False, max_length=1),
+        ),
+        migrations.AddIndex(
+            model_name='inventoryitem',
+            index=models.Index(fields=['abc_class', 'xyz_class'], name='inventoryitem_class_idx'),
+        ),
+    ]
@@ -0,0 +1,131 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:14
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django.db.models.deletion
+import django.db.models.functions.text
+import enterprisepro.tenancy
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_companies'),
+        ('inventory', '0008_abc_xyz_classification'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='inventoryitem',
+            name='inventoryitem_updated_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='inventoryitem',
+            name='inventoryitem_class_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='product_sku_prefix_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='product_name_prefix_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='product_updated_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='warehouse',
+            name='warehouse_code_prefix_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='warehouse',
+            name='warehouse_name_prefix_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='warehouse',
+            name='warehouse_updated_idx',
+        ),
+        migrations.AddField(
+            model_name='inventoryitem',
+            name='company',
+            field=models.ForeignKey(default=enterprisepro.tenancy.current_company_id, null=True, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.company'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='company',
+            field=models.ForeignKey(default=enterprisepro.tenancy.current_company_id, null=True, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.company'),
+        ),
+        migrations.AddField(
+            model_name='warehouse',
+            name='company',
+            field=models.ForeignKey(default=enterprisepro.tenancy.current_company_id, null=True, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.company'),
+        ),
+        enterprisepro.tenancy.fill_company('inventory', 'inventoryitem', 'product', 'warehouse'),
+        migrations.AlterField(
+            model_name='inventoryitem',
+            name='company',
+            field=models.ForeignKey(default=enterprisepro.tenancy.current_company_id, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.company'),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='company',
+            field=models.ForeignKey(default=enterprisepro.tenancy.current_company_id, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.company'),
+        ),
+        migrations.AlterField(
+            model_name='warehouse',
+            name='company',
+            field=models.ForeignKey(default=enterprisepro.tenancy.current_company_id, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.company'),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='sku',
+            field=models.CharField(max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='warehouse',
+            name='code',
+            field=models.CharField(max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='inventoryitem',
+            index=models.Index(fields=['company', 'updated_at', 'id'], name='inventoryitem_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventoryitem',
+            index=models.Index(fields=['company', 'abc_class', 'xyz_class'], name='inventoryitem_class_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(models.F('company'), django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('sku'), name='text_pattern_ops'), name='product_sku_prefix_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(models.F('company'), django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('name'), name='text_pattern_ops'), name='product_name_prefix_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['company', 'updated_at', 'id'], name='product_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='warehouse',
+            index=models.Index(models.F('company'), django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('code'), name='text_pattern_ops'), name='warehouse_code_prefix_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='warehouse',
+            index=models.Index(models.F('company'), django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('name'), name='text_pattern_ops'), name='warehouse_name_prefix_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='warehouse',
+            index=models.Index(fields=['company', 'updated_at', 'id'], name='warehouse_updated_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='product',
+            constraint=models.UniqueConstraint(fields=('company', 'sku'), name='product_company_sku_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='warehouse',
+            constraint=models.UniqueConstraint(fields=('company', 'code'), name='warehouse_company_code_uniq'),
+        ),
+    ]
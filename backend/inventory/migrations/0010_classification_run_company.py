@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+import enterprisepro.tenancy
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_companies'),
+        ('inventory', '0009_company'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='classificationrun',
+            name='company',
+            field=models.ForeignKey(default=enterprisepro.tenancy.current_company_id, null=True, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.company'),
+        ),
+        enterprisepro.tenancy.fill_company('inventory', 'classificationrun'),
+        migrations.AlterField(
+            model_name='classificationrun',
+            name='company',
+            field=models.ForeignKey(default=enterprisepro.tenancy.current_company_id, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.company'),
+        ),
+    ]
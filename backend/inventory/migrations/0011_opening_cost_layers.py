@@ -0,0 +1,47 @@
+from django.db import migrations
+
+# Stock on hand without open cost layers (units counted before cost tracking
+# started) gets one opening layer per item, valued at the product's
+# unit_price since no purchase cost is known for it. The layer is dated
+# with the item's created_at, so FIFO issues it before any later receipt.
+OPENING_LAYERS_SQL = """
+WITH untracked AS (
+    SELECT item.id, item.created_at, product.unit_price,
+           item.quantity - COALESCE(SUM(layer.remaining), 0) AS units
+    FROM inventory_inventoryitem item
+    JOIN inventory_product product ON product.id = item.product_id
+    LEFT JOIN inventory_costlayer layer ON layer.inventory_item_id = item.id AND layer.remaining > 0
+    GROUP BY item.id, product.unit_price
+    HAVING item.quantity - COALESCE(SUM(layer.remaining), 0) > 0
+), opened AS (
+    INSERT INTO inventory_costlayer (inventory_item_id, quantity, remaining, unit_cost, reference, received_at)
+    SELECT id, units, units, unit_price, 'Opening balance', created_at FROM untracked
+    RETURNING inventory_item_id, quantity, unit_cost
+)
+UPDATE inventory_inventoryitem item
+SET stock_value = item.stock_value + opened.quantity * opened.unit_cost, updated_at = now()
+FROM opened
+WHERE item.id = opened.inventory_item_id;
+"""
+
+OPENING_LAYERS_REVERSE_SQL = """
+WITH removed AS (
+    DELETE FROM inventory_costlayer WHERE reference = 'Opening balance'
+    RETURNING inventory_item_id, remaining, unit_cost
+)
+UPDATE inventory_inventoryitem item
+SET stock_value = item.stock_value - removed.remaining * removed.unit_cost
+FROM removed
+WHERE item.id = removed.inventory_item_id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0010_classification_run_company'),
+    ]
+
+    operations = [
+        migrations.RunSQL(OPENING_LAYERS_SQL, OPENING_LAYERS_REVERSE_SQL),
+    ]
@@ -1,61 +1,175 @@
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Upper
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator
+from django.utils import timezone
+from enterprisepro.tenancy import TenantModel
 
 
-class Product(models.Model):
+class Product(TenantModel):
     """Product master data."""
-    sku = models.CharField(max_length=50, unique=True, db_index=True)
+    COSTING_METHOD_CHOICES = [
+        ('fifo', 'FIFO'),
+        ('average', 'Weighted average'),
+    ]
+
+    sku = models.CharField(max_length=50)
     name = models.CharField(max_length=200)
     description = models.TextField(blank=True)
     unit_price = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0)])
     unit_of_measure = models.CharField(max_length=20, default='pcs')
     category = models.CharField(max_length=100, blank=True)
+    # How issued stock is costed (see inventory/costing.py)
+    costing_method = models.CharField(max_length=10, choices=COSTING_METHOD_CHOICES, default='fifo')
     is_active = models.BooleanField(default=True)
+    # Maintained by a database trigger from sku/name/category/description
+    search_vector = SearchVectorField(null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['name']
+        constraints = [
+            models.UniqueConstraint(fields=['company', 'sku'], name='product_company_sku_uniq'),
+        ]
+        indexes = [
+            # Prefix lookups (UPPER(col) LIKE 'TERM%') for autocomplete, within a company
+            models.Index(F('company'), OpClass(Upper('sku'), name='text_pattern_ops'), name='product_sku_prefix_idx'),
+            models.Index(F('company'), OpClass(Upper('name'), name='text_pattern_ops'), name='product_name_prefix_idx'),
+            # Ranked full-text and fuzzy search
+            GinIndex(fields=['search_vector'], name='product_search_vector_idx'),
+            GinIndex(fields=['sku'], opclasses=['gin_trgm_ops'], name='product_sku_trgm_idx'),
+            GinIndex(fields=['name'], opclasses=['gin_trgm_ops'], name='product_name_trgm_idx'),
+            # Delta-sync change feed (updated_at, id) keyset
+            models.Index(fields=['company', 'updated_at', 'id'], name='product_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.sku} - {self.name}"
 
 
-class Warehouse(models.Model):
+class Warehouse(TenantModel):
     """Warehouse/Location master data."""
-    code = models.CharField(max_length=20, unique=True)
+    code = models.CharField(max_length=20)
     name = models.CharField(max_length=200)
     address = models.TextField(blank=True)
+    # Lower ships first under the "priority" allocation policy
+    priority = models.PositiveSmallIntegerField(default=100)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['name']
+        constraints = [
+            models.UniqueConstraint(fields=['company', 'code'], name='warehouse_company_code_uniq'),
+        ]
+        indexes = [
+            models.Index(F('company'), OpClass(Upper('code'), name='text_pattern_ops'), name='warehouse_code_prefix_idx'),
+            models.Index(F('company'), OpClass(Upper('name'), name='text_pattern_ops'), name='warehouse_name_prefix_idx'),
+            models.Index(fields=['company', 'updated_at', 'id'], name='warehouse_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.code} - {self.name}"
 
 
-class InventoryItem(models.Model):
+class InventoryItem(TenantModel):
     """Inventory tracking: Product + Warehouse + Quantity."""
+    ABC_CLASS_CHOICES = [
+        ('A', 'A - top revenue'),
+        ('B', 'B - middle revenue'),
+        ('C', 'C - low or no revenue'),
+    ]
+    XYZ_CLASS_CHOICES = [
+        ('X', 'X - steady demand'),
+        ('Y', 'Y - variable demand'),
+        ('Z', 'Z - erratic or no demand'),
+    ]
+
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='inventory_items')
     warehouse = models.ForeignKey(Warehouse, on_delete=models.CASCADE, related_name='inventory_items')
     quantity = models.IntegerField(default=0, validators=[MinValueValidator(0)])
+    # Units promised to confirmed, unfulfilled orders (see sales.StockReservation)
+    reserved = models.IntegerField(default=0, editable=False, validators=[MinValueValidator(0)])
     minimum_stock_level = models.IntegerField(default=0, validators=[MinValueValidator(0)])
     reorder_quantity = models.IntegerField(default=0, validators=[MinValueValidator(0)])
+    # Cost of the units on hand, maintained by inventory.costing on every movement
+    stock_value = models.DecimalField(max_digits=16, decimal_places=4, default=0, editable=False)
+    # Set by inventory.classification: revenue rank (A/B/C) and demand variability (X/Y/Z)
+    abc_class = models.CharField(max_length=1, choices=ABC_CLASS_CHOICES, blank=True, editable=False)
+    xyz_class = models.CharField(max_length=1, choices=XYZ_CLASS_CHOICES, blank=True, editable=False)
+    class_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0, editable=False)
+    demand_variation = models.FloatField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ['product', 'warehouse']
         ordering = ['product__name', 'warehouse__name']
+        indexes = [
+            models.Index(fields=['company', 'updated_at', 'id'], name='inventoryitem_updated_idx'),
+            models.Index(fields=['company', 'abc_class', 'xyz_class'], name='inventoryitem_class_idx'),
+        ]
 
     def __str__(self):
         return f"{self.product.sku} @ {self.warehouse.code}: {self.quantity}"
 
+    @property
+    def available(self):
+        """Units on hand that no order has reserved."""
+        return self.quantity - self.reserved
+
+    @property
+    def average_cost(self):
+        """Cost per unit on hand."""
+        return self.stock_value / self.quantity if self.quantity else 0
+
     @property
     def needs_reorder(self):
         """Check if inventory is below minimum stock level."""
         return self.quantity < self.minimum_stock_level
 
+
+
+class CostLayer(models.Model):
+    """
+    Units received into an inventory item at one unit cost. Issues consume
+    ``remaining`` from the oldest layers first.
+    """
+    inventory_item = models.ForeignKey(InventoryItem, on_delete=models.CASCADE, related_name='cost_layers')
+    quantity = models.IntegerField(validators=[MinValueValidator(1)])
+    remaining = models.IntegerField(validators=[MinValueValidator(0)])
+    unit_cost = models.DecimalField(max_digits=12, decimal_places=4, validators=[MinValueValidator(0)])
+    reference = models.CharField(max_length=100, blank=True)
+    received_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['received_at', 'id']
+        indexes = [
+            # Open layers of an item, oldest first
+            models.Index(
+                fields=['inventory_item', 'received_at', 'id'],
+                name='costlayer_open_idx',
+                condition=models.Q(remaining__gt=0),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.inventory_item}: {self.remaining}/{self.quantity} @ {self.unit_cost}"
+
+
+class ClassificationRun(TenantModel):
+    """A run of the ABC/XYZ classification; a company's latest one is its next run's watermark."""
+    started_at = models.DateTimeField()
+    full = models.BooleanField(default=False)
+    products = models.IntegerField(default=0)
+    changed = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['-started_at']
+
+    def __str__(self):
+        return f"{'Full' if self.full else 'Incremental'} classification at {self.started_at}"
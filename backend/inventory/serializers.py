@@ -1,4 +1,10 @@
+import csv
+import io
+
+from django.db import transaction
 from rest_framework import serializers
+from enterprisepro.serializers import unique_in_company
+from . import costing
 from .models import Product, Warehouse, InventoryItem
 
 
@@ -6,7 +12,42 @@ class ProductSerializer(serializers.ModelSerializer):
     """Serializer for Product model."""
     class Meta:
         model = Product
-        fields = '__all__'
+        exclude = ('search_vector',)
+        extra_kwargs = {'sku': {'validators': [unique_in_company(Product, 'sku')]}}
+
+
+class ProductImportRowSerializer(serializers.ModelSerializer):
+    """Validates one CSV row of a product import."""
+    class Meta:
+        model = Product
+        fields = ['sku', 'name', 'description', 'unit_price', 'unit_of_measure', 'category', 'is_active']
+        # Existing SKUs are updated, so skip the uniqueness check
+        extra_kwargs = {'sku': {'validators': []}}
+
+
+class ProductImportSerializer(serializers.Serializer):
+    """Serializer for a product CSV upload."""
+    REQUIRED_COLUMNS = ('sku', 'name', 'unit_price')
+
+    file = serializers.FileField()
+
+    def validate_file(self, value):
+        """Parse the CSV into a list of row dicts."""
+        try:
+            reader = csv.DictReader(io.StringIO(value.read().decode('utf-8-sig')))
+            rows = [
+                {column: cell for column, cell in row.items() if column}
+                for row in reader
+            ]
+        except (UnicodeDecodeError, csv.Error) as exc:
+            raise serializers.ValidationError(f"Could not read CSV file: {exc}")
+
+        missing = [c for c in self.REQUIRED_COLUMNS if c not in (reader.fieldnames or [])]
+        if missing:
+            raise serializers.ValidationError(f"Missing required columns: {', '.join(missing)}")
+        if not rows:
+            raise serializers.ValidationError("The file contains no rows.")
+        return rows
 
 
 class WarehouseSerializer(serializers.ModelSerializer):
@@ -14,6 +55,7 @@ class WarehouseSerializer(serializers.ModelSerializer):
     class Meta:
         model = Warehouse
         fields = '__all__'
+        extra_kwargs = {'code': {'validators': [unique_in_company(Warehouse, 'code')]}}
 
 
 class InventoryItemSerializer(serializers.ModelSerializer):
@@ -23,11 +65,90 @@ class InventoryItemSerializer(serializers.ModelSerializer):
     warehouse_name = serializers.CharField(source='warehouse.name', read_only=True)
     warehouse_code = serializers.CharField(source='warehouse.code', read_only=True)
     needs_reorder = serializers.BooleanField(read_only=True)
+    available = serializers.IntegerField(read_only=True)
+    average_cost = serializers.DecimalField(max_digits=12, decimal_places=4, read_only=True)
+    unit_cost = serializers.DecimalField(
+        max_digits=12, decimal_places=4, min_value=0, required=False, write_only=True,
+        help_text='Cost of units added by this change (default: the current average cost).'
+    )
+    # The model properties behind the fields above and the columns each reads (see enterprisepro.projection)
+    projected_properties = {
+        'needs_reorder': ('quantity', 'minimum_stock_level'),
+        'available': ('quantity', 'reserved'),
+        'average_cost': ('stock_value', 'quantity'),
+    }
 
     class Meta:
         model = InventoryItem
         fields = '__all__'
 
+    def validate_quantity(self, value):
+        """Stock reserved for confirmed orders cannot be counted away."""
+        if self.instance and value < self.instance.reserved:
+            raise serializers.ValidationError(
+                f"Quantity cannot drop below the {self.instance.reserved} units reserved for confirmed orders."
+            )
+        return value
+
+    @transaction.atomic
+    def create(self, validated_data):
+        """Create the item and receive its opening quantity as a cost layer."""
+        unit_cost = validated_data.pop('unit_cost', None)
+        item = super().create(validated_data)
+        if item.quantity:
+            quantity, item.quantity = item.quantity, 0
+            costing.adjust(item, quantity, unit_cost, reference='opening balance')
+            InventoryItem.objects.filter(pk=item.pk).update(stock_value=item.stock_value)
+        return item
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        """Quantity changes are stock adjustments: received or issued at cost."""
+        quantity = validated_data.pop('quantity', None)
+        unit_cost = validated_data.pop('unit_cost', None)
+        # Work on the locked row so concurrent fulfillments are not overwritten
+        item = InventoryItem.objects.select_for_update(of=('self',)).select_related('product').get(pk=instance.pk)
+        for attr, value in validated_data.items():
+            setattr(item, attr, value)
+        if quantity is not None:
+            if quantity < item.reserved:
+                raise serializers.ValidationError({'quantity': [
+                    f"Quantity cannot drop below the {item.reserved} units reserved for confirmed orders."
+                ]})
+            costing.adjust(item, quantity, unit_cost)
+        item.save()
+        return item
+
+
+class StockReceiptSerializer(serializers.Serializer):
+    """Stock received into an inventory item at a unit cost."""
+    quantity = serializers.IntegerField(min_value=1)
+    unit_cost = serializers.DecimalField(max_digits=12, decimal_places=4, min_value=0)
+    reference = serializers.CharField(max_length=100, required=False, allow_blank=True, default='')
+
+
+class InventoryValuationSerializer(serializers.Serializer):
+    """Options for an inventory valuation report."""
+    GROUPS = {
+        'warehouse': 'warehouse__code',
+        'category': 'product__category',
+        'product': 'product__sku',
+    }
+
+    group_by = serializers.ChoiceField(choices=list(GROUPS), required=False)
+    warehouse = serializers.PrimaryKeyRelatedField(queryset=Warehouse.objects.all(), required=False)
+
+
+class ReorderForecastSerializer(serializers.Serializer):
+    """Options for a reorder point forecast run."""
+    apply = serializers.BooleanField(default=False)
+    warehouse = serializers.PrimaryKeyRelatedField(queryset=Warehouse.objects.all(), required=False)
+
+
+class ClassificationRunSerializer(serializers.Serializer):
+    """Options for an ABC/XYZ classification run."""
+    full = serializers.BooleanField(default=False)
+
 
 class ReorderAlertSerializer(serializers.Serializer):
     """Serializer for reorder alerts."""
@@ -0,0 +1,58 @@
+from django.db.models import Expression
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+from enterprisepro.events import publish
+from enterprisepro.lookups import bump_lookup_version
+from .models import Product, Warehouse, InventoryItem
+
+STOCK_EVENT_ROLES = ('admin', 'manager', 'staff')
+
+
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_product_lookup(sender, **kwargs):
+    """Drop cached product lookup rows when a product changes."""
+    bump_lookup_version(sender)
+
+
+@receiver([post_save, post_delete], sender=Warehouse)
+def invalidate_warehouse_lookup(sender, **kwargs):
+    """Drop cached warehouse lookup rows when a warehouse changes."""
+    bump_lookup_version(sender)
+
+
+@receiver(post_init, sender=InventoryItem)
+def remember_stock_state(sender, instance, **kwargs):
+    """Remember whether a loaded item was below its minimum stock level."""
+    deferred = instance.get_deferred_fields()
+    if instance.pk is None or {'quantity', 'minimum_stock_level'} & deferred:
+        instance._was_below_minimum = None
+    else:
+        instance._was_below_minimum = instance.quantity < instance.minimum_stock_level
+
+
+@receiver(post_save, sender=InventoryItem)
+def publish_stock_threshold_crossing(sender, instance, created, **kwargs):
+    """Push an event when an item drops below, or recovers to, its minimum level."""
+    if isinstance(instance.quantity, Expression):
+        # e.g. fulfill saves quantity=F('quantity') - n
+        instance.refresh_from_db(fields=['quantity'])
+    below = instance.quantity < instance.minimum_stock_level
+    was_below = False if created else instance._was_below_minimum
+    instance._was_below_minimum = below
+    if was_below is None or below == was_below:
+        return
+
+    publish(
+        'inventory.low_stock' if below else 'inventory.restocked',
+        {
+            'inventory_item': instance.pk,
+            'product': instance.product_id,
+            'product_sku': instance.product.sku,
+            'warehouse': instance.warehouse_id,
+            'warehouse_code': instance.warehouse.code,
+            'quantity': instance.quantity,
+            'minimum_stock_level': instance.minimum_stock_level,
+        },
+        STOCK_EVENT_ROLES,
+        instance.company_id,
+    )
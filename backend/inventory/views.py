@@ -1,36 +1,101 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.db import transaction
 from django.db.models import F
+from enterprisepro.db_router import ReplicaReadMixin
+from enterprisepro.lookups import LookupMixin
+from enterprisepro.projection import ProjectedListMixin
+from jobs.views import BackgroundJobMixin
+from sync.views import ChangeFeedMixin
+from . import costing
+from .classification import classify_inventory
+from .forecasting import forecast_reorder_points
+from .jobs import import_products
 from .models import Product, Warehouse, InventoryItem
 from .serializers import (
+    ClassificationRunSerializer,
     ProductSerializer,
+    ProductImportSerializer,
     WarehouseSerializer,
     InventoryItemSerializer,
-    ReorderAlertSerializer
+    InventoryValuationSerializer,
+    ReorderAlertSerializer,
+    ReorderForecastSerializer,
+    StockReceiptSerializer
 )
 
 
-class ProductViewSet(viewsets.ModelViewSet):
+def class_filters(request):
+    """ORM filters for ``?abc_class=`` and ``?xyz_class=`` (comma-separated)."""
+    filters = {}
+    for param in ('abc_class', 'xyz_class'):
+        values = [value.strip().upper() for value in request.query_params.get(param, '').split(',') if value.strip()]
+        if values:
+            filters[f'{param}__in'] = values
+    return filters
+
+
+class ProductViewSet(LookupMixin, ChangeFeedMixin, BackgroundJobMixin, viewsets.ModelViewSet):
     """ViewSet for Product CRUD operations."""
     queryset = Product.objects.filter(is_active=True)
     serializer_class = ProductSerializer
-    search_fields = ['sku', 'name', 'category']
+    lookup_code_field = 'sku'
+    search_vector_field = 'search_vector'
+    search_trigram_fields = ['sku', 'name']
     filterset_fields = ['category', 'is_active']
 
+    def get_queryset(self):
+        """``?abc_class=A`` / ``?xyz_class=X`` keep products with an item in that class."""
+        queryset = super().get_queryset()
+        classes = class_filters(self.request)
+        if classes:
+            queryset = queryset.filter(pk__in=InventoryItem.objects.filter(**classes).values('product_id'))
+        return queryset
+
+    def get_change_feed_queryset(self):
+        # Deactivated products are reported as deletions
+        return Product.objects.all()
+
+    @action(detail=False, methods=['post'], url_path='import', serializer_class=ProductImportSerializer)
+    def import_csv(self, request):
+        """
+        Create or update products from a CSV upload (``file``) with columns
+        sku, name, unit_price and optionally description, unit_of_measure,
+        category, is_active. With ``Prefer: respond-async`` it runs as a
+        background job (202).
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        rows = serializer.validated_data['file']
+
+        if self.wants_background(request):
+            return self.enqueue_job(request, 'inventory.import_products', {'rows': rows})
+        return Response(import_products(rows), status=status.HTTP_200_OK)
 
-class WarehouseViewSet(viewsets.ModelViewSet):
+
+class WarehouseViewSet(LookupMixin, ChangeFeedMixin, viewsets.ModelViewSet):
     """ViewSet for Warehouse CRUD operations."""
     queryset = Warehouse.objects.filter(is_active=True)
     serializer_class = WarehouseSerializer
     search_fields = ['code', 'name']
 
+    def get_change_feed_queryset(self):
+        return Warehouse.objects.all()
+
 
-class InventoryItemViewSet(viewsets.ModelViewSet):
+class InventoryItemViewSet(
+    ReplicaReadMixin, ChangeFeedMixin, BackgroundJobMixin, ProjectedListMixin, viewsets.ModelViewSet
+):
     """ViewSet for InventoryItem CRUD operations."""
+    replica_actions = ('list', 'retrieve', 'reorder_alerts', 'valuation')
     queryset = InventoryItem.objects.select_related('product', 'warehouse').all()
     serializer_class = InventoryItemSerializer
-    filterset_fields = ['product', 'warehouse']
+    filterset_fields = ['product', 'warehouse', 'abc_class', 'xyz_class']
+
+    def get_queryset(self):
+        """``?abc_class=A,B`` / ``?xyz_class=X`` narrow the items by class."""
+        return super().get_queryset().filter(**class_filters(self.request))
 
     @action(detail=False, methods=['get'])
     def reorder_alerts(self, request):
@@ -45,3 +110,75 @@ class InventoryItemViewSet(viewsets.ModelViewSet):
         serializer = ReorderAlertSerializer(alerts, many=True)
         return Response(serializer.data)
 
+    @action(detail=True, methods=['post'], serializer_class=StockReceiptSerializer)
+    def receive(self, request, pk=None):
+        """Receive stock at a unit cost, adding a cost layer."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            item = InventoryItem.objects.select_for_update(of=('self',)).select_related(
+                'product', 'warehouse'
+            ).get(pk=self.get_object().pk)
+            costing.receive(item, **serializer.validated_data)
+            item.save(update_fields=['quantity', 'stock_value', 'updated_at'])
+
+        return Response(InventoryItemSerializer(item).data, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'])
+    def valuation(self, request):
+        """
+        Quantity and cost value of stock on hand, in total and optionally
+        ``?group_by=warehouse|category|product`` (``?warehouse=`` narrows it).
+        Reads the maintained per-item values, so it is one aggregate query.
+        """
+        options = InventoryValuationSerializer(data=request.query_params)
+        options.is_valid(raise_exception=True)
+        items = InventoryItem.objects.all()
+        if 'warehouse' in options.validated_data:
+            items = items.filter(warehouse=options.validated_data['warehouse'])
+
+        data = costing.valuation(items)
+        group_by = options.validated_data.get('group_by')
+        if group_by:
+            field = InventoryValuationSerializer.GROUPS[group_by]
+            data['groups'] = [
+                {group_by: row[field], 'quantity': row['quantity'], 'value': row['value']}
+                for row in costing.valuation(items, field)
+            ]
+        return Response(data)
+
+    @action(detail=False, methods=['post'], serializer_class=ClassificationRunSerializer)
+    def classify(self, request):
+        """
+        Recompute ABC/XYZ classes for items with new sales (all items with
+        ``full``). With ``Prefer: respond-async`` it runs as a background
+        job (202).
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        full = serializer.validated_data['full']
+
+        if self.wants_background(request):
+            return self.enqueue_job(request, 'inventory.classify_inventory', {'full': full})
+        return Response(classify_inventory(full=full), status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'], serializer_class=ReorderForecastSerializer)
+    def forecast(self, request):
+        """
+        Recommend minimum stock levels and reorder quantities from sales
+        history; with ``apply`` the changed items are saved. With
+        ``Prefer: respond-async`` it runs as a background job (202).
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        apply = serializer.validated_data['apply']
+        warehouse = serializer.validated_data.get('warehouse')
+        warehouse = warehouse.pk if warehouse else None
+
+        if self.wants_background(request):
+            return self.enqueue_job(
+                request, 'inventory.forecast_reorder_points', {'apply': apply, 'warehouse': warehouse}
+            )
+        return Response(forecast_reorder_points(apply=apply, warehouse=warehouse), status=status.HTTP_200_OK)
+
@@ -0,0 +1,68 @@
+import multiprocessing
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections, connections
+
+from jobs.queue import requeue_stale
+from jobs.registry import job_types
+from jobs.worker import work
+
+
+class Command(BaseCommand):
+    help = 'Run background jobs on a pool of worker processes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=settings.JOBS_WORKER_PROCESSES,
+            help='Number of worker processes (default: JOBS_WORKER_PROCESSES).',
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=settings.JOBS_POLL_INTERVAL,
+            help='Seconds an idle worker waits before checking the queue again.',
+        )
+
+    def handle(self, *args, **options):
+        stop = multiprocessing.Event()
+        stopping = threading.Event()
+
+        # Only flag the request here: setting the multiprocessing Event from
+        # inside a signal handler can deadlock with a wait on it
+        signal.signal(signal.SIGINT, lambda signum, frame: stopping.set())
+        signal.signal(signal.SIGTERM, lambda signum, frame: stopping.set())
+
+        self.stdout.write(
+            f"Starting {options['processes']} job workers for: {', '.join(sorted(job_types()))}"
+        )
+        # Children must open their own database connections
+        connections.close_all()
+        workers = [self._start(index, stop, options) for index in range(options['processes'])]
+
+        while not stopping.wait(settings.JOBS_HEARTBEAT_SECONDS):
+            close_old_connections()
+            try:
+                requeue_stale()
+            except DatabaseError as exc:
+                self.stderr.write(f'Could not check for stale jobs: {exc}')
+            for index, process in enumerate(workers):
+                if not process.is_alive():
+                    self.stderr.write(f'Worker {index} exited with code {process.exitcode}; restarting')
+                    connections.close_all()
+                    workers[index] = self._start(index, stop, options)
+
+        self.stdout.write('Stopping after the current jobs finish...')
+        stop.set()
+        for process in workers:
+            process.join()
+        self.stdout.write(self.style.SUCCESS('All job workers stopped.'))
+
+    def _start(self, index, stop, options):
+        process = multiprocessing.Process(
+            target=work,
+            args=(index, stop, options['poll_interval']),
+            name=f'job-worker-{index}',
+        )
+        process.start()
+        return process
@@ -0,0 +1,63 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+from accounts.models import User
+from enterprisepro.tenancy import TenantManager
+
+
+class Job(models.Model):
+    """A long-running operation executed by ``manage.py run_jobs``."""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+        ('cancelled', 'Cancelled'),
+    ]
+
+    job_type = models.CharField(max_length=100)  # e.g., 'sales.fulfill_order'
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    payload = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    error = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)  # Same shape as the API's 400 bodies
+    progress = models.PositiveSmallIntegerField(default=0)  # Percent complete
+    progress_message = models.CharField(max_length=200, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    worker = models.CharField(max_length=100, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    # The company the handler runs as (that of the request that queued the job)
+    company = models.ForeignKey(
+        'accounts.Company', on_delete=models.PROTECT, null=True, blank=True, related_name='+', editable=False,
+    )
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='jobs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # Workers pick the oldest due job
+            models.Index(fields=['run_after', 'id'], condition=Q(status='queued'), name='job_queue_idx'),
+            # Per-type concurrency counts and stale-worker checks
+            models.Index(fields=['job_type'], condition=Q(status='running'), name='job_running_idx'),
+            models.Index(fields=['created_by', '-created_at'], name='job_owner_idx'),
+            models.Index(fields=['company', '-created_at'], name='job_company_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.job_type} #{self.pk} ({self.get_status_display()})"
+
+    def set_progress(self, done, total, message=''):
+        """
+        Record progress from inside a handler. The worker's heartbeat thread
+        writes it to the database on its own connection, so progress is
+        visible even while the handler's transaction is still open.
+        """
+        self.progress = min(100, int(done * 100 / total)) if total else 100
+        if message:
+            self.progress_message = message[:200]
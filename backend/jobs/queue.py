@@ -0,0 +1,211 @@
+"""
+Database-backed job queue.
+
+Web requests ``enqueue()`` jobs; ``manage.py run_jobs`` processes call
+``claim_next()`` and ``execute()`` in a loop.
+"""
+import logging
+import random
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import connection, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from enterprisepro.tenancy import company_context, current_company_id
+from .models import Job
+from .registry import get_spec, job_types
+
+logger = logging.getLogger(__name__)
+
+# Serializes claims across workers so per-type running counts stay exact
+CLAIM_LOCK_ID = 7_340_001
+
+# Errors that another attempt cannot fix
+PERMANENT_ERRORS = (ValueError, ValidationError, DjangoValidationError, ObjectDoesNotExist)
+
+
+def enqueue(job_type, payload, user=None):
+    """
+    Queue a job. Inside a transaction the job becomes visible to workers
+    when the transaction commits. It runs as the current company.
+    """
+    spec = get_spec(job_type)
+    return Job.objects.create(
+        job_type=job_type,
+        payload=payload,
+        max_attempts=spec.max_attempts,
+        company_id=current_company_id(),
+        created_by=user if user is not None and user.is_authenticated else None,
+    )
+
+
+def claim_next(worker):
+    """Mark the oldest due job whose type has a free slot as running, and return it."""
+    now = timezone.now()
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [CLAIM_LOCK_ID])
+        running = dict(
+            Job.objects.filter(status='running')
+            .order_by()
+            .values('job_type')
+            .annotate(count=Count('*'))
+            .values_list('job_type', 'count')
+        )
+        available = [t for t in job_types() if running.get(t, 0) < get_spec(t).concurrency]
+        job = (
+            Job.objects.filter(status='queued', run_after__lte=now, job_type__in=available)
+            .order_by('run_after', 'id')
+            .first()
+        )
+        if job is None:
+            return None
+        Job.objects.filter(pk=job.pk).update(
+            status='running',
+            attempts=F('attempts') + 1,
+            worker=worker,
+            started_at=now,
+            heartbeat_at=now,
+            updated_at=now,
+        )
+    job.refresh_from_db()
+    return job
+
+
+def execute(job):
+    """Run a claimed job and record its outcome."""
+    spec = get_spec(job.job_type)
+    heartbeat = _Heartbeat(job)
+    heartbeat.start()
+    try:
+        with company_context(job.company_id):
+            result = spec.handler(job)
+    except PERMANENT_ERRORS as exc:
+        _finish(job, 'failed', error=_error_body(exc))
+    except Exception as exc:
+        logger.exception('Job %s (%s) attempt %s failed', job.pk, job.job_type, job.attempts)
+        if job.attempts < job.max_attempts:
+            _retry(job, exc)
+        else:
+            _finish(job, 'failed', error={'error': str(exc)})
+    else:
+        job.progress = 100
+        _finish(job, 'succeeded', result=result)
+    finally:
+        heartbeat.stop()
+
+
+def requeue_stale():
+    """Retry (or fail) running jobs whose worker stopped sending heartbeats."""
+    cutoff = timezone.now() - timedelta(seconds=settings.JOBS_STALE_SECONDS)
+    for job in Job.objects.filter(status='running', heartbeat_at__lt=cutoff):
+        logger.warning('Job %s (%s) lost its worker %s', job.pk, job.job_type, job.worker)
+        if job.attempts < job.max_attempts:
+            _retry(job, 'Worker stopped responding.')
+        else:
+            _finish(job, 'failed', error={'error': 'Worker stopped responding.'})
+
+
+def backoff_delay(attempts):
+    """Seconds to wait before the next attempt: exponential with jitter, capped."""
+    delay = min(settings.JOBS_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.JOBS_RETRY_MAX_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def _claimed(job):
+    """
+    The job's row while ``job``'s claim still holds it: running, for the
+    same worker and attempt. A job requeued as stale and claimed again by
+    another worker no longer matches.
+    """
+    return Job.objects.filter(pk=job.pk, status='running', worker=job.worker, attempts=job.attempts)
+
+
+def _lost(job, updated):
+    """Whether ``job``'s claim was gone when ``updated`` rows changed (logged)."""
+    if not updated:
+        logger.warning('Job %s (%s) attempt %s is no longer claimed by %s; outcome dropped',
+                       job.pk, job.job_type, job.attempts, job.worker)
+    return not updated
+
+
+def _retry(job, error):
+    now = timezone.now()
+    updated = _claimed(job).update(
+        status='queued',
+        error={'error': str(error)},
+        worker='',
+        heartbeat_at=None,
+        run_after=now + timedelta(seconds=backoff_delay(job.attempts)),
+        updated_at=now,
+    )
+    _lost(job, updated)
+
+
+def _finish(job, status, result=None, error=None):
+    now = timezone.now()
+    updated = _claimed(job).update(
+        status=status,
+        result=result,
+        error=error,
+        progress=job.progress,
+        progress_message=job.progress_message,
+        heartbeat_at=None,
+        finished_at=now,
+        updated_at=now,
+    )
+    _lost(job, updated)
+
+
+def _error_body(exc):
+    if isinstance(exc, ValidationError) and isinstance(exc.detail, dict):
+        return exc.detail
+    if isinstance(exc, ValidationError):
+        return {'error': exc.detail}
+    if isinstance(exc, DjangoValidationError):
+        return {'error': exc.messages}
+    return {'error': str(exc)}
+
+
+class _Heartbeat:
+    """
+    Background thread that marks the job alive and flushes its progress.
+    It uses its own database connection, so the writes are committed even
+    while the handler holds a transaction open.
+    """
+
+    def __init__(self, job):
+        self.job = job
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f'job-{job.pk}-heartbeat', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self):
+        try:
+            while not self._stopped.wait(settings.JOBS_HEARTBEAT_SECONDS):
+                now = timezone.now()
+                updated = _claimed(self.job).update(
+                    progress=self.job.progress,
+                    progress_message=self.job.progress_message,
+                    heartbeat_at=now,
+                    updated_at=now,
+                )
+                if not updated:
+                    # Requeued as stale; the handler's outcome will be dropped
+                    break
+        except Exception:
+            logger.exception('Heartbeat for job %s failed', self.job.pk)
+        finally:
+            connection.close()
@@ -0,0 +1,39 @@
+"""
+Job handler registry.
+
+Apps define handlers in a ``jobs.py`` module (imported when the ``jobs`` app
+is ready)::
+
+    @register('sales.fulfill_order', concurrency=4)
+    def fulfill_order(job):
+        ...
+        return {...}  # stored as the job's result
+
+A handler receives the ``Job`` and may call ``job.set_progress()``. Raising
+ValueError or a ValidationError fails the job straight away; any other
+exception is retried with exponential backoff until ``max_attempts``.
+"""
+from collections import namedtuple
+
+JobSpec = namedtuple('JobSpec', ['job_type', 'handler', 'concurrency', 'max_attempts'])
+
+_registry = {}
+
+
+def register(job_type, concurrency=1, max_attempts=3):
+    """Register ``handler`` for ``job_type``; at most ``concurrency`` run at once."""
+    def decorator(handler):
+        _registry[job_type] = JobSpec(job_type, handler, concurrency, max_attempts)
+        return handler
+    return decorator
+
+
+def get_spec(job_type):
+    try:
+        return _registry[job_type]
+    except KeyError:
+        raise ValueError(f'Unknown job type "{job_type}".')
+
+
+def job_types():
+    return list(_registry)
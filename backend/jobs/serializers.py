@@ -0,0 +1,16 @@
+from rest_framework import serializers
+from .models import Job
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """Serializer for Job status."""
+    created_by_username = serializers.CharField(source='created_by.username', read_only=True)
+
+    class Meta:
+        model = Job
+        fields = [
+            'id', 'job_type', 'status', 'progress', 'progress_message', 'result', 'error',
+            'attempts', 'max_attempts', 'run_after', 'created_by', 'created_by_username',
+            'created_at', 'started_at', 'finished_at',
+        ]
+        read_only_fields = fields
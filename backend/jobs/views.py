@@ -0,0 +1,58 @@
+from django.urls import reverse
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from enterprisepro.tenancy import current_company_id
+from .models import Job
+from .queue import enqueue
+from .serializers import JobSerializer
+
+
+class JobViewSet(viewsets.ReadOnlyModelViewSet):
+    """ViewSet for background job status."""
+    queryset = Job.objects.select_related('created_by').all()
+    serializer_class = JobSerializer
+    filterset_fields = ['status', 'job_type']
+
+    def get_queryset(self):
+        """Admins see every job of their company, everyone else only their own."""
+        queryset = super().get_queryset().filter(company_id=current_company_id())
+        user = self.request.user
+        if not (user.role == 'admin' or user.is_superuser):
+            queryset = queryset.filter(created_by=user)
+        return queryset
+
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        """Cancel a job that has not started yet."""
+        job = self.get_object()
+        cancelled = Job.objects.filter(pk=job.pk, status='queued').update(status='cancelled')
+        if not cancelled:
+            job.refresh_from_db()
+            return Response(
+                {'error': f'Only queued jobs can be cancelled. Current status: {job.status}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        job.refresh_from_db()
+        return Response(self.get_serializer(job).data)
+
+
+class BackgroundJobMixin:
+    """
+    Lets actions run as background jobs when the client sends
+    ``Prefer: respond-async``; they then answer ``202 Accepted`` with the
+    job id and a ``Location`` to poll at ``/api/v1/jobs/<id>/``.
+    """
+
+    def wants_background(self, request):
+        prefer = request.headers.get('Prefer', '')
+        return 'respond-async' in [token.strip() for token in prefer.split(',')]
+
+    def enqueue_job(self, request, job_type, payload):
+        job = enqueue(job_type, payload, user=request.user)
+        location = reverse('job-detail', args=[job.pk])
+        return Response(
+            {'job_id': job.pk, 'status': job.status, 'status_url': location},
+            status=status.HTTP_202_ACCEPTED,
+            headers={'Location': location, 'Preference-Applied': 'respond-async'},
+        )
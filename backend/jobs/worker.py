@@ -0,0 +1,41 @@
+"""
+Worker processes for ``manage.py run_jobs``.
+
+``work()`` is the entry point of each child process. It only imports
+models after ``django.setup()``, so it also runs under the ``spawn`` start
+method (Windows, macOS).
+"""
+import logging
+import os
+import signal
+import socket
+
+import django
+
+logger = logging.getLogger(__name__)
+
+
+def work(index, stop, poll_interval):
+    """Claim and execute jobs until ``stop`` is set."""
+    # Ctrl+C reaches the whole process group; the parent decides when to stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    django.setup()
+
+    from django.db import close_old_connections
+    from .queue import claim_next, execute
+
+    name = f'{socket.gethostname()}:{os.getpid()}:{index}'
+    logger.info('Job worker %s started', name)
+    while not stop.is_set():
+        close_old_connections()
+        try:
+            job = claim_next(name)
+            if job is not None:
+                execute(job)
+        except Exception:
+            # e.g. the database went away; back off and reconnect
+            logger.exception('Job worker %s failed to process the queue', name)
+            job = None
+        if job is None:
+            stop.wait(poll_interval)
+    logger.info('Job worker %s stopped', name)
@@ -0,0 +1,32 @@
+from django.contrib import admin
+from .models import PurchaseOrder, PurchaseOrderItem, Supplier, SupplierProduct
+
+
+class SupplierProductInline(admin.TabularInline):
+    model = SupplierProduct
+    extra = 1
+    raw_id_fields = ('product',)
+
+
+class PurchaseOrderItemInline(admin.TabularInline):
+    model = PurchaseOrderItem
+    extra = 1
+    raw_id_fields = ('product',)
+    readonly_fields = ('line_total', 'received_quantity')
+
+
+@admin.register(Supplier)
+class SupplierAdmin(admin.ModelAdmin):
+    list_display = ('code', 'name', 'email', 'phone', 'lead_time_days', 'is_active')
+    list_filter = ('is_active',)
+    search_fields = ('code', 'name', 'email')
+    inlines = [SupplierProductInline]
+
+
+@admin.register(PurchaseOrder)
+class PurchaseOrderAdmin(admin.ModelAdmin):
+    list_display = ('po_number', 'supplier', 'warehouse', 'order_date', 'expected_date', 'status', 'total_amount')
+    list_filter = ('status', 'order_date', 'warehouse')
+    search_fields = ('po_number', 'supplier__name', 'supplier__code')
+    inlines = [PurchaseOrderItemInline]
+    readonly_fields = ('total_amount', 'received_at', 'created_at', 'updated_at')
@@ -0,0 +1,15 @@
+from jobs.registry import register
+from .receiving import receive_purchase_orders
+from .replenishment import replenish
+
+
+@register('purchasing.replenish', concurrency=1)
+def replenish_job(job):
+    """Create purchase orders for items below their minimum (queued by replenish)."""
+    return replenish(warehouse=job.payload.get('warehouse'), user=job.created_by, progress=job.set_progress)
+
+
+@register('purchasing.receive', concurrency=1)
+def receive_job(job):
+    """Receive purchase orders into stock (queued by receive)."""
+    return receive_purchase_orders(job.payload['purchase_orders'])
@@ -0,0 +1,133 @@
+from decimal import Decimal
+
+from django.db import models
+from django.db.models import F, Q
+from django.db.models.functions import Upper
+from django.contrib.postgres.indexes import OpClass
+from django.core.validators import MinValueValidator
+from django.utils import timezone
+from enterprisepro.tenancy import TenantManager, TenantModel
+from inventory.models import Product, Warehouse
+
+
+class Supplier(TenantModel):
+    """Supplier master data."""
+    code = models.CharField(max_length=50)
+    name = models.CharField(max_length=200)
+    email = models.EmailField(blank=True)
+    phone = models.CharField(max_length=20, blank=True)
+    address = models.TextField(blank=True)
+    # Days from ordering to delivery; sets the expected date of new orders
+    lead_time_days = models.PositiveSmallIntegerField(default=7)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['code']
+        constraints = [
+            models.UniqueConstraint(fields=['company', 'code'], name='supplier_company_code_uniq'),
+        ]
+        indexes = [
+            # Prefix lookups (UPPER(col) LIKE 'TERM%') for autocomplete, within a company
+            models.Index(F('company'), OpClass(Upper('code'), name='text_pattern_ops'), name='supplier_code_prefix_idx'),
+            models.Index(F('company'), OpClass(Upper('name'), name='text_pattern_ops'), name='supplier_name_prefix_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.code} - {self.name}"
+
+
+class SupplierProduct(models.Model):
+    """
+    A product a supplier sells, at its purchase cost. Replenishment orders a
+    product from its preferred supplier, else the cheapest one.
+    """
+    supplier = models.ForeignKey(Supplier, on_delete=models.CASCADE, related_name='products')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='supplier_products')
+    supplier_sku = models.CharField(max_length=50, blank=True)
+    unit_cost = models.DecimalField(max_digits=12, decimal_places=4, validators=[MinValueValidator(0)])
+    min_order_quantity = models.PositiveIntegerField(default=1, validators=[MinValueValidator(1)])
+    is_preferred = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = TenantManager()
+    tenant_lookup = 'supplier__company'
+
+    class Meta:
+        ordering = ['supplier', 'product']
+        unique_together = ['supplier', 'product']
+        indexes = [
+            # Supplier choice per product, in replenishment's order
+            models.Index(fields=['product', '-is_preferred', 'unit_cost'], name='supplierproduct_choice_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.supplier.code} - {self.product.sku}"
+
+
+class PurchaseOrder(TenantModel):
+    """Purchase Order Header: goods ordered from a supplier into one warehouse."""
+    STATUS_CHOICES = [
+        ('draft', 'Draft'),
+        ('ordered', 'Ordered'),
+        ('received', 'Received'),
+        ('cancelled', 'Cancelled'),
+    ]
+    # Statuses whose lines count as stock on order
+    OPEN_STATUSES = ('draft', 'ordered')
+
+    po_number = models.CharField(max_length=50)
+    supplier = models.ForeignKey(Supplier, on_delete=models.PROTECT, related_name='purchase_orders')
+    warehouse = models.ForeignKey(Warehouse, on_delete=models.PROTECT, related_name='purchase_orders')
+    order_date = models.DateField(default=timezone.localdate)
+    expected_date = models.DateField(null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
+    total_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0, validators=[MinValueValidator(0)])
+    notes = models.TextField(blank=True)
+    created_by = models.ForeignKey(
+        'accounts.User', on_delete=models.SET_NULL, null=True, blank=True, related_name='purchase_orders'
+    )
+    received_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-order_date', '-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['company', 'po_number'], name='purchaseorder_company_number_uniq'),
+        ]
+        indexes = [
+            # The order list, latest first
+            models.Index(fields=['company', '-order_date', '-created_at'], name='purchaseorder_company_date_idx'),
+            # Stock on order per warehouse
+            models.Index(fields=['warehouse'], condition=Q(status__in=['draft', 'ordered']), name='purchaseorder_open_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.po_number} - {self.supplier.name}"
+
+
+class PurchaseOrderItem(models.Model):
+    """Purchase Order Line Items."""
+    purchase_order = models.ForeignKey(PurchaseOrder, on_delete=models.CASCADE, related_name='items')
+    product = models.ForeignKey(Product, on_delete=models.PROTECT, related_name='purchase_order_items')
+    quantity = models.IntegerField(validators=[MinValueValidator(1)])
+    unit_cost = models.DecimalField(max_digits=12, decimal_places=4, validators=[MinValueValidator(0)])
+    line_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    received_quantity = models.IntegerField(default=0, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = TenantManager()
+    tenant_lookup = 'purchase_order__company'
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"{self.purchase_order.po_number} - {self.product.sku} x{self.quantity}"
+
+    def save(self, *args, **kwargs):
+        """Auto-calculate line_total before saving."""
+        self.line_total = (self.quantity * Decimal(self.unit_cost)).quantize(Decimal('0.01'))
+        super().save(*args, **kwargs)
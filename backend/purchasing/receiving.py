@@ -0,0 +1,101 @@
+"""
+Goods receipt of whole purchase orders.
+
+``receive_purchase_orders`` books every open line of the given orders in
+one transaction: missing inventory items are created, the items are locked
+in id order, one cost layer per line is inserted in batches and the items'
+quantity and stock value move with one UPDATE per chunk
+(``inventory.costing.receive_many``). The lines and orders are then marked
+received and each order posts its value to the ledger (debit inventory,
+credit accounts payable). The bulk writes skip model signals, so one
+``purchasing.goods_received`` event per company replaces the per-item
+stock events.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from enterprisepro.events import publish
+from finance.ledger import post_entries
+from inventory import costing
+from inventory.models import InventoryItem
+from .models import PurchaseOrder, PurchaseOrderItem
+
+RECEIPT_EVENT_ROLES = ('admin', 'manager', 'staff')
+CENT = Decimal('0.01')
+
+
+def receive_purchase_orders(purchase_order_ids):
+    """Receive open purchase orders in full; raises ValueError if any is not open."""
+    pks = sorted(set(purchase_order_ids))
+    with transaction.atomic():
+        orders = list(
+            PurchaseOrder.objects.select_for_update().filter(pk__in=pks).order_by('pk')
+            .values_list('pk', 'company_id', 'po_number', 'status')
+        )
+        closed = [number for _, _, number, order_status in orders if order_status not in PurchaseOrder.OPEN_STATUSES]
+        if closed:
+            raise ValueError(f"Only draft or ordered purchase orders can be received: {', '.join(closed)}")
+        if len(orders) != len(pks):
+            raise ValueError('Some purchase orders do not exist.')
+
+        lines = list(
+            PurchaseOrderItem.objects.filter(purchase_order__in=pks, quantity__gt=F('received_quantity'))
+            .order_by('id')
+            .values_list(
+                'purchase_order_id', 'purchase_order__company_id', 'purchase_order__po_number', 'product_id',
+                'purchase_order__warehouse_id', F('quantity') - F('received_quantity'), 'unit_cost',
+            )
+        )
+        items = _lock_items({(company, product, warehouse) for _, company, _, product, warehouse, _, _ in lines})
+        value = costing.receive_many([
+            (items[product, warehouse], quantity, unit_cost, number)
+            for _, _, number, product, warehouse, quantity, unit_cost in lines
+        ])
+
+        now = timezone.now()
+        PurchaseOrderItem.objects.filter(purchase_order__in=pks).update(received_quantity=F('quantity'))
+        PurchaseOrder.objects.filter(pk__in=pks).update(status='received', received_at=now, updated_at=now)
+
+        order_values = defaultdict(Decimal)
+        for order, _, _, _, _, quantity, unit_cost in lines:
+            order_values[order] += quantity * unit_cost
+        numbers = {pk: number for pk, _, number, _ in orders}
+        today = timezone.localdate()
+        post_entries('inventory', 'accounts_payable', [
+            (amount.quantize(CENT), f'Goods received - {numbers[order]}', today, {})
+            for order, amount in order_values.items() if amount.quantize(CENT)
+        ])
+
+        by_company = defaultdict(list)
+        for pk, company, _, _ in orders:
+            by_company[company].append(pk)
+        for company, company_orders in by_company.items():
+            publish('purchasing.goods_received', {'purchase_orders': company_orders}, RECEIPT_EVENT_ROLES, company)
+
+    return {
+        'purchase_orders': len(orders),
+        'lines': len(lines),
+        'quantity': sum(line[5] for line in lines),
+        'value': str(value.quantize(CENT)),
+    }
+
+
+def _lock_items(keys):
+    """Create missing ``(company, product, warehouse)`` items, lock them all and return their ids."""
+    InventoryItem.objects.bulk_create(
+        [InventoryItem(company_id=company, product_id=product, warehouse_id=warehouse) for company, product, warehouse in keys],
+        batch_size=2000,
+        ignore_conflicts=True,
+    )
+    pairs = {(product, warehouse) for _, product, warehouse in keys}
+    rows = (
+        InventoryItem.objects.select_for_update()
+        .filter(product_id__in={product for product, _ in pairs}, warehouse_id__in={warehouse for _, warehouse in pairs})
+        .order_by('pk')
+        .values_list('product_id', 'warehouse_id', 'pk')
+    )
+    return {(product, warehouse): pk for product, warehouse, pk in rows if (product, warehouse) in pairs}
@@ -0,0 +1,141 @@
+"""
+Replenishment: purchase orders for every inventory item below its minimum.
+
+One run reads the candidate items, each product's supplier and the stock
+already on order with three queries, then writes the draft purchase orders,
+one per supplier and warehouse, with bulk inserts. Replenishing 100,000
+items is one run (``Prefer: respond-async`` makes it a background job).
+
+An item is ordered when its quantity plus the open (draft or ordered)
+purchase order lines for it is below ``minimum_stock_level``. It is
+ordered from the product's preferred supplier, else the cheapest active
+one, for the larger of its ``reorder_quantity``, the shortfall and the
+supplier's ``min_order_quantity``. Items whose product has no supplier are
+counted and skipped. Runs of a company are serialized with an advisory
+lock, so two runs never order the same shortfall twice.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from enterprisepro.tenancy import current_company_id
+from inventory.models import InventoryItem
+from .models import PurchaseOrder, PurchaseOrderItem, SupplierProduct
+
+PO_NUMBER_SEQUENCE = 'purchase_order_number_seq'
+PO_NUMBER_PREFIX = 'PO'
+# pg_advisory_xact_lock(REPLENISH_LOCK_ID, company id) serializes runs
+REPLENISH_LOCK_ID = 7_340_002
+CENT = Decimal('0.01')
+
+
+def allocate_po_numbers(count):
+    """Reserve ``count`` purchase order numbers with a single query."""
+    if not count:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT nextval(%s) FROM generate_series(1, %s)', [PO_NUMBER_SEQUENCE, count])
+        values = [row[0] for row in cursor.fetchall()]
+    today = timezone.localdate().strftime('%Y%m%d')
+    return [f'{PO_NUMBER_PREFIX}-{today}-{value:07d}' for value in values]
+
+
+def replenish(warehouse=None, user=None, progress=None):
+    """Create draft purchase orders for items below their minimum (in ``warehouse`` only if given)."""
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s, %s)', [REPLENISH_LOCK_ID, current_company_id() or 0])
+
+        items = InventoryItem.objects.filter(
+            quantity__lt=F('minimum_stock_level'), product__is_active=True, warehouse__is_active=True
+        )
+        if warehouse is not None:
+            items = items.filter(warehouse_id=warehouse)
+        candidates = list(
+            items.order_by().values_list(
+                'company_id', 'product_id', 'warehouse_id', 'quantity', 'minimum_stock_level', 'reorder_quantity'
+            )
+        )
+        if progress is not None:
+            progress(1, 3)
+
+        # The supplier each product is bought from: preferred, else cheapest
+        suppliers = {
+            product: (supplier, unit_cost, min_quantity, lead_time)
+            for product, supplier, unit_cost, min_quantity, lead_time in (
+                SupplierProduct.objects.filter(supplier__is_active=True)
+                .order_by('product_id', '-is_preferred', 'unit_cost', 'id')
+                .distinct('product_id')
+                .values_list('product_id', 'supplier_id', 'unit_cost', 'min_order_quantity', 'supplier__lead_time_days')
+            )
+        }
+        on_order = {
+            (product, warehouse_id): quantity
+            for product, warehouse_id, quantity in (
+                PurchaseOrderItem.objects.filter(purchase_order__status__in=PurchaseOrder.OPEN_STATUSES)
+                .order_by()
+                .values('product_id', 'purchase_order__warehouse_id')
+                .annotate(open=Sum(F('quantity') - F('received_quantity')))
+                .values_list('product_id', 'purchase_order__warehouse_id', 'open')
+            )
+        }
+
+        orders = defaultdict(list)
+        covered = without_supplier = 0
+        for company, product, warehouse_id, quantity, minimum, reorder in candidates:
+            shortfall = minimum - quantity - on_order.get((product, warehouse_id), 0)
+            if shortfall <= 0:
+                covered += 1
+                continue
+            if product not in suppliers:
+                without_supplier += 1
+                continue
+            supplier, unit_cost, min_quantity, lead_time = suppliers[product]
+            orders[company, supplier, warehouse_id, lead_time].append(
+                PurchaseOrderItem(product_id=product, quantity=max(reorder, shortfall, min_quantity), unit_cost=unit_cost)
+            )
+        if progress is not None:
+            progress(2, 3)
+
+        today = timezone.localdate()
+        headers = []
+        for number, ((company, supplier, warehouse_id, lead_time), lines) in zip(
+            allocate_po_numbers(len(orders)), orders.items()
+        ):
+            for line in lines:
+                # bulk_create skips save(), which normally computes this
+                line.line_total = (line.quantity * line.unit_cost).quantize(CENT)
+            headers.append(PurchaseOrder(
+                company_id=company,
+                po_number=number,
+                supplier_id=supplier,
+                warehouse_id=warehouse_id,
+                order_date=today,
+                expected_date=today + timedelta(days=lead_time),
+                total_amount=sum(line.line_total for line in lines),
+                notes='Replenishment',
+                created_by=user if user is not None and user.is_authenticated else None,
+            ))
+        PurchaseOrder.objects.bulk_create(headers, batch_size=1000)
+
+        lines = []
+        for header, order_lines in zip(headers, orders.values()):
+            for line in order_lines:
+                line.purchase_order_id = header.pk
+            lines.extend(order_lines)
+        PurchaseOrderItem.objects.bulk_create(lines, batch_size=2000)
+    if progress is not None:
+        progress(3, 3)
+
+    return {
+        'items_below_minimum': len(candidates),
+        'purchase_orders': len(headers),
+        'lines': len(lines),
+        'total_amount': str(sum((header.total_amount for header in headers), Decimal(0))),
+        'already_on_order': covered,
+        'without_supplier': without_supplier,
+    }
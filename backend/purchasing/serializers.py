@@ -0,0 +1,110 @@
+from django.db import transaction
+from rest_framework import serializers
+from enterprisepro.serializers import unique_in_company
+from inventory.models import Warehouse
+from .models import PurchaseOrder, PurchaseOrderItem, Supplier, SupplierProduct
+from .replenishment import allocate_po_numbers
+
+
+class SupplierSerializer(serializers.ModelSerializer):
+    """Serializer for Supplier model."""
+    class Meta:
+        model = Supplier
+        fields = '__all__'
+        extra_kwargs = {'code': {'validators': [unique_in_company(Supplier, 'code')]}}
+
+
+class SupplierProductSerializer(serializers.ModelSerializer):
+    """Serializer for the products a supplier sells."""
+    supplier_code = serializers.CharField(source='supplier.code', read_only=True)
+    product_sku = serializers.CharField(source='product.sku', read_only=True)
+
+    class Meta:
+        model = SupplierProduct
+        fields = '__all__'
+
+
+class PurchaseOrderItemSerializer(serializers.ModelSerializer):
+    """Serializer for PurchaseOrderItem model."""
+    product_sku = serializers.CharField(source='product.sku', read_only=True)
+    product_name = serializers.CharField(source='product.name', read_only=True)
+
+    class Meta:
+        model = PurchaseOrderItem
+        # Exclude purchase_order when used as nested serializer (it's set automatically)
+        exclude = ('purchase_order',)
+        read_only_fields = ('line_total', 'received_quantity')
+
+
+class PurchaseOrderSerializer(serializers.ModelSerializer):
+    """Serializer for PurchaseOrder model."""
+    # Status changes the API allows; orders become received only through receipt
+    TRANSITIONS = {'draft': ('ordered', 'cancelled'), 'ordered': ('cancelled',)}
+
+    items = PurchaseOrderItemSerializer(many=True, required=False)
+    supplier_code = serializers.CharField(source='supplier.code', read_only=True)
+    supplier_name = serializers.CharField(source='supplier.name', read_only=True)
+    warehouse_code = serializers.CharField(source='warehouse.code', read_only=True)
+
+    class Meta:
+        model = PurchaseOrder
+        fields = '__all__'
+        read_only_fields = ('po_number', 'total_amount', 'received_at', 'created_by', 'created_at', 'updated_at')
+
+    def validate(self, attrs):
+        if self.instance is None:
+            if not attrs.get('items'):
+                raise serializers.ValidationError("Purchase order must have at least one item.")
+            if attrs.get('status', 'draft') not in ('draft', 'ordered'):
+                raise serializers.ValidationError({'status': 'New purchase orders are draft or ordered.'})
+            return attrs
+
+        current = self.instance.status
+        new_status = attrs.get('status', current)
+        if new_status != current and new_status not in self.TRANSITIONS.get(current, ()):
+            raise serializers.ValidationError(
+                {'status': f'Cannot change status from {current} to {new_status}.'}
+            )
+        changed = set(attrs) - {'status', 'notes', 'expected_date'}
+        if current != 'draft' and changed:
+            raise serializers.ValidationError("Only draft purchase orders can be modified.")
+        if 'items' in attrs and not attrs['items']:
+            raise serializers.ValidationError("Purchase order must have at least one item.")
+        return attrs
+
+    @transaction.atomic
+    def create(self, validated_data):
+        """Create purchase order with items and calculate total."""
+        items_data = validated_data.pop('items')
+        validated_data['created_by'] = self.context['request'].user
+        validated_data['po_number'] = allocate_po_numbers(1)[0]
+        purchase_order = PurchaseOrder.objects.create(**validated_data)
+        self._save_items(purchase_order, items_data)
+        return purchase_order
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        """Update a purchase order; items, if given, replace the current ones."""
+        items_data = validated_data.pop('items', None)
+        instance = super().update(instance, validated_data)
+        if items_data is not None:
+            instance.items.all().delete()
+            self._save_items(instance, items_data)
+        return instance
+
+    def _save_items(self, purchase_order, items_data):
+        items = [PurchaseOrderItem.objects.create(purchase_order=purchase_order, **item) for item in items_data]
+        purchase_order.total_amount = sum(item.line_total for item in items)
+        purchase_order.save(update_fields=['total_amount', 'updated_at'])
+
+
+class ReplenishmentSerializer(serializers.Serializer):
+    """Options of a replenishment run."""
+    warehouse = serializers.PrimaryKeyRelatedField(queryset=Warehouse.objects.all(), required=False)
+
+
+class GoodsReceiptSerializer(serializers.Serializer):
+    """Purchase orders to receive in full."""
+    purchase_orders = serializers.PrimaryKeyRelatedField(
+        queryset=PurchaseOrder.objects.all(), many=True, allow_empty=False
+    )
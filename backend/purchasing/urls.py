@@ -0,0 +1,12 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import PurchaseOrderViewSet, SupplierProductViewSet, SupplierViewSet
+
+router = DefaultRouter()
+router.register(r'suppliers', SupplierViewSet)
+router.register(r'supplier-products', SupplierProductViewSet)
+router.register(r'purchase-orders', PurchaseOrderViewSet)
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
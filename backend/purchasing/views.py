@@ -0,0 +1,102 @@
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from enterprisepro.lookups import LookupMixin
+from jobs.views import BackgroundJobMixin
+from .models import PurchaseOrder, Supplier, SupplierProduct
+from .receiving import receive_purchase_orders
+from .replenishment import replenish
+from .serializers import (
+    GoodsReceiptSerializer,
+    PurchaseOrderSerializer,
+    ReplenishmentSerializer,
+    SupplierProductSerializer,
+    SupplierSerializer,
+)
+
+
+class SupplierViewSet(LookupMixin, viewsets.ModelViewSet):
+    """ViewSet for Supplier CRUD operations."""
+    queryset = Supplier.objects.filter(is_active=True)
+    serializer_class = SupplierSerializer
+    search_trigram_fields = ['code', 'name', 'email']
+
+
+class SupplierProductViewSet(viewsets.ModelViewSet):
+    """ViewSet for the products suppliers sell; ``?supplier=`` and ``?product=`` filter."""
+    queryset = SupplierProduct.objects.select_related('supplier', 'product')
+    serializer_class = SupplierProductSerializer
+    filterset_fields = ['supplier', 'product']
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        for field in self.filterset_fields:
+            value = self.request.query_params.get(field)
+            if value and value.isdigit():
+                queryset = queryset.filter(**{f'{field}_id': value})
+        return queryset
+
+
+class PurchaseOrderViewSet(BackgroundJobMixin, viewsets.ModelViewSet):
+    """ViewSet for PurchaseOrder CRUD operations, replenishment and goods receipt."""
+    queryset = PurchaseOrder.objects.select_related('supplier', 'warehouse', 'created_by').prefetch_related(
+        'items__product'
+    )
+    serializer_class = PurchaseOrderSerializer
+    filterset_fields = ['status', 'supplier', 'warehouse']
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        order_status = self.request.query_params.get('status')
+        if order_status:
+            queryset = queryset.filter(status=order_status)
+        for field in ('supplier', 'warehouse'):
+            value = self.request.query_params.get(field)
+            if value and value.isdigit():
+                queryset = queryset.filter(**{f'{field}_id': value})
+        return queryset
+
+    def destroy(self, request, *args, **kwargs):
+        purchase_order = self.get_object()
+        if purchase_order.status != 'draft':
+            return Response(
+                {'error': f'Only draft purchase orders can be deleted. Current status: {purchase_order.status}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return super().destroy(request, *args, **kwargs)
+
+    @action(detail=False, methods=['post'], serializer_class=ReplenishmentSerializer)
+    def replenish(self, request):
+        """
+        Create draft purchase orders, one per supplier and warehouse, for
+        every item below its minimum stock level (``warehouse`` narrows the
+        run); see ``purchasing.replenishment``. With ``Prefer:
+        respond-async`` it runs as a background job (202).
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        warehouse = serializer.validated_data.get('warehouse')
+        warehouse = warehouse.pk if warehouse is not None else None
+
+        if self.wants_background(request):
+            return self.enqueue_job(request, 'purchasing.replenish', {'warehouse': warehouse})
+        return Response(replenish(warehouse=warehouse, user=request.user), status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'], serializer_class=GoodsReceiptSerializer)
+    def receive(self, request):
+        """
+        Receive whole purchase orders into stock: cost layers, stock levels
+        and the ledger move in one transaction; see ``purchasing.receiving``.
+        With ``Prefer: respond-async`` it runs as a background job (202).
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        purchase_orders = [order.pk for order in serializer.validated_data['purchase_orders']]
+
+        if self.wants_background(request):
+            return self.enqueue_job(request, 'purchasing.receive', {'purchase_orders': purchase_orders})
+        try:
+            result = receive_purchase_orders(purchase_orders)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_200_OK)
@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Customer, SalesOrder, SalesOrderItem
+from .models import (
+    Customer, CustomerProductStats, CustomerStats, PriceList, PriceListItem, SalesOrder, SalesOrderItem, StockReservation,
+)
 
 
 class SalesOrderItemInline(admin.TabularInline):
@@ -7,11 +9,40 @@ class SalesOrderItemInline(admin.TabularInline):
     extra = 1
 
 
+class PriceListItemInline(admin.TabularInline):
+    model = PriceListItem
+    extra = 1
+    raw_id_fields = ('product',)
+
+
+@admin.register(PriceList)
+class PriceListAdmin(admin.ModelAdmin):
+    list_display = ('code', 'name', 'is_active')
+    list_filter = ('is_active',)
+    search_fields = ('code', 'name')
+    inlines = [PriceListItemInline]
+
+
 @admin.register(Customer)
 class CustomerAdmin(admin.ModelAdmin):
-    list_display = ('code', 'name', 'email', 'phone', 'is_active')
-    list_filter = ('is_active',)
+    list_display = ('code', 'name', 'email', 'phone', 'credit_limit', 'open_orders_amount', 'open_receivables_amount', 'is_active')
+    list_filter = ('is_active', 'price_list')
     search_fields = ('code', 'name', 'email')
+    readonly_fields = ('open_orders_amount', 'open_receivables_amount')
+
+
+@admin.register(CustomerStats)
+class CustomerStatsAdmin(admin.ModelAdmin):
+    list_display = ('customer', 'order_count', 'lifetime_revenue', 'last_order_date', 'updated_at')
+    search_fields = ('customer__code', 'customer__name')
+    raw_id_fields = ('customer',)
+
+
+@admin.register(CustomerProductStats)
+class CustomerProductStatsAdmin(admin.ModelAdmin):
+    list_display = ('customer', 'product', 'quantity', 'revenue', 'updated_at')
+    search_fields = ('customer__code', 'product__sku')
+    raw_id_fields = ('customer', 'product')
 
 
 @admin.register(SalesOrder)
@@ -28,3 +59,10 @@ class SalesOrderItemAdmin(admin.ModelAdmin):
     list_display = ('sales_order', 'product', 'quantity', 'unit_price', 'line_total')
     list_filter = ('sales_order__status',)
 
+
+
+@admin.register(StockReservation)
+class StockReservationAdmin(admin.ModelAdmin):
+    list_display = ('sales_order', 'inventory_item', 'quantity', 'status', 'expires_at')
+    list_filter = ('status',)
+    raw_id_fields = ('sales_order', 'inventory_item')
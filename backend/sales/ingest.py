@@ -0,0 +1,434 @@
+"""
+Bulk order ingestion for high-volume channels (marketplaces, EDI feeds).
+
+Orders refer to customers, products and warehouses by code/SKU::
+
+    {"idempotency_key": "mp-1001", "customer_code": "C-100",
+     "order_date": "2024-01-15", "status": "draft", "notes": "",
+     "allocation_policy": "fewest_splits",
+     "items": [{"product_sku": "SKU-1", "warehouse_code": "WH1",
+                "quantity": 2, "unit_price": "10.00"}]}
+
+Items without a ``unit_price`` are priced from the customer's price list
+(see ``sales.pricing``). Items without a ``warehouse_code`` are split across
+warehouses by the allocation engine, which loads stock for the whole batch once. Confirmed
+orders reserve their stock and are checked against their customer's credit
+limit; when a batch contains any, the inventory rows and customers it
+touches are locked for the duration of the batch.
+
+Each reference in a batch is resolved with one query per table, order
+numbers are allocated in one round trip from a sequence, and headers and
+lines are written with one bulk INSERT each. Orders are validated one by
+one in plain Python, since running a nested serializer per order would cost
+more than the inserts. Invalid orders are reported and the valid ones are
+still created. An order whose ``idempotency_key`` already exists is
+reported as a duplicate and not created again.
+"""
+from collections import Counter
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from enterprisepro.lookups import get_lookup_version
+from inventory.allocation import POLICIES, AllocationError, Allocator
+from inventory.models import InventoryItem, Product, Warehouse
+from .models import Customer, PriceList, SalesOrder, SalesOrderItem, StockReservation
+from .pricing import resolve_prices
+from .stats import add_order_lines, add_order_stats
+
+ORDER_NUMBER_SEQUENCE = 'sales_order_number_seq'
+# Distinct from the SO-<date>-<n> numbers of single-order create
+ORDER_NUMBER_PREFIX = 'SOB'
+INGEST_STATUSES = ('draft', 'confirmed')
+KEY_MAX_LENGTH = SalesOrder._meta.get_field('idempotency_key').max_length
+CENT = Decimal('0.01')
+
+
+def ingest_orders(orders, user):
+    """Create ``orders`` for ``user``; return one outcome dict per order, in order."""
+    try:
+        return _ingest(orders, user)
+    except IntegrityError:
+        # A concurrent retry of the same batch inserted one of our
+        # idempotency keys first; a second pass reports those as duplicates
+        return _ingest(orders, user)
+
+
+def allocate_order_numbers(count):
+    """Reserve ``count`` order numbers with a single query."""
+    if not count:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT nextval(%s) FROM generate_series(1, %s)', [ORDER_NUMBER_SEQUENCE, count]
+        )
+        values = [row[0] for row in cursor.fetchall()]
+    today = timezone.localdate().strftime('%Y%m%d')
+    return [f'{ORDER_NUMBER_PREFIX}-{today}-{value:07d}' for value in values]
+
+
+class _References:
+    """Every customer, product, warehouse, stock level and credit line a batch mentions, one query each."""
+
+    def __init__(self, orders):
+        customer_codes, skus, warehouse_codes = set(), set(), set()
+        allocate = reserve = False
+        for order in orders:
+            customer_codes.add(str(order.get('customer_code')))
+            reserve = reserve or order.get('status') == 'confirmed'
+            for item in _items(order):
+                skus.add(str(item.get('product_sku')))
+                warehouse_codes.add(str(item.get('warehouse_code')))
+                allocate = allocate or not item.get('warehouse_code')
+
+        self.customers, self.price_lists = {}, {}
+        for code, pk, price_list_id in Customer.objects.filter(
+            code__in=customer_codes, is_active=True
+        ).values_list('code', 'id', 'price_list_id'):
+            self.customers[code] = pk
+            self.price_lists[pk] = price_list_id
+        self.products = {
+            sku: (pk, price)
+            for sku, pk, price in Product.objects.filter(sku__in=skus, is_active=True)
+            .values_list('sku', 'id', 'unit_price')
+        }
+        self.warehouses = dict(
+            Warehouse.objects.filter(code__in=warehouse_codes, is_active=True).values_list('code', 'id')
+        )
+        product_ids = [pk for pk, _ in self.products.values()]
+        stock = InventoryItem.objects.filter(product_id__in=product_ids)
+        if reserve:
+            # Hold every row the batch could reserve, in one statement and
+            # primary key order, until the batch commits
+            list(stock.select_for_update().order_by('pk').values_list('pk'))
+        if not allocate:
+            stock = stock.filter(warehouse_id__in=self.warehouses.values())
+        # (product_id, warehouse_id) -> [inventory item id, available quantity]
+        self.stock = {
+            (product_id, warehouse_id): [pk, available]
+            for pk, product_id, warehouse_id, available in stock.values_list(
+                'pk', 'product_id', 'warehouse_id', F('quantity') - F('reserved')
+            )
+        }
+        # customer_id -> [credit limit, exposure], for customers with a limit
+        customers = Customer.objects.filter(pk__in=self.customers.values(), credit_limit__isnull=False)
+        if reserve:
+            # Locked after the stock, as confirming a single order does
+            customers = customers.select_for_update().order_by('pk')
+        self.credit = {
+            pk: [limit, orders + receivables]
+            for pk, limit, orders, receivables in customers.values_list(
+                'pk', 'credit_limit', 'open_orders_amount', 'open_receivables_amount'
+            )
+        }
+        # One cache read for every order priced from a price list
+        self.price_version = get_lookup_version(PriceList) if any(self.price_lists.values()) else None
+        self.skus = {pk: sku for sku, (pk, _) in self.products.items()}
+        # Stock in every warehouse, only needed when some line has no warehouse
+        self.allocator = Allocator(self.skus) if allocate else None
+
+
+def _items(order):
+    items = order.get('items')
+    return [item for item in items if isinstance(item, dict)] if isinstance(items, list) else []
+
+
+@transaction.atomic
+def _ingest(orders, user):
+    refs = _References(orders)
+    keys = [order.get('idempotency_key') for order in orders if isinstance(order.get('idempotency_key'), str)]
+    existing = {
+        key: (pk, number)
+        for key, pk, number in SalesOrder.objects.filter(idempotency_key__in=keys)
+        .values_list('idempotency_key', 'id', 'order_number')
+    }
+
+    results = []
+    accepted = []  # (result, header fields, lines)
+    seen_keys = set()
+    for index, raw in enumerate(orders):
+        key = raw.get('idempotency_key') or None
+        result = {'index': index, 'idempotency_key': key}
+        results.append(result)
+
+        if isinstance(key, str) and key in existing:
+            pk, number = existing[key]
+            result.update(status='duplicate', id=pk, order_number=number)
+            continue
+        if key is not None and (not isinstance(key, str) or len(key) > KEY_MAX_LENGTH):
+            result.update(status='error', errors={'idempotency_key': [f'Must be a string of at most {KEY_MAX_LENGTH} characters.']})
+            continue
+        if key is not None and key in seen_keys:
+            result.update(status='error', errors={'idempotency_key': ['Repeated within this batch.']})
+            continue
+
+        header, lines, errors = _validate(raw, refs)
+        if errors:
+            result.update(status='error', errors=errors)
+            continue
+        if key is not None:
+            seen_keys.add(key)
+            header['idempotency_key'] = key
+        accepted.append((result, header, lines))
+
+    if accepted:
+        _insert(accepted, user, refs)
+    return results
+
+
+def _validate(raw, refs):
+    """Return ``(header fields, lines, None)`` or ``(None, None, errors)``."""
+    errors = {}
+
+    customer_id = refs.customers.get(str(raw.get('customer_code')))
+    if customer_id is None:
+        errors['customer_code'] = [f"Unknown or inactive customer \"{raw.get('customer_code')}\"."]
+
+    order_date = None
+    try:
+        order_date = parse_date(str(raw.get('order_date', '')))
+    except ValueError:
+        pass
+    if order_date is None:
+        errors['order_date'] = ['Expected a date in YYYY-MM-DD format.']
+
+    order_status = raw.get('status', 'draft')
+    if order_status not in INGEST_STATUSES:
+        errors['status'] = [f"Must be one of: {', '.join(INGEST_STATUSES)}."]
+
+    policy = raw.get('allocation_policy') or ''
+    if policy and policy not in POLICIES:
+        errors['allocation_policy'] = [f"Must be one of: {', '.join(POLICIES)}."]
+
+    items = raw.get('items')
+    if not isinstance(items, list) or not items:
+        errors['items'] = ['Sales order must have at least one item.']
+        return None, None, errors
+
+    lines, item_errors = [], []
+    for item in items:
+        line, line_errors = _validate_item(item, refs)
+        lines.append(line)
+        item_errors.append(line_errors)
+    if any(item_errors):
+        errors['items'] = item_errors
+    if errors:
+        return None, None, errors
+
+    unpriced = [line for line in lines if line.unit_price is None]
+    if unpriced:
+        prices = resolve_prices(
+            refs.price_lists[customer_id],
+            [(line.product_id, line.quantity, line._product_price) for line in unpriced],
+            order_date,
+            refs.price_version,
+        )
+        for line, price in zip(unpriced, prices):
+            line.unit_price, line.line_total = price, line.quantity * price
+
+    total_amount = sum(line.line_total for line in lines)
+    credit = refs.credit.get(customer_id) if order_status == 'confirmed' else None
+    if credit is not None and credit[1] + total_amount > credit[0]:
+        return None, None, {'non_field_errors': [
+            f"Credit limit exceeded for {raw.get('customer_code')}. "
+            f"Limit: {credit[0]}, Exposure: {credit[1] + total_amount}"
+        ]}
+    if order_status == 'confirmed':
+        stock_error = _check_stock(lines, refs)
+        if stock_error:
+            return None, None, {'non_field_errors': [stock_error]}
+    # The order claims stock on a copy of the allocator's pool, and only a
+    # confirmed order that is accepted takes it from the batch's stock
+    allocator = None
+    if refs.allocator is not None:
+        allocator = refs.allocator.fork(line.product_id for line in lines)
+        for line in lines:
+            if line.warehouse_id is not None:
+                # Keep the engine from allocating the same units to open lines
+                allocator.hold(line.product_id, line.warehouse_id, line.quantity)
+    if any(line.warehouse_id is None for line in lines):
+        try:
+            lines = _allocate(lines, policy, refs, allocator)
+        except AllocationError as exc:
+            return None, None, {'non_field_errors': [str(exc)]}
+    if order_status == 'confirmed':
+        for line in lines:
+            refs.stock[line.product_id, line.warehouse_id][1] -= line.quantity
+        if allocator is not None:
+            refs.allocator.join(allocator)
+    if credit is not None:
+        credit[1] += total_amount
+
+    header = {
+        'customer_id': customer_id,
+        'order_date': order_date,
+        'status': order_status,
+        'allocation_policy': policy,
+        'notes': str(raw.get('notes') or ''),
+        'total_amount': total_amount,
+    }
+    return header, lines, None
+
+
+def _validate_item(item, refs):
+    if not isinstance(item, dict):
+        return None, {'non_field_errors': ['Expected an object.']}
+    errors = {}
+
+    product = refs.products.get(str(item.get('product_sku')))
+    if product is None:
+        errors['product_sku'] = [f"Unknown or inactive product \"{item.get('product_sku')}\"."]
+    warehouse_id = None
+    if item.get('warehouse_code'):
+        warehouse_id = refs.warehouses.get(str(item['warehouse_code']))
+    if item.get('warehouse_code') and warehouse_id is None:
+        errors['warehouse_code'] = [f"Unknown or inactive warehouse \"{item.get('warehouse_code')}\"."]
+
+    quantity = item.get('quantity')
+    if isinstance(quantity, bool) or not isinstance(quantity, int) or quantity < 1:
+        errors['quantity'] = ['Ensure this value is a whole number greater than or equal to 1.']
+
+    # Without a price the line is priced from the customer's price list
+    unit_price = item.get('unit_price')
+    if unit_price is not None:
+        try:
+            unit_price = Decimal(str(unit_price)).quantize(CENT)
+            if unit_price < 0:
+                raise InvalidOperation
+        except (InvalidOperation, ValueError):
+            errors['unit_price'] = ['A valid non-negative number is required.']
+
+    if errors:
+        return None, errors
+    line = SalesOrderItem(
+        product_id=product[0],
+        warehouse_id=warehouse_id,
+        quantity=quantity,
+        unit_price=unit_price,
+        # bulk_create skips save(), which normally computes this
+        line_total=None if unit_price is None else quantity * unit_price,
+    )
+    line._product_price = product[1]
+    # For error messages
+    line._sku, line._warehouse_code = item['product_sku'], item.get('warehouse_code')
+    return line, {}
+
+
+def _allocate(lines, policy, refs, allocator):
+    """Replace lines without a warehouse with one line per warehouse ``allocator`` allocates."""
+    open_lines = [line for line in lines if line.warehouse_id is None]
+    allocation = allocator.allocate(
+        [(line.product_id, line.quantity) for line in open_lines],
+        policy or None,
+        describe=refs.skus.get,
+    )
+    pieces = {}
+    for index, warehouse_id, quantity in allocation:
+        line = open_lines[index]
+        pieces.setdefault(id(line), []).append(SalesOrderItem(
+            product_id=line.product_id,
+            warehouse_id=warehouse_id,
+            quantity=quantity,
+            unit_price=line.unit_price,
+            line_total=quantity * line.unit_price,
+            auto_allocated=True,
+        ))
+    result = []
+    for line in lines:
+        result.extend(pieces[id(line)] if line.warehouse_id is None else [line])
+    return result
+
+
+def _check_stock(lines, refs):
+    """
+    Check the fixed lines of a confirmed order against available stock not
+    already claimed by earlier orders in the batch.
+    """
+    fixed = [line for line in lines if line.warehouse_id is not None]
+    requested = Counter()
+    for line in fixed:
+        requested[line.product_id, line.warehouse_id] += line.quantity
+    for line in fixed:
+        key = (line.product_id, line.warehouse_id)
+        if key not in refs.stock:
+            return f'No inventory record found for {line._sku} at {line._warehouse_code}'
+        if refs.stock[key][1] < requested[key]:
+            return (
+                f'Insufficient inventory for {line._sku} at {line._warehouse_code}. '
+                f'Available: {refs.stock[key][1]}, Requested: {requested[key]}'
+            )
+    return None
+
+
+def _insert(accepted, user, refs):
+    numbers = allocate_order_numbers(len(accepted))
+    headers = [
+        SalesOrder(order_number=number, created_by=user, **fields)
+        for number, (_, fields, _) in zip(numbers, accepted)
+    ]
+    SalesOrder.objects.bulk_create(headers, batch_size=1000)
+
+    lines = []
+    for header, (result, _, order_lines) in zip(headers, accepted):
+        for line in order_lines:
+            line.sales_order_id = header.pk
+        lines.extend(order_lines)
+        result.update(status='created', id=header.pk, order_number=header.order_number)
+    SalesOrderItem.objects.bulk_create(lines, batch_size=2000)
+
+    confirmed = [
+        (header, order_lines) for header, (_, _, order_lines) in zip(headers, accepted) if header.status == 'confirmed'
+    ]
+    _reserve(confirmed, refs)
+    _add_open_orders([header for header, _ in confirmed])
+    # bulk_create skips the signals that keep customer statistics
+    add_order_stats([(header.customer_id, 1, header.total_amount, header.order_date) for header, _ in confirmed])
+    add_order_lines([header.pk for header, _ in confirmed])
+
+
+def _add_open_orders(headers):
+    """Add confirmed orders to their customers' exposure; bulk_create skips the signal that would."""
+    totals = Counter()
+    for header in headers:
+        totals[header.customer_id] += header.total_amount
+    if totals:
+        Customer.objects.filter(pk__in=totals).update(
+            open_orders_amount=F('open_orders_amount') + Case(
+                *[When(pk=pk, then=Value(amount)) for pk, amount in totals.items()],
+                output_field=Customer._meta.get_field('open_orders_amount'),
+            ),
+            updated_at=timezone.now(),
+        )
+
+
+def _reserve(orders, refs):
+    """Create reservations for confirmed ``(header, lines)`` and add them to the rows' reserved counts."""
+    if not orders:
+        return
+    now = timezone.now()
+    expires_at = now + timedelta(hours=settings.RESERVATION_TTL_HOURS)
+    reservations = []
+    totals = Counter()
+    for header, lines in orders:
+        demand = Counter()
+        for line in lines:
+            demand[refs.stock[line.product_id, line.warehouse_id][0]] += line.quantity
+        for inventory_item_id, quantity in demand.items():
+            reservations.append(StockReservation(
+                sales_order_id=header.pk,
+                inventory_item_id=inventory_item_id,
+                quantity=quantity,
+                expires_at=expires_at,
+            ))
+            totals[inventory_item_id] += quantity
+    StockReservation.objects.bulk_create(reservations, batch_size=2000)
+    # The rows are locked, so one UPDATE can add every batch total
+    InventoryItem.objects.filter(pk__in=totals).update(
+        reserved=F('reserved') + Case(*[When(pk=pk, then=Value(quantity)) for pk, quantity in totals.items()]),
+        updated_at=now,
+    )
@@ -0,0 +1,13 @@
+from django.db import transaction
+from jobs.registry import register
+from .models import SalesOrder
+from .serializers import SalesOrderSerializer
+
+
+@register('sales.fulfill_order', concurrency=4)
+def fulfill_order(job):
+    """Fulfill a confirmed sales order (queued by the fulfill action)."""
+    with transaction.atomic():
+        sales_order = SalesOrder.objects.select_for_update().get(pk=job.payload['sales_order'])
+        sales_order.fulfill(progress=job.set_progress)
+    return SalesOrderSerializer(sales_order).data
@@ -0,0 +1,33 @@
+from django.db import transaction
+from django.utils import timezone
+
+from enterprisepro.tenancy import CompanyCommand
+from sales.models import StockReservation, release_stock
+
+
+class Command(CompanyCommand):
+    help = 'Release stock reservations of confirmed orders that were not fulfilled in time.'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Reservations released per transaction.',
+        )
+
+    def handle_company(self, company, **options):
+        expired = 0
+        while True:
+            with transaction.atomic():
+                # Skip reservations a fulfillment or cancellation is working on
+                batch = list(
+                    StockReservation.objects.select_for_update(skip_locked=True, of=('self',))
+                    .filter(status='active', expires_at__lte=timezone.now(), sales_order__company=company)
+                    .order_by('expires_at')
+                    .values_list('pk', flat=True)[:options['batch_size']]
+                )
+                if not batch:
+                    break
+                expired += release_stock(StockReservation.objects.filter(pk__in=batch), status='expired')
+
+        self.stdout.write(f'{company.code}: expired {expired} stock reservations.')
@@ -0,0 +1,13 @@
+from enterprisepro.tenancy import CompanyCommand
+from sales.stats import rebuild_customer_stats
+
+
+class Command(CompanyCommand):
+    help = "Recompute every customer's lifetime order statistics and top products from the order history."
+
+    def handle_company(self, company, **options):
+        result = rebuild_customer_stats()
+        self.stdout.write(
+            f"{company.code}: rebuilt statistics of {result['customers']} customers "
+            f"({result['customer_products']} customer/product rows)."
+        )
@@ -0,0 +1,79 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from enterprisepro.tenancy import CompanyCommand
+from finance.models import Invoice
+from sales.models import Customer, SalesOrder
+
+ZERO = Decimal('0.00')
+
+
+class Command(CompanyCommand):
+    help = (
+        "Recompute customers' open order and open receivable totals from their orders "
+        "and invoices, and report (or with --fix, correct) counters that drifted."
+    )
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--fix', action='store_true',
+            help='Overwrite the counters that differ with the recomputed totals.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Customers checked per transaction.',
+        )
+
+    def handle_company(self, company, **options):
+        checked = mismatched = 0
+        last_pk = 0
+        while True:
+            with transaction.atomic():
+                # Locked so no order or invoice moves the counters mid-check
+                customers = list(
+                    Customer.objects.select_for_update()
+                    .filter(pk__gt=last_pk)
+                    .order_by('pk')
+                    .only('pk', 'code', 'open_orders_amount', 'open_receivables_amount')[:options['batch_size']]
+                )
+                if not customers:
+                    break
+                last_pk = customers[-1].pk
+                ids = [customer.pk for customer in customers]
+                orders = dict(
+                    SalesOrder.objects.filter(customer_id__in=ids, status__in=SalesOrder.OPEN_STATUSES)
+                    .order_by()
+                    .values_list('customer_id')
+                    .annotate(Sum('total_amount'))
+                )
+                receivables = dict(
+                    Invoice.objects.filter(sales_order__customer_id__in=ids, status__in=Invoice.OPEN_STATUSES)
+                    .order_by()
+                    .values_list('sales_order__customer_id')
+                    .annotate(balance=Sum(F('total_amount') - F('amount_paid')))
+                )
+
+                drifted, now = [], timezone.now()
+                for customer in customers:
+                    expected = (orders.get(customer.pk, ZERO), receivables.get(customer.pk, ZERO))
+                    actual = (customer.open_orders_amount, customer.open_receivables_amount)
+                    if expected == actual:
+                        continue
+                    self.stdout.write(
+                        f'{company.code} {customer.code}: open orders {actual[0]} -> {expected[0]}, '
+                        f'open receivables {actual[1]} -> {expected[1]}'
+                    )
+                    customer.open_orders_amount, customer.open_receivables_amount = expected
+                    customer.updated_at = now
+                    drifted.append(customer)
+                if options['fix'] and drifted:
+                    Customer.objects.bulk_update(drifted, ['open_orders_amount', 'open_receivables_amount', 'updated_at'])
+                checked += len(customers)
+                mismatched += len(drifted)
+
+        action = 'fixed' if options['fix'] else 'found'
+        self.stdout.write(f'{company.code}: {action} {mismatched} of {checked} customers with drifted credit exposure.')
@@ -0,0 +1,116 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:01
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+CUSTOMER_SEARCH_SQL = """
+CREATE FUNCTION sales_customer_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', coalesce(NEW.code, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.email, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER sales_customer_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF code, name, email ON sales_customer
+    FOR EACH ROW EXECUTE FUNCTION sales_customer_search_vector_update();
+
+UPDATE sales_customer SET code = code;
+"""
+
+CUSTOMER_SEARCH_REVERSE_SQL = """
+DROP TRIGGER IF EXISTS sales_customer_search_vector_trigger ON sales_customer;
+DROP FUNCTION IF EXISTS sales_customer_search_vector_update();
+"""
+
+SALESORDER_SEARCH_SQL = """
+CREATE FUNCTION sales_salesorder_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', coalesce(NEW.order_number, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(
+            (SELECT c.code || ' ' || c.name FROM sales_customer c WHERE c.id = NEW.customer_id), ''
+        )), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER sales_salesorder_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF order_number, customer_id ON sales_salesorder
+    FOR EACH ROW EXECUTE FUNCTION sales_salesorder_search_vector_update();
+
+-- Re-index a customer's orders only when the denormalized code/name change
+CREATE FUNCTION sales_customer_orders_search_refresh() RETURNS trigger AS $$
+BEGIN
+    UPDATE sales_salesorder SET customer_id = customer_id WHERE customer_id = NEW.id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER sales_customer_orders_search_refresh_trigger
+    AFTER UPDATE OF code, name ON sales_customer
+    FOR EACH ROW
+    WHEN (OLD.code IS DISTINCT FROM NEW.code OR OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION sales_customer_orders_search_refresh();
+
+UPDATE sales_salesorder SET order_number = order_number;
+"""
+
+SALESORDER_SEARCH_REVERSE_SQL = """
+DROP TRIGGER IF EXISTS sales_customer_orders_search_refresh_trigger ON sales_customer;
+DROP FUNCTION IF EXISTS sales_customer_orders_search_refresh();
+DROP TRIGGER IF EXISTS sales_salesorder_search_vector_trigger ON sales_salesorder;
+DROP FUNCTION IF EXISTS sales_salesorder_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0003_search_vectors'),
+        ('sales', '0002_prefix_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='salesorder',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='customer_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['code'], name='customer_code_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='customer_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['email'], name='customer_email_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='salesorder',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='salesorder_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='salesorder',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['order_number'], name='salesorder_number_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.RunSQL(CUSTOMER_SEARCH_SQL, CUSTOMER_SEARCH_REVERSE_SQL),
+        migrations.RunSQL(SALESORDER_SEARCH_SQL, SALESORDER_SEARCH_REVERSE_SQL),
+    ]
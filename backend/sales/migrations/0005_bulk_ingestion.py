@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0004_updated_at_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salesorder',
+            name='idempotency_key',
+            field=models.CharField(blank=True, editable=False, max_length=100, null=True, unique=True),
+        ),
+        # Bulk ingestion allocates order numbers in blocks from this sequence
+        migrations.RunSQL(
+            'CREATE SEQUENCE sales_order_number_seq',
+            'DROP SEQUENCE sales_order_number_seq',
+        ),
+    ]
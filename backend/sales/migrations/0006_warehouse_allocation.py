@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0005_bulk_ingestion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salesorder',
+            name='allocation_policy',
+            field=models.CharField(blank=True, choices=[('fewest_splits', 'Fewest splits'), ('priority', 'Warehouse priority'), ('balance', 'Balance stock')], max_length=20),
+        ),
+        migrations.AddField(
+            model_name='salesorderitem',
+            name='auto_allocated',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:38
+
+import django.core.validators
+from django.db import migrations, models
+
+# Start the counters from the orders and invoices already open
+EXPOSURE_SQL = """
+UPDATE sales_customer AS customer SET
+    open_orders_amount = COALESCE((
+        SELECT SUM(o.total_amount) FROM sales_salesorder o
+        WHERE o.customer_id = customer.id AND o.status IN ('confirmed', 'fulfilled')
+    ), 0),
+    open_receivables_amount = COALESCE((
+        SELECT SUM(i.total_amount) FROM finance_invoice i
+        JOIN sales_salesorder o ON o.id = i.sales_order_id
+        WHERE o.customer_id = customer.id AND i.status IN ('draft', 'sent')
+    ), 0);
+"""
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0008_line_cost'),
+        ('finance', '0005_ledger_sales_order'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='credit_limit',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True, validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='open_orders_amount',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='open_receivables_amount',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=14),
+        ),
+        migrations.RunSQL(EXPOSURE_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Start the statistics from the orders already booked
+STATS_SQL = """
+INSERT INTO sales_customerstats (customer_id, order_count, lifetime_revenue, last_order_date, updated_at)
+SELECT customer_id, COUNT(*), SUM(total_amount), MAX(order_date), now()
+FROM sales_salesorder
+WHERE status IN ('confirmed', 'fulfilled', 'invoiced')
+GROUP BY customer_id;
+
+INSERT INTO sales_customerproductstats (customer_id, product_id, quantity, revenue, updated_at)
+SELECT o.customer_id, i.product_id, SUM(i.quantity), SUM(i.line_total), now()
+FROM sales_salesorderitem i
+JOIN sales_salesorder o ON o.id = i.sales_order_id
+WHERE o.status IN ('confirmed', 'fulfilled', 'invoiced')
+GROUP BY 1, 2;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0008_abc_xyz_classification'),
+        ('sales', '0010_price_lists'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerProductStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.BigIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'customer product stats',
+            },
+        ),
+        migrations.CreateModel(
+            name='CustomerStats',
+            fields=[
+                ('customer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='sales.customer')),
+                ('order_count', models.IntegerField(default=0)),
+                ('lifetime_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('last_order_date', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'customer stats',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='salesorder',
+            index=models.Index(fields=['customer', '-order_date'], name='salesorder_customer_date_idx'),
+        ),
+        migrations.AddField(
+            model_name='customerproductstats',
+            name='customer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='product_stats', to='sales.customer'),
+        ),
+        migrations.AddField(
+            model_name='customerproductstats',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='customer_stats', to='inventory.product'),
+        ),
+        migrations.AddIndex(
+            model_name='customerproductstats',
+            index=models.Index(fields=['customer', '-revenue'], name='customerproductstats_top_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='customerproductstats',
+            constraint=models.UniqueConstraint(fields=('customer', 'product'), name='customerproductstats_unique'),
+        ),
+        migrations.RunSQL(STATS_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,121 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:14
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django.db.models.deletion
+import django.db.models.functions.text
+import enterprisepro.tenancy
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_companies'),
+        ('sales', '0011_customer_stats'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='customer',
+            name='customer_code_prefix_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='customer',
+            name='customer_name_prefix_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='customer',
+            name='customer_updated_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='salesorder',
+            name='salesorder_updated_idx',
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='company',
+            field=models.ForeignKey(default=enterprisepro.tenancy.current_company_id, null=True, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.company'),
+        ),
+        migrations.AddField(
+            model_name='pricelist',
+            name='company',
+            field=models.ForeignKey(default=enterprisepro.tenancy.current_company_id, null=True, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.company'),
+        ),
+        migrations.AddField(
+            model_name='salesorder',
+            name='company',
+            field=models.ForeignKey(default=enterprisepro.tenancy.current_company_id, null=True, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.company'),
+        ),
+        enterprisepro.tenancy.fill_company('sales', 'customer', 'pricelist', 'salesorder'),
+        migrations.AlterField(
+            model_name='customer',
+            name='company',
+            field=models.ForeignKey(default=enterprisepro.tenancy.current_company_id, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.company'),
+        ),
+        migrations.AlterField(
+            model_name='pricelist',
+            name='company',
+            field=models.ForeignKey(default=enterprisepro.tenancy.current_company_id, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.company'),
+        ),
+        migrations.AlterField(
+            model_name='salesorder',
+            name='company',
+            field=models.ForeignKey(default=enterprisepro.tenancy.current_company_id, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.company'),
+        ),
+        migrations.AlterField(
+            model_name='customer',
+            name='code',
+            field=models.CharField(max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='pricelist',
+            name='code',
+            field=models.CharField(max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='salesorder',
+            name='idempotency_key',
+            field=models.CharField(blank=True, editable=False, max_length=100, null=True),
+        ),
+        migrations.AlterField(
+            model_name='salesorder',
+            name='order_number',
+            field=models.CharField(max_length=50),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(models.F('company'), django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('code'), name='text_pattern_ops'), name='customer_code_prefix_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(models.F('company'), django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('name'), name='text_pattern_ops'), name='customer_name_prefix_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['company', 'updated_at', 'id'], name='customer_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='salesorder',
+            index=models.Index(fields=['company', 'updated_at', 'id'], name='salesorder_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='salesorder',
+            index=models.Index(fields=['company', '-order_date', '-created_at'], name='salesorder_company_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='customer',
+            constraint=models.UniqueConstraint(fields=('company', 'code'), name='customer_company_code_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='pricelist',
+            constraint=models.UniqueConstraint(fields=('company', 'code'), name='pricelist_company_code_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='salesorder',
+            constraint=models.UniqueConstraint(fields=('company', 'order_number'), name='salesorder_company_number_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='salesorder',
+            constraint=models.UniqueConstraint(fields=('company', 'idempotency_key'), name='salesorder_company_key_uniq'),
+        ),
+    ]
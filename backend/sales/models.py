@@ -1,27 +1,211 @@
+from collections import Counter
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Upper
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator
-from inventory.models import Product, Warehouse
+from django.utils import timezone
+from enterprisepro.tenancy import TenantManager, TenantModel
+from inventory import costing
+from inventory.allocation import POLICY_CHOICES, Allocator
+from inventory.models import InventoryItem, Product, Warehouse
+
+
+class PriceList(TenantModel):
+    """Named set of product prices assigned to customers (see sales.pricing)."""
+    code = models.CharField(max_length=50)
+    name = models.CharField(max_length=200)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['code']
+        constraints = [
+            models.UniqueConstraint(fields=['company', 'code'], name='pricelist_company_code_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.code} - {self.name}"
+
+
+class PriceListItem(models.Model):
+    """
+    Price of a product on a price list from ``min_quantity`` units per line
+    (quantity breaks), optionally only between ``valid_from`` and ``valid_to``.
+    """
+    price_list = models.ForeignKey(PriceList, on_delete=models.CASCADE, related_name='items')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='price_list_items')
+    min_quantity = models.IntegerField(default=1, validators=[MinValueValidator(1)])
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0)])
+    valid_from = models.DateField(null=True, blank=True)
+    valid_to = models.DateField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = TenantManager()
+    tenant_lookup = 'price_list__company'
+
+    class Meta:
+        ordering = ['price_list', 'product', 'min_quantity']
+        indexes = [
+            models.Index(fields=['price_list', 'product'], name='pricelistitem_product_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.price_list.code} - {self.product.sku} from {self.min_quantity}: {self.unit_price}"
 
 
-class Customer(models.Model):
+class Customer(TenantModel):
     """Customer master data."""
-    code = models.CharField(max_length=50, unique=True, db_index=True)
+    code = models.CharField(max_length=50)
     name = models.CharField(max_length=200)
     email = models.EmailField(blank=True)
     phone = models.CharField(max_length=20, blank=True)
     address = models.TextField(blank=True)
+    # Prices for lines without an explicit unit price; none means product prices
+    price_list = models.ForeignKey(
+        PriceList, on_delete=models.SET_NULL, null=True, blank=True, related_name='customers'
+    )
+    # Blank means no limit
+    credit_limit = models.DecimalField(
+        max_digits=12, decimal_places=2, null=True, blank=True, validators=[MinValueValidator(0)]
+    )
+    # Exposure counters maintained by sales/finance signals (see adjust_exposure);
+    # manage.py reconcile_credit_exposure checks them against the orders and invoices
+    open_orders_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0, editable=False)
+    open_receivables_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0, editable=False)
     is_active = models.BooleanField(default=True)
+    # Maintained by a database trigger from code/name/email
+    search_vector = SearchVectorField(null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['name']
+        constraints = [
+            models.UniqueConstraint(fields=['company', 'code'], name='customer_company_code_uniq'),
+        ]
+        indexes = [
+            # Prefix lookups (UPPER(col) LIKE 'TERM%') for autocomplete, within a company
+            models.Index(F('company'), OpClass(Upper('code'), name='text_pattern_ops'), name='customer_code_prefix_idx'),
+            models.Index(F('company'), OpClass(Upper('name'), name='text_pattern_ops'), name='customer_name_prefix_idx'),
+            # Ranked full-text and fuzzy search
+            GinIndex(fields=['search_vector'], name='customer_search_vector_idx'),
+            GinIndex(fields=['code'], opclasses=['gin_trgm_ops'], name='customer_code_trgm_idx'),
+            GinIndex(fields=['name'], opclasses=['gin_trgm_ops'], name='customer_name_trgm_idx'),
+            GinIndex(fields=['email'], opclasses=['gin_trgm_ops'], name='customer_email_trgm_idx'),
+            # Delta-sync change feed (updated_at, id) keyset
+            models.Index(fields=['company', 'updated_at', 'id'], name='customer_updated_idx'),
+        ]
+
+    # Only ever changed in place by UPDATEs (see adjust_exposure)
+    EXPOSURE_FIELDS = ('open_orders_amount', 'open_receivables_amount')
 
     def __str__(self):
         return f"{self.code} - {self.name}"
 
+    def save(self, *args, **kwargs):
+        # Writing back a loaded copy of the counters would undo changes made since it was read
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.EXPOSURE_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+    @property
+    def credit_exposure(self):
+        """Unpaid invoices plus confirmed, not yet invoiced orders."""
+        return self.open_orders_amount + self.open_receivables_amount
+
+    @property
+    def available_credit(self):
+        if self.credit_limit is None:
+            return None
+        return self.credit_limit - self.credit_exposure
+
+    def check_credit(self):
+        """
+        Raise ValueError if the customer's exposure is over its credit limit.
+
+        Call after the counters were updated in the current transaction: the
+        counter UPDATE holds the customer row lock until commit, so
+        concurrent confirmations are checked one after the other.
+        """
+        if self.credit_limit is None:
+            return
+        self.refresh_from_db(fields=['open_orders_amount', 'open_receivables_amount'])
+        if self.credit_exposure > self.credit_limit:
+            raise ValueError(
+                f"Credit limit exceeded for {self.code}. "
+                f"Limit: {self.credit_limit}, Exposure: {self.credit_exposure}"
+            )
+
+
+def adjust_exposure(customer_id, orders=0, receivables=0):
+    """Add to a customer's open order and open receivable counters."""
+    if orders or receivables:
+        Customer.objects.filter(pk=customer_id).update(
+            open_orders_amount=models.F('open_orders_amount') + orders,
+            open_receivables_amount=models.F('open_receivables_amount') + receivables,
+            # The counters are part of the customer's change feed
+            updated_at=timezone.now(),
+        )
+
+
+class CustomerStats(models.Model):
+    """
+    A customer's lifetime booked (confirmed, fulfilled or invoiced) orders,
+    maintained incrementally by sales.stats.
+    """
+    customer = models.OneToOneField(Customer, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    order_count = models.IntegerField(default=0)
+    lifetime_revenue = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    last_order_date = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'customer stats'
+
+    def __str__(self):
+        return f"{self.customer_id}: {self.order_count} orders, {self.lifetime_revenue}"
+
+    @property
+    def average_order_value(self):
+        if not self.order_count:
+            return Decimal('0.00')
+        return (self.lifetime_revenue / self.order_count).quantize(Decimal('0.01'))
+
 
-class SalesOrder(models.Model):
+class CustomerProductStats(models.Model):
+    """Quantity and revenue of a product on a customer's booked orders (see sales.stats)."""
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='product_stats')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='customer_stats')
+    quantity = models.BigIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'customer product stats'
+        constraints = [
+            models.UniqueConstraint(fields=['customer', 'product'], name='customerproductstats_unique'),
+        ]
+        indexes = [
+            # Top products of a customer
+            models.Index(fields=['customer', '-revenue'], name='customerproductstats_top_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.customer_id} / {self.product_id}: {self.quantity} for {self.revenue}"
+
+
+class SalesOrder(TenantModel):
     """Sales Order Header."""
     STATUS_CHOICES = [
         ('draft', 'Draft'),
@@ -30,27 +214,240 @@ class SalesOrder(models.Model):
         ('invoiced', 'Invoiced'),
         ('cancelled', 'Cancelled'),
     ]
+    # Statuses whose total counts towards the customer's open orders
+    OPEN_STATUSES = ('confirmed', 'fulfilled')
+    # Statuses counted in the customer's lifetime statistics
+    BOOKED_STATUSES = ('confirmed', 'fulfilled', 'invoiced')
 
-    order_number = models.CharField(max_length=50, unique=True, db_index=True)
+    order_number = models.CharField(max_length=50)
     customer = models.ForeignKey(Customer, on_delete=models.PROTECT, related_name='sales_orders')
     order_date = models.DateField()
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
     total_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0, validators=[MinValueValidator(0)])
     notes = models.TextField(blank=True)
     created_by = models.ForeignKey('accounts.User', on_delete=models.PROTECT, related_name='created_orders')
+    # Policy used to split lines that were given no warehouse (see inventory.allocation)
+    allocation_policy = models.CharField(max_length=20, choices=POLICY_CHOICES, blank=True)
+    # Client-supplied key that makes bulk ingestion retries safe
+    idempotency_key = models.CharField(max_length=100, null=True, blank=True, editable=False)
+    # Maintained by a database trigger from order_number and the customer's code/name
+    search_vector = SearchVectorField(null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-order_date', '-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['company', 'order_number'], name='salesorder_company_number_uniq'),
+            models.UniqueConstraint(fields=['company', 'idempotency_key'], name='salesorder_company_key_uniq'),
+        ]
+        indexes = [
+            GinIndex(fields=['search_vector'], name='salesorder_search_vector_idx'),
+            GinIndex(fields=['order_number'], opclasses=['gin_trgm_ops'], name='salesorder_number_trgm_idx'),
+            models.Index(fields=['company', 'updated_at', 'id'], name='salesorder_updated_idx'),
+            # The order list, latest first
+            models.Index(fields=['company', '-order_date', '-created_at'], name='salesorder_company_date_idx'),
+            # A customer's order history, latest first
+            models.Index(fields=['customer', '-order_date'], name='salesorder_customer_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.order_number} - {self.customer.name} ({self.get_status_display()})"
 
+    @property
+    def open_amount(self):
+        """What the order adds to the customer's open orders."""
+        return self.total_amount if self.status in self.OPEN_STATUSES else 0
+
     def calculate_total(self):
         """Calculate total amount from line items."""
         return self.items.aggregate(total=models.Sum(models.F('quantity') * models.F('unit_price')))['total'] or 0
 
+    def reallocate(self):
+        """
+        Split the auto-allocated lines again over current stock with the
+        order's allocation policy, e.g. when a chosen warehouse ran short
+        before confirmation. Raises AllocationError if stock is short.
+        """
+        items = list(self.items.select_related('product'))
+        auto_items = [item for item in items if item.auto_allocated]
+        if not auto_items:
+            return
+
+        # Merge the split pieces back into one line per product and price
+        merged = {}
+        for item in auto_items:
+            key = (item.product_id, item.unit_price)
+            merged[key] = merged.get(key, 0) + item.quantity
+        keys = list(merged)
+        skus = {item.product_id: item.product.sku for item in items}
+
+        allocator = Allocator(skus)
+        for item in items:
+            if not item.auto_allocated:
+                allocator.hold(item.product_id, item.warehouse_id, item.quantity)
+        allocation = allocator.allocate(
+            [(product_id, merged[product_id, price]) for product_id, price in keys],
+            self.allocation_policy,
+            describe=skus.get,
+        )
+
+        SalesOrderItem.objects.filter(pk__in=[item.pk for item in auto_items]).delete()
+        SalesOrderItem.objects.bulk_create([
+            SalesOrderItem(
+                sales_order=self,
+                product_id=keys[index][0],
+                warehouse_id=warehouse_id,
+                quantity=quantity,
+                unit_price=keys[index][1],
+                line_total=quantity * keys[index][1],
+                auto_allocated=True,
+            )
+            for index, warehouse_id, quantity in allocation
+        ])
+
+    def reserve_stock(self):
+        """
+        Reserve stock for every line item so later confirmations cannot
+        promise the same units. Each inventory row is reserved with one
+        conditional UPDATE, in primary key order, so concurrent confirmations
+        queue on the row lock instead of overselling or deadlocking.
+
+        Must run inside a transaction; raises ValueError (leaving the caller
+        to roll back) when stock is missing.
+        """
+        demand = Counter()
+        names = {}
+        for item in self.items.select_related('product', 'warehouse'):
+            key = (item.product_id, item.warehouse_id)
+            demand[key] += item.quantity
+            names[key] = (item.product.sku, item.warehouse.code)
+        if not demand:
+            return
+
+        rows = {
+            (product_id, warehouse_id): pk
+            for pk, product_id, warehouse_id in InventoryItem.objects.filter(
+                product_id__in={product_id for product_id, _ in demand},
+                warehouse_id__in={warehouse_id for _, warehouse_id in demand},
+            ).values_list('pk', 'product_id', 'warehouse_id')
+        }
+        for key in demand:
+            if key not in rows:
+                raise ValueError(
+                    f"No inventory record found for {names[key][0]} at {names[key][1]}. "
+                    f"Please create an inventory record first."
+                )
+
+        now = timezone.now()
+        for key in sorted(demand, key=rows.get):
+            quantity = demand[key]
+            reserved = InventoryItem.objects.filter(
+                pk=rows[key], quantity__gte=models.F('reserved') + quantity
+            ).update(reserved=models.F('reserved') + quantity, updated_at=now)
+            if not reserved:
+                inventory = InventoryItem.objects.get(pk=rows[key])
+                raise ValueError(
+                    f"Insufficient inventory for {names[key][0]} at {names[key][1]}. "
+                    f"Available: {inventory.available}, Required: {quantity}"
+                )
+
+        expires_at = now + timedelta(hours=settings.RESERVATION_TTL_HOURS)
+        StockReservation.objects.bulk_create([
+            StockReservation(
+                sales_order=self,
+                inventory_item_id=rows[key],
+                quantity=quantity,
+                expires_at=expires_at,
+            )
+            for key, quantity in demand.items()
+        ])
+
+    def release_reservations(self, status='released'):
+        """Give this order's active reservations back to available stock."""
+        release_stock(self.reservations.filter(status='active'), status)
+
+    def fulfill(self, progress=None):
+        """
+        Decrease inventory for every line item, consuming the order's
+        reservations, cost each line (see ``inventory.costing``), post the
+        cost of goods sold and mark the order fulfilled.
+
+        Must run inside a transaction; raises ValueError (leaving the caller
+        to roll back) when stock is missing. Units that are not reserved
+        (the reservation expired) must still be available. ``progress(done,
+        total)`` is called after each inventory row.
+        """
+        if self.status != 'confirmed':
+            raise ValueError(
+                f'Order must be in "confirmed" status to fulfill. Current status: {self.status}'
+            )
+
+        demand = Counter()
+        names = {}
+        lines = {}
+        for item in self.items.select_related('product', 'warehouse'):
+            key = (item.product_id, item.warehouse_id)
+            demand[key] += item.quantity
+            names[key] = (item.product.sku, item.warehouse.code)
+            lines.setdefault(key, []).append(item)
+        reservations = list(self.reservations.select_for_update().filter(status='active'))
+        reserved = Counter()
+        for reservation in reservations:
+            reserved[reservation.inventory_item_id] += reservation.quantity
+
+        inventory = {
+            (row.product_id, row.warehouse_id): row
+            for row in InventoryItem.objects.select_for_update(of=('self',))
+            .select_related('product')
+            .filter(
+                product_id__in={product_id for product_id, _ in demand},
+                warehouse_id__in={warehouse_id for _, warehouse_id in demand},
+            )
+            .order_by('pk')
+        }
+        for done, (key, quantity) in enumerate(demand.items(), start=1):
+            row = inventory.get(key)
+            if row is None:
+                raise ValueError(f"No inventory record found for {names[key][0]} at {names[key][1]}")
+
+            # Units held for this order plus whatever nobody else has reserved
+            own = reserved[row.pk]
+            if row.available + own < quantity:
+                raise ValueError(
+                    f"Insufficient inventory for {names[key][0]} at {names[key][1]}. "
+                    f"Available: {row.available + own}, Required: {quantity}"
+                )
+
+            costs = costing.issue(row, [item.quantity for item in lines[key]])
+            for item, cost in zip(lines[key], costs):
+                item.cost_amount = cost.quantize(Decimal('0.01'))
+            row.reserved -= own
+            row.save(update_fields=['quantity', 'reserved', 'stock_value', 'updated_at'])
+            if progress is not None:
+                progress(done, len(demand))
+
+        items = [item for key_lines in lines.values() for item in key_lines]
+        SalesOrderItem.objects.bulk_update(items, ['cost_amount'])
+        cost_of_goods_sold = sum(item.cost_amount for item in items)
+        if cost_of_goods_sold:
+            # Imported here: finance depends on sales
+            from finance.ledger import post_entry
+            post_entry(
+                'cost_of_goods_sold',
+                'inventory',
+                cost_of_goods_sold,
+                f'Cost of goods sold - {self.order_number}',
+                timezone.localdate(),
+                sales_order=self,
+            )
+
+        StockReservation.objects.filter(pk__in=[r.pk for r in reservations]).update(
+            status='consumed', updated_at=timezone.now()
+        )
+        self.status = 'fulfilled'
+        self.save(update_fields=['status', 'updated_at'])
+
 
 class SalesOrderItem(models.Model):
     """Sales Order Line Items."""
@@ -60,6 +457,10 @@ class SalesOrderItem(models.Model):
     quantity = models.IntegerField(validators=[MinValueValidator(1)])
     unit_price = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0)])
     line_total = models.DecimalField(max_digits=12, decimal_places=2, validators=[MinValueValidator(0)])
+    # Warehouse chosen by the allocation engine rather than the caller
+    auto_allocated = models.BooleanField(default=False)
+    # Cost of the stock issued for this line, set on fulfillment
+    cost_amount = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -73,3 +474,61 @@ class SalesOrderItem(models.Model):
         self.line_total = self.quantity * self.unit_price
         super().save(*args, **kwargs)
 
+
+class StockReservation(models.Model):
+    """
+    Stock promised to a confirmed order until it is fulfilled, cancelled or
+    the reservation expires. ``InventoryItem.reserved`` holds the sum of the
+    active reservations on each row.
+    """
+    STATUS_CHOICES = [
+        ('active', 'Active'),
+        ('consumed', 'Consumed'),
+        ('released', 'Released'),
+        ('expired', 'Expired'),
+    ]
+
+    sales_order = models.ForeignKey(SalesOrder, on_delete=models.CASCADE, related_name='reservations')
+    inventory_item = models.ForeignKey(InventoryItem, on_delete=models.CASCADE, related_name='reservations')
+    quantity = models.IntegerField(validators=[MinValueValidator(1)])
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # Expiry sweep only looks at active reservations
+            models.Index(
+                fields=['expires_at'],
+                name='reservation_expiry_idx',
+                condition=models.Q(status='active'),
+            ),
+            models.Index(fields=['sales_order', 'status'], name='reservation_order_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.sales_order.order_number}: {self.quantity} of {self.inventory_item} ({self.status})"
+
+
+def release_stock(reservations, status='released'):
+    """
+    Mark active ``reservations`` (a queryset) as ``status`` and return their
+    units to available stock. Must run inside a transaction.
+    """
+    reservations = list(reservations.select_for_update().filter(status='active'))
+    if not reservations:
+        return 0
+    quantities = Counter()
+    for reservation in reservations:
+        quantities[reservation.inventory_item_id] += reservation.quantity
+
+    now = timezone.now()
+    # Same row order as reserve_stock, so the two never deadlock
+    for pk in sorted(quantities):
+        InventoryItem.objects.filter(pk=pk).update(
+            reserved=models.F('reserved') - quantities[pk], updated_at=now
+        )
+    StockReservation.objects.filter(pk__in=[r.pk for r in reservations]).update(status=status, updated_at=now)
+    return len(reservations)
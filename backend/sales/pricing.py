@@ -0,0 +1,77 @@
+"""
+Price resolution from customer price lists.
+
+A customer may have a ``PriceList``. The list's items price a product from
+a minimum quantity per line (quantity breaks), optionally only between two
+dates. A line's price is that of the matching item with the highest
+minimum quantity (the latest ``valid_from`` on ties), or else the
+product's ``unit_price``.
+
+Each price list is compiled once per process into ``product_id -> breaks``
+with one query, so pricing an order of any size is a dict lookup per line
+and one cache read while the list is cached. Compiled lists are dropped
+when the price list cache version moves; the signals on ``PriceList`` and
+``PriceListItem`` bump it on every save and delete. The version lives in the
+``shared`` cache, so a change made through one worker process reaches all
+of them. Bulk updates that skip signals must call
+``bump_lookup_version(PriceList)`` themselves.
+"""
+from collections import defaultdict
+
+from django.db.models import F
+
+from enterprisepro.lookups import get_lookup_version
+from enterprisepro.tenancy import current_schema
+from .models import PriceList, PriceListItem
+
+# (schema, price_list_id) -> (version, {product_id: [(min_quantity, valid_from, valid_to, unit_price), ...]})
+_compiled = {}
+
+
+def resolve_prices(price_list_id, lines, on_date, version=None):
+    """
+    Return the unit price of each of ``lines`` (``[(product_id, quantity,
+    product_price), ...]``) for an order dated ``on_date`` on
+    ``price_list_id`` (None for product prices only). ``version`` is the
+    price list cache version when the caller read it already, e.g. once for
+    a whole batch.
+    """
+    breaks = _price_list(price_list_id, version) if price_list_id is not None else {}
+    prices = []
+    for product_id, quantity, product_price in lines:
+        price = product_price
+        # Highest minimum quantity first, so the first match wins
+        for min_quantity, valid_from, valid_to, unit_price in breaks.get(product_id, ()):
+            if (
+                min_quantity <= quantity
+                and (valid_from is None or valid_from <= on_date)
+                and (valid_to is None or on_date <= valid_to)
+            ):
+                price = unit_price
+                break
+        prices.append(price)
+    return prices
+
+
+def _price_list(price_list_id, version=None):
+    if version is None:
+        version = get_lookup_version(PriceList)
+    # Ids are only unique within a schema
+    key = (current_schema(), price_list_id)
+    cached = _compiled.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    breaks = defaultdict(list)
+    rows = (
+        PriceListItem.objects.filter(price_list_id=price_list_id, price_list__is_active=True)
+        .order_by('product_id', '-min_quantity', F('valid_from').desc(nulls_last=True))
+        .values_list('product_id', 'min_quantity', 'valid_from', 'valid_to', 'unit_price')
+    )
+    for product_id, *price_break in rows:
+        breaks[product_id].append(tuple(price_break))
+    breaks = dict(breaks)
+    # Stored under the version read before the query, so a change made
+    # meanwhile recompiles on the next call
+    _compiled[key] = (version, breaks)
+    return breaks
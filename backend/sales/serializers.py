@@ -1,14 +1,117 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.db import transaction
-from inventory.models import InventoryItem
-from .models import Customer, SalesOrder, SalesOrderItem
+from django.utils import timezone
+from enterprisepro.serializers import SparseFieldsMixin, unique_in_company
+from inventory.allocation import AllocationError, Allocator
+from inventory.models import InventoryItem, Product, Warehouse
+from .models import Customer, PriceList, PriceListItem, SalesOrder, SalesOrderItem
+from .pricing import resolve_prices
 
 
 class CustomerSerializer(serializers.ModelSerializer):
     """Serializer for Customer model."""
+    credit_exposure = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+    available_credit = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True, allow_null=True)
+
     class Meta:
         model = Customer
+        exclude = ('search_vector',)
+        extra_kwargs = {'code': {'validators': [unique_in_company(Customer, 'code')]}}
+
+
+class CustomerTopProductSerializer(serializers.Serializer):
+    """A product on a customer's booked orders."""
+    product = serializers.IntegerField()
+    sku = serializers.CharField()
+    name = serializers.CharField()
+    quantity = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=16, decimal_places=2)
+
+
+class CustomerSummarySerializer(serializers.Serializer):
+    """Serializer for a customer's lifetime statistics and open amounts."""
+    customer = serializers.IntegerField()
+    code = serializers.CharField()
+    name = serializers.CharField()
+    order_count = serializers.IntegerField()
+    lifetime_revenue = serializers.DecimalField(max_digits=16, decimal_places=2)
+    average_order_value = serializers.DecimalField(max_digits=16, decimal_places=2)
+    last_order_date = serializers.DateField(allow_null=True)
+    open_orders = serializers.DecimalField(max_digits=14, decimal_places=2)
+    open_receivables = serializers.DecimalField(max_digits=14, decimal_places=2)
+    credit_limit = serializers.DecimalField(max_digits=14, decimal_places=2, allow_null=True)
+    available_credit = serializers.DecimalField(max_digits=14, decimal_places=2, allow_null=True)
+    top_products = CustomerTopProductSerializer(many=True)
+
+
+class PriceListSerializer(serializers.ModelSerializer):
+    """Serializer for PriceList model."""
+    item_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = PriceList
         fields = '__all__'
+        extra_kwargs = {'code': {'validators': [unique_in_company(PriceList, 'code')]}}
+
+
+class PriceListItemSerializer(serializers.ModelSerializer):
+    """Serializer for PriceListItem model."""
+    product_sku = serializers.CharField(source='product.sku', read_only=True)
+
+    class Meta:
+        model = PriceListItem
+        fields = '__all__'
+
+    def validate(self, attrs):
+        valid_from = attrs.get('valid_from', self.instance and self.instance.valid_from)
+        valid_to = attrs.get('valid_to', self.instance and self.instance.valid_to)
+        if valid_from and valid_to and valid_to < valid_from:
+            raise serializers.ValidationError({'valid_to': 'Must not be before valid_from.'})
+        return attrs
+
+
+class OrderPricingLineSerializer(serializers.Serializer):
+    # Resolved for all lines at once in OrderPricingSerializer.validate
+    product = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1)
+
+
+class OrderPricingSerializer(serializers.Serializer):
+    """Lines to price for a customer, as an order would price them."""
+    customer = serializers.PrimaryKeyRelatedField(queryset=Customer.objects.filter(is_active=True))
+    order_date = serializers.DateField(required=False)
+    items = OrderPricingLineSerializer(many=True, allow_empty=False)
+
+    def validate(self, attrs):
+        attrs.setdefault('order_date', timezone.localdate())
+        products = Product.objects.in_bulk({item['product'] for item in attrs['items']})
+        missing = sorted({item['product'] for item in attrs['items']} - products.keys())
+        if missing:
+            raise serializers.ValidationError({'items': f'Unknown products: {missing}'})
+        for item in attrs['items']:
+            item['product'] = products[item['product']]
+        return attrs
+
+    def price(self):
+        """Priced lines and their total."""
+        items = self.validated_data['items']
+        prices = resolve_prices(
+            self.validated_data['customer'].price_list_id,
+            [(item['product'].pk, item['quantity'], item['product'].unit_price) for item in items],
+            self.validated_data['order_date'],
+        )
+        lines = [
+            {
+                'product': item['product'].pk,
+                'quantity': item['quantity'],
+                'unit_price': str(price),
+                'line_total': str(item['quantity'] * price),
+            }
+            for item, price in zip(items, prices)
+        ]
+        total = sum(item['quantity'] * price for item, price in zip(items, prices))
+        return {'items': lines, 'total_amount': str(total)}
 
 
 class SalesOrderItemSerializer(serializers.ModelSerializer):
@@ -21,10 +124,25 @@ class SalesOrderItemSerializer(serializers.ModelSerializer):
         model = SalesOrderItem
         # Exclude sales_order when used as nested serializer (it's set automatically)
         exclude = ('sales_order',)
-        read_only_fields = ('line_total',)
+        read_only_fields = ('line_total', 'auto_allocated')
+        # Lines without a warehouse are split across warehouses by the allocation
+        # engine; lines without a unit price are priced from the customer's price list
+        extra_kwargs = {'warehouse': {'required': False}, 'unit_price': {'required': False}}
+
+
+class SalesOrderListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Read-only list representation of SalesOrder: header fields, no nested items."""
+    customer_name = serializers.CharField(source='customer.name', read_only=True)
+    customer_code = serializers.CharField(source='customer.code', read_only=True)
+    created_by_username = serializers.CharField(source='created_by.username', read_only=True)
+    item_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = SalesOrder
+        exclude = ('search_vector',)
 
 
-class SalesOrderSerializer(serializers.ModelSerializer):
+class SalesOrderSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for SalesOrder model."""
     items = SalesOrderItemSerializer(many=True, required=False)
     customer_name = serializers.CharField(source='customer.name', read_only=True)
@@ -33,10 +151,13 @@ class SalesOrderSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = SalesOrder
-        fields = '__all__'
+        exclude = ('search_vector',)
         read_only_fields = ('total_amount', 'created_by', 'created_at', 'updated_at')
         extra_kwargs = {
-            'order_number': {'required': False, 'allow_blank': True, 'allow_null': False}
+            'order_number': {
+                'required': False, 'allow_blank': True, 'allow_null': False,
+                'validators': [unique_in_company(SalesOrder, 'order_number')],
+            }
         }
 
     def validate_items(self, value):
@@ -64,6 +185,13 @@ class SalesOrderSerializer(serializers.ModelSerializer):
         if items is not None and len(items) == 0:
             raise serializers.ValidationError("Sales order must have at least one item.")
 
+        if items:
+            customer = attrs.get('customer') or self.instance.customer
+            order_date = attrs.get('order_date') or self.instance.order_date
+            self._price_items(items, customer, order_date)
+            policy = attrs.get('allocation_policy') or (self.instance and self.instance.allocation_policy)
+            items = attrs['items'] = self._allocate_items(items, policy)
+
         # Get order status (default to 'draft' for new orders)
         order_status = attrs.get('status', 'draft')
         if self.instance:
@@ -80,10 +208,10 @@ class SalesOrderSerializer(serializers.ModelSerializer):
 
                 try:
                     inventory = InventoryItem.objects.get(product=product, warehouse=warehouse)
-                    if inventory.quantity < quantity:
+                    if inventory.available < quantity:
                         raise serializers.ValidationError(
                             f"Insufficient inventory for {product.sku} at {warehouse.code}. "
-                            f"Available: {inventory.quantity}, Requested: {quantity}"
+                            f"Available: {inventory.available}, Requested: {quantity}"
                         )
                 except InventoryItem.DoesNotExist:
                     raise serializers.ValidationError(
@@ -92,6 +220,58 @@ class SalesOrderSerializer(serializers.ModelSerializer):
 
         return attrs
 
+    def _price_items(self, items, customer, order_date):
+        """Give items without a unit price their price from the customer's price list."""
+        unpriced = [item for item in items if item.get('unit_price') is None]
+        prices = resolve_prices(
+            customer.price_list_id,
+            [(item['product'].pk, item['quantity'], item['product'].unit_price) for item in unpriced],
+            order_date,
+        )
+        for item, price in zip(unpriced, prices):
+            item['unit_price'] = price
+
+    def _allocate_items(self, items, policy):
+        """Replace items given no warehouse with one item per allocated warehouse."""
+        if all(item.get('warehouse') for item in items):
+            return items
+
+        products = {item['product'].pk: item['product'] for item in items}
+        allocator = Allocator(products)
+        open_items = []
+        for item in items:
+            if item.get('warehouse'):
+                allocator.hold(item['product'].pk, item['warehouse'].pk, item['quantity'])
+            else:
+                open_items.append(item)
+        try:
+            allocation = allocator.allocate(
+                [(item['product'].pk, item['quantity']) for item in open_items],
+                policy or None,
+                describe=lambda pk: products[pk].sku,
+            )
+        except AllocationError as exc:
+            raise serializers.ValidationError(str(exc))
+
+        warehouses = Warehouse.objects.in_bulk({warehouse_id for _, warehouse_id, _ in allocation})
+        pieces = {}
+        for index, warehouse_id, quantity in allocation:
+            pieces.setdefault(index, []).append({
+                **open_items[index],
+                'warehouse': warehouses[warehouse_id],
+                'quantity': quantity,
+                'auto_allocated': True,
+            })
+        # Keep the caller's line order, with split lines in place
+        result, open_index = [], 0
+        for item in items:
+            if item.get('warehouse'):
+                result.append(item)
+            else:
+                result.extend(pieces[open_index])
+                open_index += 1
+        return result
+
     @transaction.atomic
     def create(self, validated_data):
         """Create sales order with items and calculate total."""
@@ -113,13 +293,17 @@ class SalesOrderSerializer(serializers.ModelSerializer):
         sales_order.total_amount = total_amount
         sales_order.save()
 
+        if sales_order.status == 'confirmed':
+            self._reserve_stock(sales_order)
+            self._check_credit(sales_order)
         return sales_order
 
     @transaction.atomic
     def update(self, instance, validated_data):
         """Update sales order with items."""
         items_data = validated_data.pop('items', None)
-        
+        confirming = instance.status == 'draft' and validated_data.get('status') == 'confirmed'
+
         # Update order fields
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
@@ -138,8 +322,24 @@ class SalesOrderSerializer(serializers.ModelSerializer):
             instance.total_amount = total_amount
 
         instance.save()
+        if confirming:
+            self._reserve_stock(instance)
+        if confirming or (items_data is not None and instance.status in SalesOrder.OPEN_STATUSES):
+            self._check_credit(instance)
         return instance
 
+    def _reserve_stock(self, sales_order):
+        try:
+            sales_order.reserve_stock()
+        except ValueError as exc:
+            raise serializers.ValidationError(str(exc))
+
+    def _check_credit(self, sales_order):
+        try:
+            sales_order.customer.check_credit()
+        except ValueError as exc:
+            raise serializers.ValidationError(str(exc))
+
     def _generate_order_number(self):
         """Generate unique order number."""
         from datetime import datetime
@@ -156,6 +356,18 @@ class SalesOrderSerializer(serializers.ModelSerializer):
         return f'{prefix}-{timestamp}-{new_num:04d}'
 
 
+class BulkOrderIngestSerializer(serializers.Serializer):
+    """
+    Envelope of a bulk order ingestion request. Each order is validated by
+    ``sales.ingest`` so one bad order does not reject the batch.
+    """
+    orders = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=settings.BULK_ORDER_MAX_ORDERS,
+    )
+
+
 class SalesOrderFulfillmentSerializer(serializers.Serializer):
     """Serializer for order fulfillment action."""
     pass
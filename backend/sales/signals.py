@@ -0,0 +1,205 @@
+from django.db.models.signals import post_init, pre_save, post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from enterprisepro.events import publish
+from enterprisepro.lookups import bump_lookup_version
+from .models import Customer, PriceList, PriceListItem, SalesOrder, SalesOrderItem, adjust_exposure
+from .stats import add_line_stats, add_order_lines, add_order_stats, refresh_last_order_date
+
+ORDER_EVENT_ROLES = ('admin', 'manager', 'staff', 'viewer')
+
+
+@receiver([post_save, post_delete], sender=Customer)
+def invalidate_customer_lookup(sender, **kwargs):
+    """Drop cached customer lookup rows when a customer changes."""
+    bump_lookup_version(sender)
+
+
+@receiver([post_save, post_delete], sender=PriceList)
+@receiver([post_save, post_delete], sender=PriceListItem)
+def invalidate_price_lists(sender, **kwargs):
+    """Drop compiled price lists (see sales.pricing) when a list or list price changes."""
+    bump_lookup_version(PriceList)
+
+
+@receiver(post_init, sender=SalesOrder)
+def remember_order_status(sender, instance, **kwargs):
+    """Remember the status a sales order was loaded with."""
+    if instance.pk is None or 'status' in instance.get_deferred_fields():
+        instance._saved_status = None
+    else:
+        instance._saved_status = instance.status
+
+
+@receiver(post_init, sender=SalesOrder)
+def remember_open_amount(sender, instance, **kwargs):
+    """Remember what a loaded order adds to its customer's open orders."""
+    instance._saved_customer_id = instance.__dict__.get('customer_id')
+    if instance.pk is None:
+        instance._saved_open_amount = 0
+    elif {'status', 'total_amount'} & instance.get_deferred_fields():
+        instance._saved_open_amount = None
+    else:
+        instance._saved_open_amount = instance.open_amount
+
+
+@receiver(pre_save, sender=SalesOrder)
+def load_open_amount(sender, instance, **kwargs):
+    """Read the stored open amount of an order loaded without status or total."""
+    if instance._saved_open_amount is None:
+        stored = SalesOrder.objects.filter(pk=instance.pk).values_list('status', 'total_amount').first()
+        instance._saved_open_amount = stored[1] if stored and stored[0] in SalesOrder.OPEN_STATUSES else 0
+
+
+@receiver(post_save, sender=SalesOrder)
+def update_customer_open_orders(sender, instance, **kwargs):
+    """Keep the customer's open orders counter in step with the order, in the same transaction."""
+    amount, saved = instance.open_amount, instance._saved_open_amount
+    previous = instance._saved_customer_id
+    if previous is not None and previous != instance.customer_id:
+        # Moved to another customer: the old one no longer carries it
+        adjust_exposure(previous, orders=-saved)
+        saved = 0
+    adjust_exposure(instance.customer_id, orders=amount - saved)
+    instance._saved_open_amount = amount
+    instance._saved_customer_id = instance.customer_id
+
+
+@receiver(post_delete, sender=SalesOrder)
+def remove_deleted_open_order(sender, instance, **kwargs):
+    """Take a deleted order off its customer's open orders."""
+    adjust_exposure(instance.customer_id, orders=-(instance._saved_open_amount or 0))
+
+
+@receiver(post_init, sender=SalesOrder)
+def remember_booking(sender, instance, **kwargs):
+    """Remember how a loaded order counts in its customer's statistics."""
+    if instance.pk is None:
+        instance._saved_booking = (None, False, 0, None)
+    elif {'customer_id', 'status', 'total_amount', 'order_date'} & instance.get_deferred_fields():
+        instance._saved_booking = None
+    else:
+        instance._saved_booking = _booking(instance.customer_id, instance.status, instance.total_amount, instance.order_date)
+
+
+@receiver(pre_save, sender=SalesOrder)
+def load_booking(sender, instance, **kwargs):
+    """Read the stored booking of an order loaded with deferred fields."""
+    if instance._saved_booking is None:
+        instance._saved_booking = _stored_booking(instance.pk)
+
+
+@receiver(post_save, sender=SalesOrder)
+def update_customer_stats(sender, instance, **kwargs):
+    """Move the order into, out of or within its customer's statistics (see sales.stats)."""
+    customer_id, was_booked, total, order_date = instance._saved_booking
+    booking = _booking(instance.customer_id, instance.status, instance.total_amount, instance.order_date)
+    _, booked, new_total, new_date = booking
+    if was_booked and (not booked or customer_id != instance.customer_id):
+        add_order_stats([(customer_id, -1, -total, None)])
+        add_order_lines([instance.pk], -1, customer_id=customer_id)
+        refresh_last_order_date(customer_id)
+        was_booked = False
+    if booked and not was_booked:
+        add_order_stats([(instance.customer_id, 1, new_total, new_date)])
+        add_order_lines([instance.pk])
+    elif booked and (new_total != total or new_date != order_date):
+        add_order_stats([(instance.customer_id, 0, new_total - total, new_date)])
+        if new_date < order_date:
+            refresh_last_order_date(instance.customer_id)
+    instance._saved_booking = booking
+
+
+@receiver(pre_delete, sender=SalesOrder)
+def remove_deleted_order_lines(sender, instance, **kwargs):
+    """Take a booked order's lines off its customer's product statistics while they still exist."""
+    booking = instance._saved_booking or _stored_booking(instance.pk)
+    if booking[1]:
+        add_order_lines([instance.pk], -1, customer_id=booking[0])
+    instance._saved_booking = booking
+
+
+@receiver(post_delete, sender=SalesOrder)
+def remove_deleted_order_stats(sender, instance, **kwargs):
+    """Take a deleted booked order off its customer's statistics."""
+    customer_id, booked, total, _ = instance._saved_booking
+    if booked:
+        add_order_stats([(customer_id, -1, -total, None)])
+        refresh_last_order_date(customer_id)
+
+
+@receiver(post_save, sender=SalesOrderItem)
+def add_booked_line(sender, instance, created, **kwargs):
+    """Count a line added to a booked order, e.g. when its lines are replaced."""
+    booking = _order_booking(instance)
+    if created and booking is not None and booking[1]:
+        add_line_stats([(booking[0], instance.product_id, instance.quantity, instance.line_total)])
+
+
+@receiver(post_delete, sender=SalesOrderItem)
+def remove_booked_line(sender, instance, **kwargs):
+    """Take a line deleted from a booked order off the product statistics."""
+    booking = _order_booking(instance)
+    if booking is not None and booking[1]:
+        add_line_stats([(booking[0], instance.product_id, -instance.quantity, -instance.line_total)])
+
+
+def _booking(customer_id, status, total_amount, order_date):
+    """(customer id, booked?, total, order date) of an order."""
+    booked = status in SalesOrder.BOOKED_STATUSES
+    # Values assigned but not yet read back may still be strings
+    total_amount = SalesOrder._meta.get_field('total_amount').to_python(total_amount) if booked else 0
+    return (customer_id, booked, total_amount, SalesOrder._meta.get_field('order_date').to_python(order_date))
+
+
+def _stored_booking(pk):
+    stored = SalesOrder.objects.filter(pk=pk).values_list('customer_id', 'status', 'total_amount', 'order_date').first()
+    return _booking(*stored) if stored else (None, False, 0, None)
+
+
+def _order_booking(item):
+    """
+    The saved booking of the line's order when the line was created or
+    deleted through its order (``order.items``); lines deleted with their
+    order are handled by the order's receivers.
+    """
+    if not SalesOrderItem._meta.get_field('sales_order').is_cached(item):
+        return None
+    order = item.sales_order
+    if order._saved_booking is None:
+        order._saved_booking = _stored_booking(order.pk)
+    return order._saved_booking
+
+
+@receiver(post_save, sender=SalesOrder)
+def release_cancelled_order_stock(sender, instance, created, **kwargs):
+    """Give reserved stock back when an order is cancelled."""
+    if not created and instance.status == 'cancelled' and instance._saved_status != 'cancelled':
+        instance.release_reservations()
+
+
+@receiver(post_save, sender=SalesOrder)
+def publish_order_status_change(sender, instance, created, **kwargs):
+    """Push an event when a sales order moves to a new status."""
+    previous = instance._saved_status
+    instance._saved_status = instance.status
+    if created or previous is None or previous == instance.status:
+        return
+
+    publish(
+        'sales.order_status_changed',
+        {
+            'sales_order': instance.pk,
+            'order_number': instance.order_number,
+            'customer': instance.customer_id,
+            'from_status': previous,
+            'to_status': instance.status,
+        },
+        ORDER_EVENT_ROLES,
+        instance.company_id,
+    )
+
+
+@receiver(pre_delete, sender=SalesOrder)
+def release_deleted_order_stock(sender, instance, **kwargs):
+    """Give reserved stock back before a sales order and its reservations are deleted."""
+    instance.release_reservations()
@@ -0,0 +1,202 @@
+"""
+Per-customer lifetime statistics.
+
+``CustomerStats`` holds the count, revenue and last date of a customer's
+booked orders (``SalesOrder.BOOKED_STATUSES``) and ``CustomerProductStats``
+the quantity and revenue per product on them. The signals in
+``sales.signals`` add to them as orders enter or leave the booked statuses,
+as booked totals change and as lines of booked orders are created or
+deleted, so a customer summary reads a few rows however long the history.
+
+Every change is an ``INSERT ... ON CONFLICT DO UPDATE`` adding a delta, so
+concurrent orders of one customer never overwrite each other. Bulk writes
+that skip signals (``sales.ingest``) call ``add_order_stats`` and
+``add_order_lines`` themselves; anything else (admin edits of lines, raw
+SQL) is corrected by ``rebuild_customer_stats``. Archived orders
+(``archive.archiver``) keep counting: archiving moves them without
+touching the stats, and the rebuild reads the archive tables too.
+"""
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from archive.models import ArchivedSalesOrder, ArchivedSalesOrderItem
+from enterprisepro.tenancy import current_company_id
+from .models import Customer, CustomerProductStats, CustomerStats, SalesOrder, SalesOrderItem
+
+TOP_PRODUCTS = 5
+
+
+def add_order_stats(rows):
+    """
+    Add ``[(customer_id, orders, revenue, order_date), ...]`` to the
+    customers' stats; negative deltas with a ``None`` date take orders off.
+    """
+    if not rows:
+        return
+    customers, orders, revenue, dates = (list(column) for column in zip(*rows))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {CustomerStats._meta.db_table} AS stats
+                (customer_id, order_count, lifetime_revenue, last_order_date, updated_at)
+            SELECT customer_id, SUM(orders), SUM(revenue), MAX(order_date), %s
+            FROM unnest(%s::integer[], %s::integer[], %s::numeric[], %s::date[])
+                AS delta(customer_id, orders, revenue, order_date)
+            GROUP BY customer_id
+            ON CONFLICT (customer_id) DO UPDATE SET
+                order_count = stats.order_count + EXCLUDED.order_count,
+                lifetime_revenue = stats.lifetime_revenue + EXCLUDED.lifetime_revenue,
+                last_order_date = GREATEST(stats.last_order_date, EXCLUDED.last_order_date),
+                updated_at = EXCLUDED.updated_at
+            """,
+            [timezone.now(), customers, orders, revenue, dates],
+        )
+
+
+def add_line_stats(rows):
+    """Add ``[(customer_id, product_id, quantity, revenue), ...]`` to the customers' product stats."""
+    if not rows:
+        return
+    customers, products, quantities, revenue = (list(column) for column in zip(*rows))
+    _upsert_lines(
+        """
+        SELECT customer_id, product_id, SUM(quantity), SUM(revenue), %s
+        FROM unnest(%s::integer[], %s::integer[], %s::bigint[], %s::numeric[])
+            AS delta(customer_id, product_id, quantity, revenue)
+        GROUP BY customer_id, product_id
+        """,
+        [timezone.now(), customers, products, quantities, revenue],
+    )
+
+
+def add_order_lines(order_ids, sign=1, customer_id=None):
+    """
+    Add (``sign=-1``: take off) the current lines of ``order_ids`` to their
+    customer's product stats, or to ``customer_id``'s if given.
+    """
+    if not order_ids:
+        return
+    customer = '%s' if customer_id is not None else 'header.customer_id'
+    _upsert_lines(
+        f"""
+        SELECT {customer}, line.product_id, %s * SUM(line.quantity), %s * SUM(line.line_total), %s
+        FROM {SalesOrderItem._meta.db_table} line
+        JOIN {SalesOrder._meta.db_table} header ON header.id = line.sales_order_id
+        WHERE header.id = ANY(%s)
+        GROUP BY 1, 2
+        """,
+        ([customer_id] if customer_id is not None else []) + [sign, sign, timezone.now(), list(order_ids)],
+    )
+
+
+def _upsert_lines(select, params):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {CustomerProductStats._meta.db_table} AS stats
+                (customer_id, product_id, quantity, revenue, updated_at)
+            {select}
+            ON CONFLICT (customer_id, product_id) DO UPDATE SET
+                quantity = stats.quantity + EXCLUDED.quantity,
+                revenue = stats.revenue + EXCLUDED.revenue,
+                updated_at = EXCLUDED.updated_at
+            """,
+            params,
+        )
+
+
+def refresh_last_order_date(customer_id):
+    """Re-read a customer's last booked order date, e.g. after its latest order was cancelled."""
+    dates = [
+        model.objects.filter(customer_id=customer_id, status__in=SalesOrder.BOOKED_STATUSES)
+        .aggregate(last=Max('order_date'))['last']
+        for model in (SalesOrder, ArchivedSalesOrder)
+    ]
+    last = max(filter(None, dates), default=None)
+    CustomerStats.objects.filter(customer_id=customer_id).update(last_order_date=last)
+
+
+def customer_summary(customer, top=TOP_PRODUCTS):
+    """Lifetime figures, open amounts and top products of ``customer``."""
+    stats = CustomerStats.objects.filter(customer=customer).first() or CustomerStats(customer=customer)
+    top_products = list(
+        CustomerProductStats.objects.filter(customer=customer, revenue__gt=0)
+        .order_by('-revenue')
+        .values('product_id', 'product__sku', 'product__name', 'quantity', 'revenue')[:top]
+    )
+    return {
+        'customer': customer.pk,
+        'code': customer.code,
+        'name': customer.name,
+        'order_count': stats.order_count,
+        'lifetime_revenue': stats.lifetime_revenue,
+        'average_order_value': stats.average_order_value,
+        'last_order_date': stats.last_order_date,
+        'open_orders': customer.open_orders_amount,
+        'open_receivables': customer.open_receivables_amount,
+        'credit_limit': customer.credit_limit,
+        'available_credit': customer.available_credit,
+        'top_products': [
+            {
+                'product': row['product_id'],
+                'sku': row['product__sku'],
+                'name': row['product__name'],
+                'quantity': row['quantity'],
+                'revenue': row['revenue'],
+            }
+            for row in top_products
+        ],
+    }
+
+
+def rebuild_customer_stats():
+    """
+    Recompute the customer statistics of the current company (all companies
+    without one) from the order history, archived orders included.
+    """
+    booked = list(SalesOrder.BOOKED_STATUSES)
+    now = timezone.now()
+    company = current_company_id()
+    scope, scope_params = ('AND company_id = %s', [company]) if company is not None else ('', [])
+    headers = (
+        f'(SELECT id, customer_id, order_date, total_amount FROM {SalesOrder._meta.db_table}'
+        f' WHERE status = ANY(%s) {scope}'
+        f' UNION ALL SELECT id, customer_id, order_date, total_amount FROM {ArchivedSalesOrder._meta.db_table}'
+        f' WHERE status = ANY(%s) {scope})'
+    )
+    header_params = [booked] + scope_params + [booked] + scope_params
+    lines = (
+        f'(SELECT sales_order_id, product_id, quantity, line_total FROM {SalesOrderItem._meta.db_table}'
+        f' UNION ALL SELECT sales_order_id, product_id, quantity, line_total'
+        f' FROM {ArchivedSalesOrderItem._meta.db_table})'
+    )
+    owned = ''
+    if company is not None:
+        owned = f'WHERE customer_id IN (SELECT id FROM {Customer._meta.db_table} WHERE company_id = %s)'
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {CustomerProductStats._meta.db_table} {owned}', scope_params)
+        cursor.execute(f'DELETE FROM {CustomerStats._meta.db_table} {owned}', scope_params)
+        cursor.execute(
+            f"""
+            INSERT INTO {CustomerStats._meta.db_table}
+                (customer_id, order_count, lifetime_revenue, last_order_date, updated_at)
+            SELECT customer_id, COUNT(*), SUM(total_amount), MAX(order_date), %s
+            FROM {headers} header
+            GROUP BY customer_id
+            """,
+            [now] + header_params,
+        )
+        customers = cursor.rowcount
+        cursor.execute(
+            f"""
+            INSERT INTO {CustomerProductStats._meta.db_table}
+                (customer_id, product_id, quantity, revenue, updated_at)
+            SELECT header.customer_id, line.product_id, SUM(line.quantity), SUM(line.line_total), %s
+            FROM {lines} line
+            JOIN {headers} header ON header.id = line.sales_order_id
+            GROUP BY 1, 2
+            """,
+            [now] + header_params,
+        )
+        return {'customers': customers, 'customer_products': cursor.rowcount}
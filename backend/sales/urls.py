@@ -1,10 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CustomerViewSet, SalesOrderViewSet
+from .views import CustomerViewSet, PriceListItemViewSet, PriceListViewSet, SalesOrderViewSet
 
 router = DefaultRouter()
 router.register(r'customers', CustomerViewSet)
 router.register(r'orders', SalesOrderViewSet, basename='salesorder')
+router.register(r'price-lists', PriceListViewSet)
+router.register(r'price-list-items', PriceListItemViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
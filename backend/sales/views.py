@@ -1,36 +1,126 @@
+from collections import Counter
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.db import transaction
-from django.db.models import F
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from archive.models import ArchivedSalesOrder
+from archive.serializers import ArchivedSalesOrderSerializer
+from archive.views import ArchiveFallbackMixin
+from enterprisepro.db_router import ReplicaReadMixin
+from enterprisepro.lookups import LookupMixin
+from jobs.views import BackgroundJobMixin
+from sync.views import ChangeFeedMixin
 from inventory.models import InventoryItem
-from .models import Customer, SalesOrder, SalesOrderItem
+from .ingest import ingest_orders
+from .stats import TOP_PRODUCTS, customer_summary
+from .models import Customer, PriceList, PriceListItem, SalesOrder, SalesOrderItem
 from .serializers import (
+    BulkOrderIngestSerializer,
     CustomerSerializer,
+    CustomerSummarySerializer,
+    OrderPricingSerializer,
+    PriceListItemSerializer,
+    PriceListSerializer,
+    SalesOrderListSerializer,
     SalesOrderSerializer,
     SalesOrderFulfillmentSerializer
 )
 
 
-class CustomerViewSet(viewsets.ModelViewSet):
+class CustomerViewSet(LookupMixin, ChangeFeedMixin, viewsets.ModelViewSet):
     """ViewSet for Customer CRUD operations."""
     queryset = Customer.objects.filter(is_active=True)
     serializer_class = CustomerSerializer
-    search_fields = ['code', 'name', 'email']
+    search_vector_field = 'search_vector'
+    search_trigram_fields = ['code', 'name', 'email']
 
+    def get_change_feed_queryset(self):
+        # Deactivated customers are reported as deletions
+        return Customer.objects.all()
 
-class SalesOrderViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['get'])
+    def summary(self, request, pk=None):
+        """
+        Lifetime order count, revenue, average order value and last order
+        date, open orders and receivables, and the top products
+        (``?top=``, default 5, at most 20) of a customer. Read from the
+        statistics rows kept by ``sales.stats``, not the order history.
+        """
+        customer = self.get_object()
+        top = request.query_params.get('top', '')
+        top = min(int(top), 20) if top.isdigit() else TOP_PRODUCTS
+        serializer = CustomerSummarySerializer(customer_summary(customer, top=top))
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class PriceListViewSet(LookupMixin, viewsets.ModelViewSet):
+    """ViewSet for PriceList CRUD operations."""
+    queryset = PriceList.objects.annotate(item_count=Count('items'))
+    serializer_class = PriceListSerializer
+
+
+class PriceListItemViewSet(viewsets.ModelViewSet):
+    """ViewSet for the prices on price lists; ``?price_list=`` and ``?product=`` filter."""
+    queryset = PriceListItem.objects.select_related('product')
+    serializer_class = PriceListItemSerializer
+    filterset_fields = ['price_list', 'product']
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        for field in self.filterset_fields:
+            value = self.request.query_params.get(field)
+            if value and value.isdigit():
+                queryset = queryset.filter(**{f'{field}_id': value})
+        return queryset
+
+
+class SalesOrderViewSet(
+    ArchiveFallbackMixin, ReplicaReadMixin, ChangeFeedMixin, BackgroundJobMixin, viewsets.ModelViewSet
+):
     """ViewSet for SalesOrder CRUD operations with transaction handling."""
-    queryset = SalesOrder.objects.select_related('customer', 'created_by').prefetch_related('items__product', 'items__warehouse').all()
+    queryset = SalesOrder.objects.select_related('customer', 'created_by').all()
     serializer_class = SalesOrderSerializer
+    archive_queryset = ArchivedSalesOrder.objects.select_related('customer', 'created_by').prefetch_related(
+        'items__product', 'items__warehouse'
+    )
+    archive_serializer_class = ArchivedSalesOrderSerializer
     filterset_fields = ['status', 'customer', 'order_date']
-    search_fields = ['order_number', 'customer__name', 'customer__code']
+    search_vector_field = 'search_vector'
+    search_trigram_fields = ['order_number']
 
     def get_queryset(self):
         """Filter queryset based on user permissions."""
         queryset = super().get_queryset()
         # Add any role-based filtering here if needed
-        return queryset
+        customer = self.request.query_params.get('customer')
+        if customer and customer.isdigit():
+            queryset = queryset.filter(customer_id=customer)
+
+        # List pages only need header columns; line items are loaded for
+        # detail views, order actions, or when a list asks for ?expand=items
+        if self._is_slim_list():
+            item_count = (
+                SalesOrderItem.objects.filter(sales_order=OuterRef('pk'))
+                .order_by()
+                .values('sales_order')
+                .annotate(count=Count('*'))
+                .values('count')
+            )
+            return queryset.annotate(
+                item_count=Coalesce(Subquery(item_count, output_field=IntegerField()), 0)
+            )
+        return queryset.prefetch_related('items__product', 'items__warehouse')
+
+    def get_serializer_class(self):
+        if self._is_slim_list():
+            return SalesOrderListSerializer
+        return super().get_serializer_class()
+
+    def _is_slim_list(self):
+        expand = self.request.query_params.get('expand', '')
+        return self.action == 'list' and 'items' not in expand.split(',')
 
     @transaction.atomic
     @action(detail=True, methods=['post'], serializer_class=SalesOrderFulfillmentSerializer)
@@ -38,8 +128,10 @@ class SalesOrderViewSet(viewsets.ModelViewSet):
         """
         Fulfill a sales order: decrease inventory quantities atomically.
         This is a critical operation that must be transactional.
+        With ``Prefer: respond-async`` it runs as a background job (202).
         """
-        sales_order = self.get_object()
+        # Locked, so a concurrent fulfill waits here and then sees the new status
+        sales_order = SalesOrder.objects.select_for_update().get(pk=self.get_object().pk)
 
         if sales_order.status != 'confirmed':
             return Response(
@@ -47,39 +139,50 @@ class SalesOrderViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Decrease inventory for each order item
-        for item in sales_order.items.all():
-            try:
-                inventory = InventoryItem.objects.select_for_update().get(
-                    product=item.product,
-                    warehouse=item.warehouse
-                )
-                
-                if inventory.quantity < item.quantity:
-                    # Rollback transaction
-                    raise ValueError(
-                        f"Insufficient inventory for {item.product.sku} at {item.warehouse.code}. "
-                        f"Available: {inventory.quantity}, Required: {item.quantity}"
-                    )
-                
-                inventory.quantity = F('quantity') - item.quantity
-                inventory.save(update_fields=['quantity'])
-                
-            except InventoryItem.DoesNotExist:
-                raise ValueError(
-                    f"No inventory record found for {item.product.sku} at {item.warehouse.code}"
-                )
-
-        # Update order status
-        sales_order.status = 'fulfilled'
-        sales_order.save(update_fields=['status'])
+        if self.wants_background(request):
+            return self.enqueue_job(request, 'sales.fulfill_order', {'sales_order': sales_order.pk})
+
+        # Raises ValueError on missing stock, rolling the transaction back
+        sales_order.fulfill()
 
         serializer = self.get_serializer(sales_order)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @action(detail=False, methods=['post'], serializer_class=OrderPricingSerializer)
+    def price(self, request):
+        """
+        Price order lines for a customer and date as creating the order
+        would, without creating it.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(serializer.price(), status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'], serializer_class=BulkOrderIngestSerializer)
+    def bulk(self, request):
+        """
+        Ingest a batch of orders (see ``sales.ingest`` for the format).
+        Returns one outcome per order: created, duplicate (idempotency key
+        seen before) or error.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = ingest_orders(serializer.validated_data['orders'], request.user)
+        counts = Counter(result['status'] for result in results)
+        return Response({
+            'created': counts['created'],
+            'duplicates': counts['duplicate'],
+            'failed': counts['error'],
+            'results': results,
+        }, status=status.HTTP_200_OK)
+
     @action(detail=True, methods=['post'])
     def confirm(self, request, pk=None):
-        """Confirm a draft sales order - validates inventory availability."""
+        """
+        Confirm a draft sales order - reserves stock for every line item and
+        checks the customer's credit limit.
+        """
         sales_order = self.get_object()
 
         if sales_order.status != 'draft':
@@ -88,33 +191,45 @@ class SalesOrderViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Validate inventory availability before confirming
-        for item in sales_order.items.all():
-            try:
-                inventory = InventoryItem.objects.get(
-                    product=item.product,
-                    warehouse=item.warehouse
-                )
-                if inventory.quantity < item.quantity:
-                    return Response(
-                        {
-                            'error': f'Insufficient inventory for {item.product.sku} at {item.warehouse.code}. '
-                                    f'Available: {inventory.quantity}, Required: {item.quantity}'
-                        },
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-            except InventoryItem.DoesNotExist:
-                return Response(
-                    {
-                        'error': f'No inventory record found for {item.product.sku} at {item.warehouse.code}. '
-                                f'Please create an inventory record first.'
-                    },
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-        sales_order.status = 'confirmed'
-        sales_order.save(update_fields=['status'])
+        try:
+            with transaction.atomic():
+                # Locked and checked again, so a concurrent confirm waits here
+                # and then finds the order already confirmed
+                locked = SalesOrder.objects.select_for_update().get(pk=sales_order.pk)
+                if locked.status != 'draft':
+                    raise ValueError(f'Only draft orders can be confirmed. Current status: {locked.status}')
+                # Reload the prefetched items as of the lock
+                sales_order = self.get_object()
+                # Lines the engine allocated move to other warehouses if their stock ran short
+                if self._auto_allocation_is_short(sales_order):
+                    sales_order.reallocate()
+                    # Reload the prefetched items
+                    sales_order = self.get_object()
+                # Raises ValueError on missing stock, rolling the transaction back
+                sales_order.reserve_stock()
+                sales_order.status = 'confirmed'
+                sales_order.save(update_fields=['status', 'updated_at'])
+                # The save added the order to the customer's exposure
+                sales_order.customer.check_credit()
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
         serializer = self.get_serializer(sales_order)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    def _auto_allocation_is_short(self, sales_order):
+        """Whether any auto-allocated line asks for more than its warehouse has available."""
+        requested = Counter()
+        for item in sales_order.items.all():
+            if item.auto_allocated:
+                requested[item.product_id, item.warehouse_id] += item.quantity
+        if not requested:
+            return False
+        stock = {
+            (product_id, warehouse_id): quantity
+            for product_id, warehouse_id, quantity in InventoryItem.objects.filter(
+                product_id__in={product_id for product_id, _ in requested},
+                warehouse_id__in={warehouse_id for _, warehouse_id in requested},
+            ).values_list('product_id', 'warehouse_id', F('quantity') - F('reserved'))
+        }
+        return any(stock.get(key, 0) < quantity for key, quantity in requested.items())
@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import Tombstone
+
+
+@admin.register(Tombstone)
+class TombstoneAdmin(admin.ModelAdmin):
+    list_display = ('model_label', 'object_id', 'deleted_at')
+    list_filter = ('model_label',)
+    readonly_fields = ('deleted_at',)
@@ -0,0 +1,242 @@
+"""
+Columnar snapshot extracts for BI.
+
+Each table in ``EXTRACTS`` is written as a Parquet (or Arrow IPC) dataset
+under ``<root>/<table>/``, Hive-partitioned by the month of its business
+date (``month=2024-01/``). Rows are streamed from a server-side cursor and
+written in record batches, so memory stays flat however large the table.
+
+Extracts are incremental: ``<root>/_watermarks.json`` keeps, per table, the
+time up to which rows were exported, and the next run only reads rows whose
+watermark column (``updated_at``, or ``created_at`` for the append-only
+ledger) is newer. Rows younger than ``SYNC_SETTLE_SECONDS`` wait for the
+next run, as in the change feeds, so a slow commit is never skipped. A
+full run (the first one, or ``full=True``) replaces the table's files.
+
+Changed rows are appended again, so readers keep the latest ``updated_at``
+per ``id``. Order lines are exported with all the lines of every changed
+order (their ``sales_order_updated_at``), replacing that order's earlier
+lines. Hard deletes of orders, invoices and inventory items go to
+``<table>_deleted`` (``id``, ``deleted_at``).
+"""
+import json
+import os
+import shutil
+from datetime import timedelta
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from enterprisepro.tenancy import current_company_id
+from finance.models import GeneralLedger, Invoice
+from inventory.models import InventoryItem
+from sales.models import SalesOrder, SalesOrderItem
+from .models import Tombstone
+
+# Dataset format -> file extension
+FORMATS = {'parquet': 'parquet', 'ipc': 'arrow'}
+STATE_FILE = '_watermarks.json'
+PARTITION_COLUMN = 'month'
+
+# Table -> (model, watermark lookup, month partition lookup, exported lookups)
+EXTRACTS = {
+    'sales_orders': (
+        SalesOrder, 'updated_at', 'order_date',
+        ['id', 'company_id', 'order_number', 'customer_id', 'customer__code', 'order_date', 'status',
+         'total_amount', 'allocation_policy', 'created_by_id', 'created_at', 'updated_at'],
+    ),
+    'sales_order_items': (
+        SalesOrderItem, 'sales_order__updated_at', 'sales_order__order_date',
+        ['id', 'sales_order__company_id', 'sales_order_id', 'product_id', 'product__sku', 'warehouse_id',
+         'quantity', 'unit_price', 'line_total', 'cost_amount', 'auto_allocated', 'created_at',
+         'sales_order__updated_at'],
+    ),
+    'invoices': (
+        Invoice, 'updated_at', 'invoice_date',
+        ['id', 'company_id', 'invoice_number', 'sales_order_id', 'sales_order__customer_id', 'invoice_date',
+         'due_date', 'status', 'total_amount', 'tax_amount', 'amount_paid', 'created_at', 'updated_at'],
+    ),
+    'general_ledger': (
+        GeneralLedger, 'created_at', 'transaction_date',
+        ['id', 'company_id', 'account_id', 'account__code', 'transaction_type', 'amount', 'description',
+         'transaction_date', 'invoice_id', 'sales_order_id', 'payment_id', 'created_at'],
+    ),
+    'inventory_items': (
+        InventoryItem, 'updated_at', None,
+        ['id', 'company_id', 'product_id', 'product__sku', 'warehouse_id', 'warehouse__code', 'quantity',
+         'reserved', 'minimum_stock_level', 'reorder_quantity', 'stock_value', 'abc_class', 'xyz_class',
+         'created_at', 'updated_at'],
+    ),
+}
+
+
+def export_snapshots(root, tables=None, file_format='parquet', full=False, batch_size=50000, log=None):
+    """Extract ``tables`` (default all) under ``root``; return a summary per table."""
+    os.makedirs(root, exist_ok=True)
+    state = _read_state(root)
+    upper = timezone.now() - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+    results = {}
+    for table in tables or EXTRACTS:
+        previous = state.get(table)
+        lower = None
+        if not full and previous is not None and previous['format'] == file_format:
+            lower = parse_datetime(previous['watermark'])
+        results[table] = _export_table(root, table, file_format, lower, upper, batch_size)
+        # Saved per table, so a failed run keeps the tables already done
+        state[table] = {'watermark': upper.isoformat(), 'format': file_format, 'rows': results[table]['rows']}
+        _write_state(root, state)
+        if log is not None:
+            log(table, results[table])
+    return results
+
+
+def _export_table(root, table, file_format, lower, upper, batch_size):
+    model, watermark, partition, lookups = EXTRACTS[table]
+    queryset = model.objects.filter(**{f'{watermark}__lte': upper})
+    company = current_company_id()
+    if company is not None:
+        # Order lines are not scoped by their manager, so filter on the exported company column
+        company_lookup = next(lookup for lookup in lookups if lookup.endswith('company_id'))
+        queryset = queryset.filter(**{company_lookup: company})
+    if lower is not None:
+        queryset = queryset.filter(**{f'{watermark}__gt': lower})
+
+    names = [lookup.replace('__', '_') for lookup in lookups]
+    types = [_arrow_type(model, lookup) for lookup in lookups]
+    fields = [pa.field(name, arrow_type) for name, arrow_type in zip(names, types)]
+    if partition is not None:
+        fields.append(pa.field(PARTITION_COLUMN, pa.string()))
+        lookups = lookups + [partition]
+    schema = pa.schema(fields)
+
+    # Written beside the dataset, then moved in, so readers never see half a run
+    run = upper.strftime('%Y%m%dT%H%M%S')
+    staging = os.path.join(root, f'.{table}-{run}')
+    shutil.rmtree(staging, ignore_errors=True)
+    counter = {'rows': 0}
+    with transaction.atomic():
+        rows = queryset.order_by().values_list(*lookups).iterator(chunk_size=batch_size)
+        _write(_batches(rows, schema, partition is not None, batch_size, counter), schema, staging,
+               file_format, run, partition is not None, batch_size)
+        deleted = _export_deleted(root, table, model, file_format, lower, upper, run)
+    _publish(staging, os.path.join(root, table), replace=lower is None)
+    return {'full': lower is None, 'rows': counter['rows'], 'deleted': deleted}
+
+
+def _batches(rows, schema, partitioned, batch_size, counter):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == batch_size:
+            yield _record_batch(chunk, schema, partitioned)
+            counter['rows'] += len(chunk)
+            chunk = []
+    if chunk:
+        yield _record_batch(chunk, schema, partitioned)
+        counter['rows'] += len(chunk)
+
+
+def _record_batch(chunk, schema, partitioned):
+    columns = list(zip(*chunk))
+    if partitioned:
+        columns[-1] = [f'{day:%Y-%m}' for day in columns[-1]]
+    return pa.RecordBatch.from_arrays(
+        [pa.array(column, type=field.type) for column, field in zip(columns, schema)], schema=schema
+    )
+
+
+def _write(batches, schema, base_dir, file_format, run, partitioned, batch_size):
+    partitioning = None
+    if partitioned:
+        partitioning = ds.partitioning(pa.schema([schema.field(PARTITION_COLUMN)]), flavor='hive')
+    ds.write_dataset(
+        batches,
+        base_dir,
+        schema=schema,
+        format=file_format,
+        partitioning=partitioning,
+        basename_template=f'part-{run}-{{i}}.{FORMATS[file_format]}',
+        max_rows_per_group=batch_size,
+        existing_data_behavior='overwrite_or_ignore',
+    )
+
+
+def _export_deleted(root, table, model, file_format, lower, upper, run):
+    """Write the table's tombstones in the window to ``<table>_deleted``."""
+    if lower is None:
+        # A full extract only holds live rows
+        shutil.rmtree(os.path.join(root, f'{table}_deleted'), ignore_errors=True)
+        return 0
+    tombstones = list(
+        Tombstone.objects.filter(
+            model_label=model._meta.label_lower, deleted_at__gt=lower, deleted_at__lte=upper
+        ).values_list('object_id', 'deleted_at')
+    )
+    if not tombstones:
+        return 0
+    schema = pa.schema([('id', pa.int64()), ('deleted_at', pa.timestamp('us', tz='UTC'))])
+    staging = os.path.join(root, f'.{table}_deleted-{run}')
+    _write([_record_batch(tombstones, schema, False)], schema, staging, file_format, run, False, len(tombstones))
+    _publish(staging, os.path.join(root, f'{table}_deleted'), replace=False)
+    return len(tombstones)
+
+
+def _publish(staging, target, replace):
+    """Move a staged run into ``target``, replacing its files on a full run."""
+    if replace:
+        shutil.rmtree(target, ignore_errors=True)
+    if not os.path.isdir(staging):
+        if replace:
+            os.makedirs(target)
+        return
+    if replace:
+        os.replace(staging, target)
+        return
+    for directory, _, files in os.walk(staging):
+        destination = os.path.join(target, os.path.relpath(directory, staging))
+        os.makedirs(destination, exist_ok=True)
+        for name in files:
+            os.replace(os.path.join(directory, name), os.path.join(destination, name))
+    shutil.rmtree(staging)
+
+
+def _arrow_type(model, lookup):
+    """The Arrow type of a (possibly related, ``__``-separated) model field."""
+    *path, name = lookup.split('__')
+    for part in path:
+        model = model._meta.get_field(part).related_model
+    field = model._meta.get_field(name)
+    if isinstance(field, models.ForeignKey):
+        field = field.target_field
+    if isinstance(field, models.DecimalField):
+        return pa.decimal128(field.max_digits, field.decimal_places)
+    if isinstance(field, models.DateTimeField):
+        return pa.timestamp('us', tz='UTC')
+    if isinstance(field, models.DateField):
+        return pa.date32()
+    if isinstance(field, models.BooleanField):
+        return pa.bool_()
+    if isinstance(field, models.FloatField):
+        return pa.float64()
+    if isinstance(field, models.IntegerField):
+        return pa.int64()
+    return pa.string()
+
+
+def _read_state(root):
+    try:
+        with open(os.path.join(root, STATE_FILE)) as state_file:
+            return json.load(state_file)
+    except FileNotFoundError:
+        return {}
+
+
+def _write_state(root, state):
+    path = os.path.join(root, STATE_FILE)
+    with open(f'{path}.tmp', 'w') as state_file:
+        json.dump(state, state_file, indent=2)
+    os.replace(f'{path}.tmp', path)
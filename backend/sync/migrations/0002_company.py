@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_companies'),
+        ('sync', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='tombstone',
+            name='tombstone_feed_idx',
+        ),
+        migrations.AddField(
+            model_name='tombstone',
+            name='company',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.company'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['company', 'model_label', 'deleted_at', 'id'], name='tombstone_feed_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+from django.db import models
+from enterprisepro.tenancy import TenantManager
+
+
+class Tombstone(models.Model):
+    """Record of a hard-deleted row, served by the change feeds."""
+    company = models.ForeignKey(
+        'accounts.Company', on_delete=models.PROTECT, null=True, blank=True, related_name='+', editable=False,
+    )
+    model_label = models.CharField(max_length=100)  # e.g., 'inventory.product'
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    objects = TenantManager()
+    tenant_lookup = 'company'
+
+    class Meta:
+        ordering = ['deleted_at', 'id']
+        indexes = [
+            models.Index(fields=['company', 'model_label', 'deleted_at', 'id'], name='tombstone_feed_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model_label} #{self.object_id} deleted {self.deleted_at}"
@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete
+from finance.models import Invoice
+from inventory.models import InventoryItem, Product, Warehouse
+from sales.models import Customer, SalesOrder
+from .models import Tombstone
+
+SYNCED_MODELS = [Product, Warehouse, InventoryItem, Customer, SalesOrder, Invoice]
+
+
+def record_tombstone(sender, instance, **kwargs):
+    """Keep a tombstone for deleted rows so change feeds can report them."""
+    Tombstone.objects.create(
+        company_id=instance.company_id, model_label=sender._meta.label_lower, object_id=instance.pk
+    )
+
+
+for model in SYNCED_MODELS:
+    post_delete.connect(record_tombstone, sender=model, dispatch_uid=f'tombstone-{model._meta.label_lower}')
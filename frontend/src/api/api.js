@@ -60,16 +60,27 @@ api.interceptors.response.use(
 export default api
 
 // API endpoints
+
+// Long operations answer 202 with a job id when sent this header
+const RESPOND_ASYNC = { Prefer: 'respond-async' }
+
 export const productsAPI = {
   list: (params) => api.get('/api/v1/inventory/products/', { params }),
+  lookup: (params) => api.get('/api/v1/inventory/products/lookup/', { params }),
   get: (id) => api.get(`/api/v1/inventory/products/${id}/`),
   create: (data) => api.post('/api/v1/inventory/products/', data),
   update: (id, data) => api.put(`/api/v1/inventory/products/${id}/`, data),
   delete: (id) => api.delete(`/api/v1/inventory/products/${id}/`),
+  importCSV: (file, { background = false } = {}) => {
+    const form = new FormData()
+    form.append('file', file)
+    return api.post('/api/v1/inventory/products/import/', form, { headers: background ? RESPOND_ASYNC : {} })
+  },
 }
 
 export const warehousesAPI = {
   list: (params) => api.get('/api/v1/inventory/warehouses/', { params }),
+  lookup: (params) => api.get('/api/v1/inventory/warehouses/lookup/', { params }),
   get: (id) => api.get(`/api/v1/inventory/warehouses/${id}/`),
   create: (data) => api.post('/api/v1/inventory/warehouses/', data),
   update: (id, data) => api.put(`/api/v1/inventory/warehouses/${id}/`, data),
@@ -78,7 +89,10 @@ export const warehousesAPI = {
 
 export const customersAPI = {
   list: (params) => api.get('/api/v1/sales/customers/', { params }),
+  lookup: (params) => api.get('/api/v1/sales/customers/lookup/', { params }),
   get: (id) => api.get(`/api/v1/sales/customers/${id}/`),
+  // Lifetime stats, open amounts and top products; params: { top }
+  summary: (id, params) => api.get(`/api/v1/sales/customers/${id}/summary/`, { params }),
   create: (data) => api.post('/api/v1/sales/customers/', data),
   update: (id, data) => api.put(`/api/v1/sales/customers/${id}/`, data),
   delete: (id) => api.delete(`/api/v1/sales/customers/${id}/`),
@@ -88,9 +102,13 @@ export const salesOrdersAPI = {
   list: (params) => api.get('/api/v1/sales/orders/', { params }),
   get: (id) => api.get(`/api/v1/sales/orders/${id}/`),
   create: (data) => api.post('/api/v1/sales/orders/', data),
+  bulkCreate: (orders) => api.post('/api/v1/sales/orders/bulk/', { orders }),
+  // Price lines from the customer's price list without creating an order
+  price: (data) => api.post('/api/v1/sales/orders/price/', data),
   update: (id, data) => api.put(`/api/v1/sales/orders/${id}/`, data),
   confirm: (id) => api.post(`/api/v1/sales/orders/${id}/confirm/`),
-  fulfill: (id) => api.post(`/api/v1/sales/orders/${id}/fulfill/`),
+  fulfill: (id, { background = false } = {}) =>
+    api.post(`/api/v1/sales/orders/${id}/fulfill/`, null, { headers: background ? RESPOND_ASYNC : {} }),
   cancel: (id, data) => api.patch(`/api/v1/sales/orders/${id}/`, data),
 }
 
@@ -104,6 +122,12 @@ export const inventoryAPI = {
   create: (data) => api.post('/api/v1/inventory/inventory-items/', data),
   update: (id, data) => api.put(`/api/v1/inventory/inventory-items/${id}/`, data),
   delete: (id) => api.delete(`/api/v1/inventory/inventory-items/${id}/`),
+  receive: (id, data) => api.post(`/api/v1/inventory/inventory-items/${id}/receive/`, data),
+  valuation: (params) => api.get('/api/v1/inventory/inventory-items/valuation/', { params }),
+  classify: (data, { background = false } = {}) =>
+    api.post('/api/v1/inventory/inventory-items/classify/', data, { headers: background ? RESPOND_ASYNC : {} }),
+  forecast: (data, { background = false } = {}) =>
+    api.post('/api/v1/inventory/inventory-items/forecast/', data, { headers: background ? RESPOND_ASYNC : {} }),
 }
 
 export const usersAPI = {
@@ -114,18 +138,46 @@ export const usersAPI = {
   delete: (id) => api.delete(`/api/v1/auth/users/${id}/`),
   activate: (id) => api.post(`/api/v1/auth/users/${id}/activate/`),
   deactivate: (id) => api.post(`/api/v1/auth/users/${id}/deactivate/`),
+  adminSummary: () => api.get('/api/v1/auth/admin-summary/'),
 }
 
 export const invoicesAPI = {
   list: (params) => api.get('/api/v1/finance/invoices/', { params }),
   get: (id) => api.get(`/api/v1/finance/invoices/${id}/`),
-  create: (data) => api.post('/api/v1/finance/invoices/', data),
+  create: (data, { background = false } = {}) =>
+    api.post('/api/v1/finance/invoices/', data, { headers: background ? RESPOND_ASYNC : {} }),
   update: (id, data) => api.put(`/api/v1/finance/invoices/${id}/`, data),
   delete: (id) => api.delete(`/api/v1/finance/invoices/${id}/`),
+  // params: { as_of, customer }; agingInvoices also takes bucket
+  aging: (params) => api.get('/api/v1/finance/invoices/aging/', { params }),
+  agingInvoices: (params) => api.get('/api/v1/finance/invoices/aging/invoices/', { params }),
+  // data: { amount, payment_date, method, reference }
+  pay: (id, data) => api.post(`/api/v1/finance/invoices/${id}/pay/`, data),
+}
+
+export const paymentsAPI = {
+  list: (params) => api.get('/api/v1/finance/payments/', { params }),
+  get: (id) => api.get(`/api/v1/finance/payments/${id}/`),
+}
+
+export const bankStatementsAPI = {
+  list: (params) => api.get('/api/v1/finance/bank-statements/', { params }),
+  get: (id) => api.get(`/api/v1/finance/bank-statements/${id}/`),
+  importCSV: (file, { reference = '', background = false } = {}) => {
+    const form = new FormData()
+    form.append('file', file)
+    form.append('reference', reference)
+    return api.post('/api/v1/finance/bank-statements/', form, { headers: background ? RESPOND_ASYNC : {} })
+  },
+  // params: { status: 'review', statement }
+  lines: (params) => api.get('/api/v1/finance/bank-statement-lines/', { params }),
+  matchLine: (id, invoice) => api.post(`/api/v1/finance/bank-statement-lines/${id}/match/`, { invoice }),
+  ignoreLine: (id) => api.post(`/api/v1/finance/bank-statement-lines/${id}/ignore/`),
 }
 
 export const accountsAPI = {
   list: (params) => api.get('/api/v1/finance/accounts/', { params }),
+  lookup: (params) => api.get('/api/v1/finance/accounts/lookup/', { params }),
   get: (id) => api.get(`/api/v1/finance/accounts/${id}/`),
   create: (data) => api.post('/api/v1/finance/accounts/', data),
   update: (id, data) => api.put(`/api/v1/finance/accounts/${id}/`, data),
@@ -138,7 +190,7 @@ export const ledgerAPI = {
 }
 
 export const financeDashboardAPI = {
-  getKPIs: () => api.get('/api/v1/finance/dashboard/kpis/'),
+  getKPIs: () => api.get('/api/v1/finance/dashboard/kpis/async/'),
 }
 
 export const auditLogsAPI = {
@@ -146,3 +198,30 @@ export const auditLogsAPI = {
   get: (id) => api.get(`/api/v1/audit/logs/${id}/`),
 }
 
+export const batchAPI = {
+  run: (operations) => api.post('/api/v1/batch/', { operations }),
+}
+
+export const eventsAPI = {
+  // EventSource cannot send an Authorization header, so the token goes in the query string
+  streamURL: (topics) => {
+    const params = new URLSearchParams({ access_token: localStorage.getItem('access_token') || '' })
+    if (topics) params.set('topics', topics)
+    return `${API_BASE_URL}/api/v1/events/stream/?${params}`
+  },
+}
+
+export const jobsAPI = {
+  list: (params) => api.get('/api/v1/jobs/', { params }),
+  get: (id) => api.get(`/api/v1/jobs/${id}/`),
+  cancel: (id) => api.post(`/api/v1/jobs/${id}/cancel/`),
+  // Poll until the job succeeds (resolves with the job) or fails (rejects with it)
+  wait: async (id, intervalMs = 1000) => {
+    for (;;) {
+      const { data: job } = await api.get(`/api/v1/jobs/${id}/`)
+      if (job.status === 'succeeded') return job
+      if (['failed', 'cancelled'].includes(job.status)) throw job
+      await new Promise((resolve) => setTimeout(resolve, intervalMs))
+    }
+  },
+}
@@ -120,6 +120,11 @@ export default function Layout() {
               <Typography variant="body2" sx={{ fontWeight: 500 }}>
                 {user?.username}
               </Typography>
+              {user?.company_name && (
+                <Typography variant="caption" sx={{ opacity: 0.8 }}>
+                  {user.company_name}
+                </Typography>
+              )}
             </Box>
           </Box>
         </Toolbar>
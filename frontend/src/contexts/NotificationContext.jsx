@@ -1,5 +1,34 @@
 import { createContext, useContext, useState, useEffect, useCallback } from 'react'
-import { inventoryAPI, invoicesAPI, salesOrdersAPI } from '../api/api'
+import { eventsAPI, inventoryAPI, invoicesAPI, salesOrdersAPI } from '../api/api'
+
+const STATUS_EVENT_TYPES = {
+  'sales.order_status_changed': { type: 'info', title: 'Order Status Changed', path: '/sales-orders' },
+  'finance.invoice_status_changed': { type: 'info', title: 'Invoice Status Changed', path: '/finance/invoices' },
+}
+
+const eventToNotification = (eventType, { data, timestamp }) => {
+  if (eventType === 'inventory.low_stock' || eventType === 'inventory.restocked') {
+    const low = eventType === 'inventory.low_stock'
+    return {
+      type: low ? 'warning' : 'success',
+      title: low ? 'Low Stock Alert' : 'Stock Replenished',
+      message: `${data.product_sku} at ${data.warehouse_code}: ${data.quantity} on hand (minimum ${data.minimum_stock_level})`,
+      timestamp: new Date(timestamp),
+      action: { label: 'View Items', path: '/inventory/items' },
+    }
+  }
+  const config = STATUS_EVENT_TYPES[eventType]
+  const number = data.order_number || data.invoice_number
+  return {
+    type: config.type,
+    title: config.title,
+    message: `${number}: ${data.from_status} → ${data.to_status}`,
+    timestamp: new Date(timestamp),
+    action: { label: 'View', path: config.path },
+  }
+}
+
+const PUSH_EVENT_TYPES = ['inventory.low_stock', 'inventory.restocked', ...Object.keys(STATUS_EVENT_TYPES)]
 
 const NotificationContext = createContext(null)
 
@@ -109,10 +138,8 @@ export const NotificationProvider = ({ children }) => {
   }, [])
 
   useEffect(() => {
+    // Initial snapshot; later changes are pushed over the event stream
     fetchNotifications()
-    // Refresh notifications every 5 minutes
-    const interval = setInterval(fetchNotifications, 5 * 60 * 1000)
-    return () => clearInterval(interval)
   }, [fetchNotifications])
 
   const markAsRead = (id) => {
@@ -138,6 +165,33 @@ export const NotificationProvider = ({ children }) => {
     setUnreadCount((prev) => prev + 1)
   }
 
+  useEffect(() => {
+    let source
+    let retryTimer
+
+    const connect = () => {
+      if (!localStorage.getItem('access_token')) return
+      // Rebuilt on every (re)connect so a refreshed access token is used
+      source = new EventSource(eventsAPI.streamURL())
+      PUSH_EVENT_TYPES.forEach((eventType) => {
+        source.addEventListener(eventType, (message) => {
+          addNotification(eventToNotification(eventType, JSON.parse(message.data)))
+        })
+      })
+      source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED) {
+          retryTimer = setTimeout(connect, 5000)
+        }
+      }
+    }
+
+    connect()
+    return () => {
+      clearTimeout(retryTimer)
+      source?.close()
+    }
+  }, [])
+
   const removeNotification = (id) => {
     setNotifications((prev) => {
       const notif = prev.find((n) => n.id === id)
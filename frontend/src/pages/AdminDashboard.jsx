@@ -19,7 +19,7 @@ import {
   TrendingUp as TrendingUpIcon,
   Security as SecurityIcon,
 } from '@mui/icons-material'
-import { usersAPI, salesOrdersAPI, productsAPI, customersAPI } from '../api/api'
+import { usersAPI } from '../api/api'
 
 export default function AdminDashboard() {
   const navigate = useNavigate()
@@ -41,25 +41,15 @@ export default function AdminDashboard() {
   const fetchStats = async () => {
     try {
       setLoading(true)
-      const [usersRes, ordersRes, productsRes, customersRes] = await Promise.all([
-        usersAPI.list().catch(() => ({ data: { results: [] } })),
-        salesOrdersAPI.list().catch(() => ({ data: { results: [] } })),
-        productsAPI.list().catch(() => ({ data: { results: [] } })),
-        customersAPI.list().catch(() => ({ data: { results: [] } })),
-      ])
-
-      const users = usersRes.data.results || usersRes.data || []
-      const orders = ordersRes.data.results || ordersRes.data || []
-      const products = productsRes.data.results || productsRes.data || []
-      const customers = customersRes.data.results || customersRes.data || []
+      const { data } = await usersAPI.adminSummary()
 
       setStats({
-        totalUsers: users.length,
-        activeUsers: users.filter((u) => u.is_active).length,
-        totalOrders: orders.length,
-        totalProducts: products.length,
-        totalCustomers: customers.length,
-        adminUsers: users.filter((u) => u.role === 'admin').length,
+        totalUsers: data.total_users,
+        activeUsers: data.active_users,
+        totalOrders: data.total_orders,
+        totalProducts: data.total_products,
+        totalCustomers: data.total_customers,
+        adminUsers: data.admin_users,
       })
     } catch (err) {
       setError('Failed to load dashboard statistics')
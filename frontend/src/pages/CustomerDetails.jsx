@@ -36,6 +36,7 @@ export default function CustomerDetails() {
   const navigate = useNavigate()
   const { id } = useParams()
   const [customer, setCustomer] = useState(null)
+  const [summary, setSummary] = useState(null)
   const [orders, setOrders] = useState([])
   const [loading, setLoading] = useState(true)
   const [ordersLoading, setOrdersLoading] = useState(true)
@@ -43,6 +44,7 @@ export default function CustomerDetails() {
 
   useEffect(() => {
     fetchCustomer()
+    fetchSummary()
     fetchOrders()
   }, [id])
 
@@ -60,6 +62,15 @@ export default function CustomerDetails() {
     }
   }
 
+  const fetchSummary = async () => {
+    try {
+      const response = await customersAPI.summary(id)
+      setSummary(response.data)
+    } catch (err) {
+      console.error('Error fetching customer summary:', err)
+    }
+  }
+
   const fetchOrders = async () => {
     setOrdersLoading(true)
     try {
@@ -227,6 +238,65 @@ export default function CustomerDetails() {
         </Grid>
       </Paper>
 
+      {summary && (
+        <Paper
+          sx={{
+            p: 3,
+            mb: 3,
+            borderRadius: 3,
+            boxShadow: '0 4px 6px -1px rgb(0 0 0 / 0.1), 0 2px 4px -2px rgb(0 0 0 / 0.1)',
+          }}
+        >
+          <Typography variant="h6" fontWeight="bold" mb={2}>
+            Summary
+          </Typography>
+          <Grid container spacing={3}>
+            {[
+              ['Lifetime Revenue', `$${parseFloat(summary.lifetime_revenue).toFixed(2)}`],
+              ['Orders', summary.order_count],
+              ['Average Order Value', `$${parseFloat(summary.average_order_value).toFixed(2)}`],
+              [
+                'Last Order',
+                summary.last_order_date ? new Date(summary.last_order_date).toLocaleDateString() : '-',
+              ],
+              ['Open Orders', `$${parseFloat(summary.open_orders).toFixed(2)}`],
+              ['Open Receivables', `$${parseFloat(summary.open_receivables).toFixed(2)}`],
+            ].map(([label, value]) => (
+              <Grid item xs={6} md={4} key={label}>
+                <Typography variant="subtitle2" color="text.secondary">
+                  {label}
+                </Typography>
+                <Typography variant="h6">{value}</Typography>
+              </Grid>
+            ))}
+          </Grid>
+          {summary.top_products.length > 0 && (
+            <TableContainer sx={{ mt: 2 }}>
+              <Table size="small">
+                <TableHead>
+                  <TableRow>
+                    <TableCell>Top Products</TableCell>
+                    <TableCell align="right">Quantity</TableCell>
+                    <TableCell align="right">Revenue</TableCell>
+                  </TableRow>
+                </TableHead>
+                <TableBody>
+                  {summary.top_products.map((product) => (
+                    <TableRow key={product.product}>
+                      <TableCell>
+                        {product.sku} - {product.name}
+                      </TableCell>
+                      <TableCell align="right">{product.quantity}</TableCell>
+                      <TableCell align="right">${parseFloat(product.revenue).toFixed(2)}</TableCell>
+                    </TableRow>
+                  ))}
+                </TableBody>
+              </Table>
+            </TableContainer>
+          )}
+        </Paper>
+      )}
+
       <Paper
         sx={{
           p: 3,
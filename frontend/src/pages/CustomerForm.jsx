@@ -31,6 +31,7 @@ export default function CustomerForm() {
     email: '',
     phone: '',
     address: '',
+    credit_limit: '',
     is_active: true,
   })
 
@@ -52,6 +53,7 @@ export default function CustomerForm() {
         email: customer.email || '',
         phone: customer.phone || '',
         address: customer.address || '',
+        credit_limit: customer.credit_limit ?? '',
         is_active: customer.is_active !== undefined ? customer.is_active : true,
       })
     } catch (err) {
@@ -92,13 +94,15 @@ export default function CustomerForm() {
     }
 
     setSubmitting(true)
+    // An empty credit limit means no limit
+    const payload = { ...formData, credit_limit: formData.credit_limit === '' ? null : formData.credit_limit }
 
     try {
       if (isEdit) {
-        await customersAPI.update(id, formData)
+        await customersAPI.update(id, payload)
         setSuccess('Customer updated successfully!')
       } else {
-        await customersAPI.create(formData)
+        await customersAPI.create(payload)
         setSuccess('Customer created successfully!')
       }
 
@@ -111,6 +115,7 @@ export default function CustomerForm() {
         err.response?.data?.code?.[0] ||
         err.response?.data?.name?.[0] ||
         err.response?.data?.email?.[0] ||
+        err.response?.data?.credit_limit?.[0] ||
         err.response?.data?.detail ||
         err.response?.data?.error ||
         'Failed to save customer. Please try again.'
@@ -231,6 +236,17 @@ export default function CustomerForm() {
                 onChange={(e) => handleInputChange('address', e.target.value)}
               />
             </Grid>
+            <Grid item xs={12} md={6}>
+              <TextField
+                fullWidth
+                type="number"
+                label="Credit Limit"
+                value={formData.credit_limit}
+                onChange={(e) => handleInputChange('credit_limit', e.target.value)}
+                inputProps={{ min: 0, step: '0.01' }}
+                helperText="Leave empty for no limit"
+              />
+            </Grid>
             <Grid item xs={12}>
               <FormControlLabel
                 control={
@@ -44,11 +44,11 @@ export default function InventoryForm() {
   const fetchDropdownData = async () => {
     try {
       const [productsRes, warehousesRes] = await Promise.all([
-        productsAPI.list(),
-        warehousesAPI.list(),
+        productsAPI.lookup(),
+        warehousesAPI.lookup(),
       ])
-      setProducts(productsRes.data.results || productsRes.data || [])
-      setWarehouses(warehousesRes.data.results || warehousesRes.data || [])
+      setProducts(productsRes.data || [])
+      setWarehouses(warehousesRes.data || [])
     } catch (err) {
       console.error('Error fetching dropdown data:', err)
       setError('Failed to load form data. Please try again.')
@@ -219,7 +219,7 @@ export default function InventoryForm() {
               >
                 {products.map((product) => (
                   <MenuItem key={product.id} value={product.id}>
-                    {product.sku} - {product.name}
+                    {product.code} - {product.label}
                   </MenuItem>
                 ))}
               </TextField>
@@ -237,7 +237,7 @@ export default function InventoryForm() {
               >
                 {warehouses.map((warehouse) => (
                   <MenuItem key={warehouse.id} value={warehouse.id}>
-                    {warehouse.code} - {warehouse.name}
+                    {warehouse.code} - {warehouse.label}
                   </MenuItem>
                 ))}
               </TextField>
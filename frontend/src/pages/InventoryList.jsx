@@ -233,6 +233,9 @@ export default function InventoryList() {
                 <TableCell align="right" sx={{ fontWeight: 600 }}>
                   Quantity
                 </TableCell>
+                <TableCell align="right" sx={{ fontWeight: 600 }}>
+                  Available
+                </TableCell>
                 <TableCell align="right" sx={{ fontWeight: 600 }}>
                   Min Stock
                 </TableCell>
@@ -248,13 +251,13 @@ export default function InventoryList() {
             <TableBody>
               {loading ? (
                 <TableRow>
-                  <TableCell colSpan={7} align="center">
+                  <TableCell colSpan={8} align="center">
                     <CircularProgress size={24} />
                   </TableCell>
                 </TableRow>
               ) : inventory.length === 0 ? (
                 <TableRow>
-                  <TableCell colSpan={7} align="center">
+                  <TableCell colSpan={8} align="center">
                     No inventory records found
                   </TableCell>
                 </TableRow>
@@ -291,6 +294,12 @@ export default function InventoryList() {
                           {item.quantity}
                         </Typography>
                       </TableCell>
+                      <TableCell align="right">
+                        <Typography variant="body2" color="text.secondary">
+                          {item.available ?? item.quantity}
+                          {item.reserved > 0 && ` (${item.reserved} reserved)`}
+                        </Typography>
+                      </TableCell>
                       <TableCell align="right">
                         <Typography variant="body2" color="text.secondary">
                           {item.minimum_stock_level}
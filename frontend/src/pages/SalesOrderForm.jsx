@@ -50,6 +50,8 @@ export default function SalesOrderForm() {
       warehouse: '',
       quantity: 1,
       unit_price: 0,
+      // Set once the price is typed in; otherwise the price list decides
+      price_overridden: false,
     },
   ])
 
@@ -57,6 +59,42 @@ export default function SalesOrderForm() {
     fetchDropdownData()
   }, [])
 
+  // Re-price lines from the customer's price list when what decides the price changes
+  const pricingKey = items.map((item) => `${item.product}:${item.quantity}`).join(',')
+  useEffect(() => {
+    const lines = items.filter((item) => item.product && item.quantity > 0)
+    if (!formData.customer || lines.length === 0) {
+      return
+    }
+    let cancelled = false
+    salesOrdersAPI
+      .price({
+        customer: parseInt(formData.customer),
+        order_date: formData.order_date,
+        items: lines.map((item) => ({ product: parseInt(item.product), quantity: parseInt(item.quantity) })),
+      })
+      .then((response) => {
+        if (cancelled) {
+          return
+        }
+        const prices = response.data.items
+        setItems((prev) => {
+          let position = 0
+          return prev.map((item) => {
+            if (!(item.product && item.quantity > 0)) {
+              return item
+            }
+            const price = prices[position++]
+            return item.price_overridden || !price ? item : { ...item, unit_price: parseFloat(price.unit_price) }
+          })
+        })
+      })
+      .catch((err) => console.error('Error pricing order lines:', err))
+    return () => {
+      cancelled = true
+    }
+  }, [formData.customer, formData.order_date, pricingKey])
+
   // Helper function to extract error message from nested structures
   const extractNestedError = (errorObj, prefix = '') => {
     if (typeof errorObj === 'string') return errorObj
@@ -193,6 +231,9 @@ export default function SalesOrderForm() {
     setItems((prev) => {
       const newItems = [...prev]
       newItems[index] = { ...newItems[index], [field]: value }
+      if (field === 'unit_price') {
+        newItems[index].price_overridden = true
+      }
 
       // Auto-fill unit price from product
       if (field === 'product') {
@@ -214,6 +255,7 @@ export default function SalesOrderForm() {
         warehouse: '',
         quantity: 1,
         unit_price: 0,
+        price_overridden: false,
       },
     ])
   }
@@ -243,7 +285,7 @@ export default function SalesOrderForm() {
 
     for (let i = 0; i < items.length; i++) {
       const item = items[i]
-      if (!item.product || !item.warehouse || !item.quantity || item.quantity <= 0) {
+      if (!item.product || !item.quantity || item.quantity <= 0) {
         setError(`Please complete all fields for item ${i + 1}`)
         return false
       }
@@ -269,9 +311,11 @@ export default function SalesOrderForm() {
         customer: parseInt(formData.customer),
         items: items.map((item) => ({
           product: parseInt(item.product),
-          warehouse: parseInt(item.warehouse),
+          // No warehouse: the backend allocates the line across warehouses
+          ...(item.warehouse ? { warehouse: parseInt(item.warehouse) } : {}),
           quantity: parseInt(item.quantity),
-          unit_price: parseFloat(item.unit_price),
+          // Other lines are priced by the backend from the customer's price list
+          ...(item.price_overridden ? { unit_price: parseFloat(item.unit_price) } : {}),
         })),
       }
 
@@ -447,19 +491,15 @@ export default function SalesOrderForm() {
                           onChange={(e) =>
                             handleItemChange(index, 'warehouse', e.target.value)
                           }
-                          required
-                          disabled={warehouses.length === 0}
+                          SelectProps={{ displayEmpty: true }}
                           sx={{ minWidth: 150 }}
                         >
-                          {warehouses.length === 0 ? (
-                            <MenuItem disabled>No warehouses available</MenuItem>
-                          ) : (
-                            warehouses.map((warehouse) => (
-                              <MenuItem key={warehouse.id} value={warehouse.id}>
-                                {warehouse.code}
-                              </MenuItem>
-                            ))
-                          )}
+                          <MenuItem value="">Auto-allocate</MenuItem>
+                          {warehouses.map((warehouse) => (
+                            <MenuItem key={warehouse.id} value={warehouse.id}>
+                              {warehouse.code}
+                            </MenuItem>
+                          ))}
                         </TextField>
                       </TableCell>
                       <TableCell>
@@ -29,6 +29,7 @@ export default function WarehouseForm() {
     code: '',
     name: '',
     address: '',
+    priority: 100,
     is_active: true,
   })
 
@@ -48,6 +49,7 @@ export default function WarehouseForm() {
         code: warehouse.code || '',
         name: warehouse.name || '',
         address: warehouse.address || '',
+        priority: warehouse.priority ?? 100,
         is_active: warehouse.is_active !== undefined ? warehouse.is_active : true,
       })
     } catch (err) {
@@ -205,6 +207,17 @@ export default function WarehouseForm() {
                 onChange={(e) => handleInputChange('address', e.target.value)}
               />
             </Grid>
+            <Grid item xs={12} md={6}>
+              <TextField
+                fullWidth
+                type="number"
+                label="Allocation Priority"
+                helperText="Lower numbers ship first when orders are auto-allocated"
+                value={formData.priority}
+                onChange={(e) => handleInputChange('priority', e.target.value)}
+                inputProps={{ min: 0 }}
+              />
+            </Grid>
             <Grid item xs={12}>
               <FormControlLabel
                 control={